@@ -4,17 +4,1100 @@
 from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame, StringSetting, NumberSetting, ChoicesSetting
 
 
+from collections import namedtuple
+from functools import lru_cache
+from time import perf_counter
+
+
 STX = 0x02
 ETX = 0x03
 ACK = 0x06
 NAK = 0x15
 
+# Telegram directions
+CONTROLLER = 'controller'   # PC → AlphaLiner
+ALPHALINER = 'alphaliner'   # AlphaLiner → PC
+AUTO = 'auto'               # both, the sender is inferred per telegram
+
+# STX C1 C2 ... BCC ETX
+HEADER_LENGTH = 3
+TRAILER_LENGTH = 2
+
+
+# Declarative description of one telegram.
+#   direction:   CONTROLLER or ALPHALINER
+#   method:      C2 code
+#   frame_type:  result_types key of the emitted frame
+#   data_length: number of D bytes
+#   decoder:     name of the analyzer method that decodes D1..Dn (None = no data to show)
+TelegramSpec = namedtuple('TelegramSpec', 'direction method frame_type data_length decoder')
+
+TELEGRAM_SPECS = (
+    # PC → AlphaLiner
+    TelegramSpec(CONTROLLER, 1, 'MANUAL_MODE', 0, None),
+    TelegramSpec(CONTROLLER, 2, 'AUTO_MODE', 0, None),
+    TelegramSpec(CONTROLLER, 3, 'DIAGNOSTIC_MODE', 2, 'get_diagnostic_mode_msg'),
+    TelegramSpec(CONTROLLER, 5, 'PROD_CONFIG', 25, 'get_prod_config_msg'),
+    TelegramSpec(CONTROLLER, 6, 'PROD_ORDER', 12, 'get_prod_order_msg'),
+    TelegramSpec(CONTROLLER, 7, 'STOP', 0, None),
+    TelegramSpec(CONTROLLER, 8, 'ERASE_STOP', 0, None),
+    TelegramSpec(CONTROLLER, 10, 'REQUEST_CONFIG', 0, None),
+    TelegramSpec(CONTROLLER, 11, 'BACKUP_FEEDER', 2, 'get_backup_feeder_msg'),
+    TelegramSpec(CONTROLLER, 12, 'CONSECUTIVE_ERRORS', 3, 'get_consecutive_errors_msg'),
+    TelegramSpec(CONTROLLER, 13, 'SILENCE', 2, 'get_silence_msg'),
+    TelegramSpec(CONTROLLER, 14, 'FORCED_REJECT', 2, 'get_forced_reject_msg'),
+    TelegramSpec(CONTROLLER, 15, 'DELETE_PROD_DATA', 0, None),
+    TelegramSpec(CONTROLLER, 16, 'DISABLE_GREEN_LIGHTS', 5, 'get_green_lights_msg'),
+    TelegramSpec(CONTROLLER, 100, 'CONTROL_COMMANDS', 2, 'get_control_commands_msg'),
+    TelegramSpec(CONTROLLER, 101, 'PARAMETER_DATA', 8, 'get_parameter_data_msg'),
+
+    # AlphaLiner → PC
+    TelegramSpec(ALPHALINER, 1, 'STATUS_MSG', 2, 'get_status_msg'),
+    TelegramSpec(ALPHALINER, 2, 'ERROR_MSG', 3, 'get_error_msg'),
+    TelegramSpec(ALPHALINER, 3, 'STATISTIC_MSG', 5, 'get_statistic_msg'),
+    TelegramSpec(ALPHALINER, 4, 'COPY_COMPLETE', 9, 'get_copy_complete_msg'),
+    TelegramSpec(ALPHALINER, 5, 'COPY_FAILED', 10, 'get_copy_failed_msg'),
+    TelegramSpec(ALPHALINER, 6, 'MACHINE_CONFIG', 6, 'get_machine_config_msg'),
+    TelegramSpec(ALPHALINER, 7, 'COPY_INHIBIT', 0, None),
+    TelegramSpec(ALPHALINER, 101, 'CONFIG_DATA', 8, 'get_config_data_msg'),
+    TelegramSpec(ALPHALINER, 120, 'DOUBLE_DETECTOR_TEST', 6, 'get_double_detector_test_msg'),
+)
+
+
+def compile_telegram_tables(specs):
+    """
+    Compiles telegram specs into one lookup table per direction.
+
+    Args:
+        specs: iterable of TelegramSpec
+
+    Returns:
+        dict: direction -> {method: (packet_length, frame_type, decoder_name)}
+    """
+    tables = {CONTROLLER: {}, ALPHALINER: {}}
+    for spec in specs:
+        table = tables[spec.direction]
+        if spec.method in table:
+            raise ValueError(f"Duplicate telegram spec for method {spec.method} ({spec.direction})")
+        packet_length = HEADER_LENGTH + spec.data_length + TRAILER_LENGTH
+        table[spec.method] = (packet_length, spec.frame_type, spec.decoder)
+    return tables
+
+
+TELEGRAM_TABLES = compile_telegram_tables(TELEGRAM_SPECS)
+
+
+def parse_method_filter(text, table):
+    """
+    Parses the telegram selection setting, e.g. "COPY_FAILED, ERROR_MSG, statistic msg" or "5 2 3".
+
+    Args:
+        text: frame type names or C2 codes separated by commas/semicolons (empty = all telegrams)
+        table: compiled telegram table of the direction
+
+    Returns:
+        set: selected methods, None when every telegram is selected
+    """
+    names = [name.strip() for name in text.replace(';', ',').split(',')] if text else []
+    names = [name for name in names if name]
+    if not names:
+        return None
+
+    by_type = {frame_type: method for method, (_, frame_type, _) in table.items()}
+    selected = set()
+    for name in names:
+        key = name.upper().replace(' ', '_').replace('-', '_')
+        if key.isdigit() and int(key) in table:
+            selected.add(int(key))
+        elif key in by_type:
+            selected.add(by_type[key])
+        else:
+            raise ValueError(f"Unknown telegram '{name}', expected one of {', '.join(sorted(by_type))}")
+    return selected
+
+
+def parse_auto_method_filter(text, tables):
+    """
+    parse_method_filter for the Auto direction: names may come from either table, a C2 code
+    selects the method in every direction that has it.
+
+    Args:
+        text: telegram selection setting
+        tables: {direction: compiled telegram table}
+
+    Returns:
+        dict: {direction: selected methods}, None when every telegram is selected
+    """
+    names = [name.strip() for name in text.replace(';', ',').split(',')] if text else []
+    names = [name for name in names if name]
+    if not names:
+        return None
+
+    selected = {direction: set() for direction in tables}
+    for name in names:
+        found = False
+        for direction, table in tables.items():
+            try:
+                selected[direction] |= parse_method_filter(name, table)
+                found = True
+            except ValueError:
+                continue
+        if not found:
+            frame_types = sorted(entry[1] for table in tables.values() for entry in table.values())
+            raise ValueError(f"Unknown telegram '{name}', expected one of {', '.join(frame_types)}")
+    return selected
+
+
+# Field value tables shared by the decoders
+STATUS_MODES = ('NotDefined', 'Manual', 'Automatic', 'Diagnosis')
+
+ERROR_TYPES = {
+    0: "Other Errors",
+    1: "Missfeed",
+    2: "Doublefeed",
+    3: "Opening Error",
+    4: "Profile Error",
+    5: "Defective Pocket",
+    6: "Defective Gripper",
+    7: "Maximum Number of Repair Attempts",
+    8: "Gap Errors",
+    9: "Controlled Forced Reject",
+    10: "Wrongfeed",
+    11: "Clutch",
+    12: "Package Removed from Gripper Chain",
+    13: "Mode Change",
+    14: "Empty Pocket Error"
+}
+
+ERROR_LOCATION_KINDS = {
+    1: 'Feeder', 2: 'Feeder', 10: 'Feeder',   # Missfeed, Doublefeed, Wrongfeed
+    3: 'Pocket', 5: 'Pocket', 14: 'Pocket',   # Opening Error, Defective Pocket, Empty Pocket Error
+    4: 'Gripper', 6: 'Gripper', 12: 'Gripper',  # Profile Error, Defective Gripper, Package Removed
+    11: 'Insert Feeder Module',                # Clutch (99 = Pocket Wheel / Jacket Feeder)
+}
+
+CONTROL_TYPES = {
+    0x00: 'Missfeed',
+    0x01: 'DoubleFeed',
+    0x02: 'Opening',
+    0x03: 'Profile',
+    0x04: 'Tolerance',
+    0x05: 'Gap'
+}
+
+PROD_CONFIG_TABLES = ('feeders', 'doublefeed', 'missfeed', 'backup', 'low_level')
+
+DIAGNOSTIC_TESTS = ('Missfeed Photocell', 'Lamp', 'Double Detector')
+
+CONTROL_COMMANDS = ('Config Upload', 'Load Defaults', 'Recalculate PLC', 'Save to FIXRAM',
+                    'PLC Init', 'PLC TotalInit', 'Upload Service Data')
+
+# CONFIG_DATA fields: (name, first data byte 2..8, number of bytes), multi-byte values 7 bits per byte, high first.
+# DataIDs 0..30 carry the feeder distances, the IDs 100..104 the machine identification.
+CONFIG_FEEDER_FIELDS = (('pull_off_distance', 2, 2), ('missfeed_distance', 4, 2), ('doublefeed_distance', 6, 2),
+                        ('feeder_status', 8, 1))
+CONFIG_DATA_FIELDS = {
+    100: ('Identification', (('config_file', 2, 2), ('software', 5, 1), ('pg_version', 6, 2), ('software_index', 8, 1))),
+    101: ('Version Date', (('day', 2, 1), ('month', 3, 1), ('year', 4, 2), ('bug_fix_version', 6, 2))),
+    102: ('Versions', (('release', 2, 2), ('frame_driver_version', 4, 2), ('rio_version', 6, 2))),
+    103: ('Online Data', (('offset_tr', 2, 1), ('offset_mj', 3, 1), ('insert_count', 4, 1), ('removal', 5, 1),
+                         ('pockets', 6, 1), ('gripper_number', 7, 2))),
+    104: ('Project', (('project', 2, 2),)),
+}
+
+# Double Detector Tests per feeder and sensor between two DETECTOR_STATS frames (summary mode),
+# and the longest time a test waits for its DETECTOR_STATS frame (seconds)
+DETECTOR_SUMMARY_INTERVAL = 100
+DETECTOR_SUMMARY_PERIOD = 10.0
+
+
+# Feeder/insert tables (PROD_CONFIG, PROD_ORDER, COPY_COMPLETE, COPY_FAILED, ...)
+# D1..D5 carry 7 bits each, bit 0 of the table (Jacket) is the LSB of D5 and feeder 30 is bit 2 of D1.
+TABLE_BITS = 31         # bits shown, the remaining bits of D1 are unused
+TABLE_EMPTY = 'CEALR'   # shown when no bit is set
+TABLE_CACHE_SIZE = 4096
+
+
+def _build_chunk_labels(chunk):
+    labels = []
+    for value in range(128):
+        positions = [chunk * 7 + bit for bit in range(6, -1, -1) if value & (1 << bit)]
+        labels.append(','.join('J' if position == 0 else str(position) for position in positions))
+    return tuple(labels)
+
+
+# TABLE_CHUNK_LABELS[chunk][value]: positions set by a 7-bit value in that chunk (chunk 0 = D5), highest first
+TABLE_CHUNK_LABELS = tuple(_build_chunk_labels(chunk) for chunk in range(5))
+
+
+def render_table_positions(value):
+    """
+    Renders a table value as comma-separated bit positions, highest first, using the chunk tables.
+    """
+    parts = [TABLE_CHUNK_LABELS[chunk][(value >> (chunk * 7)) & 0x7F] for chunk in range(4, -1, -1)]
+    return ','.join([part for part in parts if part]) or TABLE_EMPTY
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def decode_table(raw):
+    """
+    Decodes five raw table bytes (MSB set or not).
+
+    Args:
+        raw: bytes D1..D5
+
+    Returns:
+        tuple: (35-bit table value, positions of the first TABLE_BITS bits)
+    """
+    value = 0
+    for byte in raw:
+        value = (value << 7) | (byte & 0x7F)
+    return value, render_table_positions(value & ((1 << TABLE_BITS) - 1))
+
+
+# Block check character: XOR over C1..Dn, reserved results (NUL, STX, ETX, ACK, NAK) are incremented by one
+BCC_RESERVED = (0x00, STX, ETX, ACK, NAK)
+BCC_FIXUP = bytes(value + 1 if value in BCC_RESERVED else value for value in range(256))
+
+# Longest telegram is PROD_CONFIG with 3 + 25 + 2 bytes, telegrams of unknown methods are framed up to here
+MAX_TELEGRAM_LENGTH = 64
+
+# TelegramFramer.feed results
+FRAME_PENDING = 0      # telegram not complete (or idle)
+FRAME_OK = 1           # valid telegram, see seq / method / data
+FRAME_BAD_ETX = 2      # expected length reached but the last byte is not ETX
+FRAME_BAD_BCC = 3      # block check character mismatch
+FRAME_BAD_LENGTH = 4   # ETX arrived before the expected length
+FRAME_TOO_LONG = 5     # unknown method and no ETX within MAX_TELEGRAM_LENGTH
+
+# Additional results of the framing stage (AlphaLinerSerialAnalyzer.iter_framed)
+FRAME_ACK = 6          # ACK character
+FRAME_NAK = 7          # NAK character
+
+FRAME_FAILURE_NAMES = {
+    FRAME_BAD_ETX: 'bad_etx',
+    FRAME_BAD_BCC: 'bad_bcc',
+    FRAME_BAD_LENGTH: 'bad_length',
+    FRAME_TOO_LONG: 'too_long',
+}
+
+# Telegrams between two PROFILE summary frames
+PROFILE_INTERVAL = 10000
+
+
+class TelegramFramer:
+    """
+    Byte-level STX .. ETX state machine.
+
+    Bytes are stored in a preallocated bytearray and the BCC is folded in as they arrive,
+    so completing a telegram needs no slicing or second pass. Telegrams of known methods
+    are framed by length, unknown methods up to their ETX (ETX never occurs in C1..Dn, but the
+    reserved-value increment turns a BCC of 0x02 into 0x03: a known method's BCC position is never
+    taken as its end, see etx_bcc for the Auto direction).
+    STX occurs nowhere else in a telegram (C1..Dn have the MSB set, the BCC is never 0x02), so
+    a failed telegram needs no rescan: an STX always starts a new one, abandoning an unfinished
+    telegram (counted in resyncs), and the telegram after a damaged one is never lost.
+
+    After feed() returns FRAME_OK, seq, method, start_time and data (a memoryview into the
+    buffer, valid until the next feed) describe the telegram.
+    """
+
+    def __init__(self, packet_lengths, capacity=MAX_TELEGRAM_LENGTH, etx_bcc=False):
+        """
+        Args:
+            packet_lengths: {method: packet_length} of the telegrams to frame by length
+            capacity: maximum telegram length in bytes
+            etx_bcc: {method: set of packet lengths} when the direction is unknown: frames until ETX
+                and takes an ETX as the BCC (the reserved-value increment turns 0x02 into 0x03) when
+                the telegram does not end there but the next byte completes a valid one
+        """
+        self.lengths = [0] * 128
+        for method, length in packet_lengths.items():
+            self.lengths[method] = length
+        self.capacity = capacity
+        self.etx_bcc = etx_bcc or {}
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.times = [None] * capacity
+        self.count = 0            # bytes buffered, 0 = waiting for STX
+        self.expected_length = 0  # 0 = frame until ETX
+        self.running_xor = 0      # XOR of C1 .. last byte before ETX
+
+        self.start_time = None
+        self.seq = None
+        self.method = None
+        self.data = None
+        self.resyncs = 0          # unfinished telegrams abandoned by an STX
+        self.failed_bytes = b''
+        self.failed_expected_length = 0
+
+    def reset(self):
+        self.count = 0
+
+    def feed(self, byte, time):
+        """
+        Adds one byte (ACK/NAK must be handled by the caller).
+
+        Args:
+            byte: received byte value
+            time: start time of the byte
+
+        Returns:
+            int: one of the FRAME_* results
+        """
+        count = self.count
+
+        if byte == STX:
+            if count:
+                self.resyncs += 1  # mid-packet STX, the current telegram is abandoned
+            self.buffer[0] = STX
+            self.times[0] = time
+            self.count = 1
+            self.expected_length = 0
+            self.running_xor = 0
+            return FRAME_PENDING
+
+        if not count:
+            return FRAME_PENDING  # not inside a telegram
+
+        self.buffer[count] = byte
+        self.times[count] = time
+        count += 1
+        self.count = count
+
+        if byte == ETX and count != self.expected_length - 1:
+            return self._finish(count)  # an ETX right before the expected end is the BCC (0x02 + 1)
+
+        if count == 3:
+            # STX + C1 + C2: the method determines the expected length
+            self.expected_length = self.lengths[byte & 0x7F]
+
+        if count == self.expected_length:
+            return self._fail(FRAME_BAD_ETX, count)
+        if count == self.capacity:
+            return self._fail(FRAME_TOO_LONG, count)
+
+        self.running_xor ^= byte
+        return FRAME_PENDING
+
+    def _finish(self, count):
+        expected = self.expected_length
+        if self.etx_bcc and BCC_FIXUP[self.running_xor] == ETX and count < self.capacity:
+            lengths = self.etx_bcc.get(self.buffer[2] & 0x7F, ()) if count > 2 else ()
+            if count + 1 in lengths or (count not in lengths and not self._bcc_matches(count)):
+                self.running_xor ^= ETX
+                return FRAME_PENDING
+        if (expected and count != expected) or count < HEADER_LENGTH + TRAILER_LENGTH:
+            return self._fail(FRAME_BAD_LENGTH, count)
+
+        buffer = self.buffer
+        bcc_received = buffer[count - 2]
+        if BCC_FIXUP[self.running_xor ^ bcc_received] != bcc_received:
+            return self._fail(FRAME_BAD_BCC, count)
+
+        self.start_time = self.times[0]
+        self.seq = buffer[1] & 0x7F
+        self.method = buffer[2] & 0x7F
+        self.data = self.view[HEADER_LENGTH:count - TRAILER_LENGTH]
+        self.count = 0
+        return FRAME_OK
+
+    def _bcc_matches(self, count):
+        """
+        Returns:
+            bool: True if the byte before the ETX at count is a valid BCC of the bytes before it
+        """
+        if count < HEADER_LENGTH + TRAILER_LENGTH:
+            return False
+        bcc_received = self.buffer[count - 2]
+        return BCC_FIXUP[self.running_xor ^ bcc_received] == bcc_received
+
+    def _fail(self, result, count):
+        failed = bytes(self.buffer[:count])
+        expected_length = self.expected_length
+        self.count = 0
+
+        # Keep the failed bytes around for error_info()
+        self.failed_bytes = failed
+        self.failed_expected_length = expected_length
+        return result
+
+    def error_info(self, result):
+        """
+        Describes the last failed telegram.
+
+        Returns:
+            string: human-readable reason
+        """
+        return describe_frame_error(result, self.failed_bytes, self.failed_expected_length)
+
+
+def describe_frame_error(result, failed, expected_length):
+    """
+    Human-readable reason for a FRAME_* error result.
+
+    Args:
+        result: FRAME_BAD_ETX, FRAME_BAD_BCC, FRAME_BAD_LENGTH or FRAME_TOO_LONG
+        failed: bytes of the failed telegram, STX first
+        expected_length: spec length of its method (0 = unknown)
+    """
+    if result == FRAME_BAD_ETX:
+        return f"Invalid ETX: expected 0x03, got {hex(failed[-1])}"
+    if result == FRAME_BAD_BCC:
+        payload_xor = 0
+        for b in failed[1:-2]:
+            payload_xor ^= b
+        return f"BCC mismatch: expected {hex(BCC_FIXUP[payload_xor])}, got {hex(failed[-2])}"
+    if result == FRAME_BAD_LENGTH:
+        return f"Invalid length: ETX after {len(failed)} bytes, expected {expected_length}"
+    return f"Telegram too long: no ETX within {len(failed)} bytes"
+
+
+class LinkTracker:
+    """
+    Pairs every telegram with the ACK/NAK that follows it and follows the C1 sequence numbers.
+
+    A telegram that gets no ACK/NAK before the next telegram counts as timed out. A repeated
+    sequence number is a retransmission, and so is the telegram after a framing error that was
+    NAKed or timed out (the sender repeats what the receiver could not read); any other jump is
+    a sequence gap. All work is O(1) per telegram, only counters and the pending telegram are kept.
+    """
+
+    def __init__(self):
+        self.pending = None        # 'TELEGRAM' or 'ERROR' (failed framing) waiting for ACK/NAK
+        self.pending_end = None    # its end time, None if unknown
+        self.last_seq = None
+        self.last_outcome = None   # 'ACK', 'NAK' or 'TIMEOUT' of the previous telegram
+        self.resend_after = None   # 'NAK' or 'TIMEOUT' of a failed telegram the next one resends
+
+        self.telegrams = 0
+        self.errors = 0
+        self.acks = 0
+        self.naks = 0
+        self.timeouts = 0
+        self.unpaired = 0
+        self.retransmissions = 0
+        self.repeats = 0           # retransmissions of a telegram that had been received
+        self.gaps = 0
+        self.missing = 0
+
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_min = None
+        self.latency_max = None
+
+        self.first_time = None
+        self.last_time = None
+
+    def _close_pending(self):
+        if self.pending is not None:
+            self.timeouts += 1
+            self.last_outcome = 'TIMEOUT'
+            if self.pending == 'ERROR':
+                self.resend_after = 'TIMEOUT'
+            self.pending = None
+
+    def on_telegram(self, seq, start, end):
+        """
+        Registers a valid telegram.
+
+        Returns:
+            string: 'RETRANSMISSION after NAK/TIMEOUT/ACK', 'SEQ_GAP n' or None
+        """
+        self._close_pending()
+        if self.first_time is None:
+            self.first_time = start
+        self.last_time = end
+        self.telegrams += 1
+
+        event = None
+        last_seq = self.last_seq
+        resend_after = self.resend_after
+        if seq == last_seq:
+            self.retransmissions += 1
+            self.repeats += 1
+            event = f"RETRANSMISSION after {resend_after or self.last_outcome or 'ERROR'}"
+        elif resend_after is not None and (last_seq is None or seq == (last_seq + 1) & 0x7F):
+            # The failed telegram carried this sequence number
+            self.retransmissions += 1
+            event = f"RETRANSMISSION after {resend_after}"
+        elif last_seq is not None and seq != (last_seq + 1) & 0x7F:
+            missing = (seq - last_seq - 1) & 0x7F
+            self.gaps += 1
+            self.missing += missing
+            event = f"SEQ_GAP {missing}"
+
+        self.last_seq = seq
+        self.pending = 'TELEGRAM'
+        self.pending_end = end
+        self.last_outcome = None
+        self.resend_after = None
+        return event
+
+    def on_error(self, end=None):
+        """
+        Registers a telegram that failed framing (its ACK/NAK still belongs to it).
+
+        Args:
+            end: end time of the failed telegram, None for a telegram cut off by its ACK/NAK
+        """
+        self._close_pending()
+        self.errors += 1
+        self.pending = 'ERROR'
+        self.pending_end = end
+        self.last_outcome = None
+
+    def on_ack(self, kind, start):
+        """
+        Registers an ACK or NAK.
+
+        Returns:
+            float: seconds from the end of the telegram to the ACK/NAK, None if nothing was pending
+        """
+        if kind == 'ACK':
+            self.acks += 1
+        else:
+            self.naks += 1
+
+        if self.pending is None:
+            self.unpaired += 1
+            return None
+
+        if self.pending == 'ERROR' and kind == 'NAK':
+            self.resend_after = kind
+        self.pending = None
+        self.last_outcome = kind
+        if self.pending_end is None:
+            return None
+
+        latency = float(start - self.pending_end)
+        self.latency_count += 1
+        self.latency_sum += latency
+        if self.latency_min is None or latency < self.latency_min:
+            self.latency_min = latency
+        if self.latency_max is None or latency > self.latency_max:
+            self.latency_max = latency
+        return latency
+
+    def summary(self):
+        """
+        Returns:
+            dict: counters, ACK round-trip latency (ms) and effective telegrams/sec
+        """
+        duration = float(self.last_time - self.first_time) if self.telegrams > 1 else 0.0
+        good = self.telegrams - self.repeats
+        return {
+            'telegrams': self.telegrams,
+            'errors': self.errors,
+            'acks': self.acks,
+            'naks': self.naks,
+            'timeouts': self.timeouts,
+            'unpaired_acks': self.unpaired,
+            'retransmissions': self.retransmissions,
+            'seq_gaps': self.gaps,
+            'seq_missing': self.missing,
+            'latency_avg_ms': 1000.0 * self.latency_sum / self.latency_count if self.latency_count else None,
+            'latency_min_ms': 1000.0 * self.latency_min if self.latency_min is not None else None,
+            'latency_max_ms': 1000.0 * self.latency_max if self.latency_max is not None else None,
+            'telegrams_per_sec': good / duration if duration > 0 else None,
+        }
+
+
+class DuplexLinkTracker:
+    """
+    Link statistics of a line that carries both directions (Auto mode): one LinkTracker per
+    sender. An ACK/NAK answers the last telegram, so it is charged to that telegram's sender;
+    framing errors and their ACK/NAK (sender unknown) are counted for the line. The telegram
+    after a NAKed or unanswered framing error is the resend, it counts as a retransmission of
+    its sender.
+    """
+
+    def __init__(self):
+        self.trackers = {CONTROLLER: LinkTracker(), ALPHALINER: LinkTracker()}
+        self.current = None     # LinkTracker of the telegram waiting for ACK/NAK
+        self.errors = 0
+        self.error_pending = False
+        self.error_acks = 0
+        self.error_naks = 0
+        self.resend_after = None  # 'NAK' or 'TIMEOUT' of the last framing error
+        self.unpaired = 0
+
+    def on_telegram(self, direction, seq, start, end):
+        """
+        Returns:
+            string: link event of the sender's stream (see LinkTracker.on_telegram)
+        """
+        tracker = self.trackers[direction]
+        if self.error_pending:
+            self.resend_after = 'TIMEOUT'
+        if self.resend_after is not None:
+            tracker.resend_after = self.resend_after
+            self.resend_after = None
+        self.current = tracker
+        self.error_pending = False
+        return tracker.on_telegram(seq, start, end)
+
+    def on_error(self, end=None):
+        self.errors += 1
+        self.current = None
+        self.error_pending = True
+
+    def on_ack(self, kind, start):
+        """
+        Returns:
+            float: ACK round-trip latency in seconds, None if no telegram was pending
+        """
+        tracker = self.current
+        self.current = None
+        if tracker is None:
+            if not self.error_pending:
+                self.unpaired += 1
+            elif kind == 'ACK':
+                self.error_acks += 1
+            else:
+                self.error_naks += 1
+                self.resend_after = kind
+            self.error_pending = False
+            return None
+        return tracker.on_ack(kind, start)
+
+    def summary(self):
+        """
+        Returns:
+            dict: the LinkTracker summary of each sender with direction prefixes, plus line errors
+        """
+        summary = {'errors': self.errors, 'error_acks': self.error_acks, 'error_naks': self.error_naks,
+                   'unpaired_acks': self.unpaired}
+        for direction, tracker in self.trackers.items():
+            for key, value in tracker.summary().items():
+                if key != 'errors':
+                    summary[f'{direction}_{key}'] = value
+        return summary
+
+
+class DirectionClassifier:
+    """
+    Infers the sender of each telegram on a line that carries both directions (Auto mode).
+
+    The candidates are the directions whose spec has the method with the received length;
+    most telegrams have exactly one. The rest (e.g. STOP and COPY_INHIBIT, both method 7
+    without data) are scored on the evidence the link provides: every side numbers its own
+    telegrams with C1, and a telegram repeated without an ACK in between is retransmitted by
+    the side that sent it.
+    """
+
+    def __init__(self, tables):
+        """
+        Args:
+            tables: {direction: {method: (packet_length, ...)}}, e.g. TELEGRAM_TABLES
+        """
+        self.candidates = {}   # (method, packet_length) -> directions
+        for direction, table in tables.items():
+            for method, entry in table.items():
+                self.candidates.setdefault((method, entry[0]), []).append(direction)
+        self.lengths = {}      # method -> packet lengths of either direction
+        for method, length in self.candidates:
+            self.lengths.setdefault(method, set()).add(length)
+
+        self.last_seq = dict.fromkeys(tables)
+        self.last_direction = None
+        self.last_answer = None   # 'ACK'/'NAK' since the last telegram, None if there was none
+        self.counts = dict.fromkeys(tables, 0)
+        self.ambiguous = 0
+
+    def on_ack(self, kind):
+        self.last_answer = kind
+
+    def classify(self, seq, method, packet_length):
+        """
+        Returns:
+            string: direction of the telegram, None if no spec has this method and length
+        """
+        candidates = self.candidates.get((method, packet_length))
+        if candidates is None:
+            return None
+        if len(candidates) == 1:
+            direction = candidates[0]
+        else:
+            self.ambiguous += 1
+            direction = max(candidates, key=lambda candidate: self._score(candidate, seq))
+
+        self.last_seq[direction] = seq
+        self.last_direction = direction
+        self.last_answer = None
+        self.counts[direction] += 1
+        return direction
+
+    def _score(self, direction, seq):
+        last_seq = self.last_seq[direction]
+        if last_seq is None:
+            return (0, -128, 0)
+        distance = (seq - last_seq) & 0x7F
+        unanswered = direction == self.last_direction and self.last_answer != 'ACK'
+        if distance == 0:
+            score = 3 if unanswered else 1   # retransmission after NAK/timeout
+        elif distance == 1:
+            score = 2                        # next telegram of this sender
+        else:
+            score = 0
+        # Ties: the stream the sequence number continues most closely, then the busier sender
+        return (score, -distance, self.counts[direction])
+
+    def summary(self):
+        """
+        Returns:
+            dict: telegrams per direction and how many of them were ambiguous by length
+        """
+        summary = {f'{direction}_telegrams': count for direction, count in self.counts.items()}
+        summary['ambiguous_telegrams'] = self.ambiguous
+        return summary
+
+
+class DecodeProfile:
+    """
+    Counters and timings of the decode hot path, only created when profiling is enabled.
+
+    Decoders are wrapped to time them individually; framing time is the remaining time
+    spent in decode.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.telegrams = {}        # 'direction/FRAME_TYPE' -> count, every valid telegram
+        self.failures = {}         # failure reason -> count
+        self.decoder_time = {}     # decoder name -> seconds
+        self.decoder_total = 0.0
+        self.decode_total = 0.0
+        self.bytes = 0
+        self.since_summary = 0
+
+    def wrap(self, name, decoder):
+        """
+        Returns decoder wrapped so its run time is accumulated under name.
+        """
+        self.decoder_time.setdefault(name, 0.0)
+
+        def timed(data_bytes):
+            started = perf_counter()
+            fields = decoder(data_bytes)
+            elapsed = perf_counter() - started
+            self.decoder_time[name] += elapsed
+            self.decoder_total += elapsed
+            return fields
+        return timed
+
+    def count_telegram(self, direction, method):
+        """
+        Counts a valid telegram by sender and method, whether or not it is shown (telegram
+        selection, rollups and detector statistics hide or merge telegrams).
+        """
+        entry = TELEGRAM_TABLES[direction].get(method)
+        key = f"{direction}/{entry[1] if entry is not None else f'METHOD_{method}'}"
+        self.telegrams[key] = self.telegrams.get(key, 0) + 1
+        self.since_summary += 1
+
+    def count_failure(self, result):
+        reason = FRAME_FAILURE_NAMES.get(result, str(result))
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+    def report(self, resyncs=0):
+        """
+        Returns:
+            dict: telegram counts, failures, resyncs and times in seconds
+        """
+        return {
+            'bytes': self.bytes,
+            'telegrams': dict(sorted(self.telegrams.items())),
+            'failures': dict(self.failures),
+            'resyncs': resyncs,
+            'decode_s': self.decode_total,
+            'framing_s': self.decode_total - self.decoder_total,
+            'decoders_s': {name: seconds for name, seconds in sorted(self.decoder_time.items()) if seconds},
+        }
+
+
+def _format_counts(counts):
+    # Frame data values must be plain str/int/float, so per-key counts are rendered as text
+    return ', '.join(f"{key}: {count}" for key, count in sorted(counts.items())) or '-'
+
+
+class RollupWindow:
+    """
+    Aggregates decoded telegrams into one ROLLUP frame per time window (rollup mode).
+
+    A window starts with the first event after the previous window closed and is closed by the
+    first event at least window seconds after its start, so idle periods produce no frames.
+    Active error messages (fault/cause pairs) are carried across windows.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.start = None
+        self.end = None
+        self.active_errors = set()
+        self._reset()
+
+    def _reset(self):
+        self.completed = 0
+        self.faulty = 0
+        self.failed = 0
+        self.errors = {}           # error name -> count (STATISTIC_MSG and COPY_FAILED)
+        self.missfeeds = {}        # feeder -> count
+        self.doublefeeds = {}      # feeder -> count
+        self.naks = 0
+        self.bad_frames = 0
+
+    def _roll(self, start, end):
+        """
+        Returns:
+            AnalyzerFrame: ROLLUP frame of the window closed by an event at start, or None
+        """
+        closed = None
+        if self.start is None:
+            self.start = start
+        elif float(start - self.start) >= self.window:
+            closed = self.frame()
+            self._reset()
+            self.start = start
+        self.end = end
+        return closed
+
+    def _count_error(self, fields):
+        error_type = fields['error_type']
+        name = fields['error_name']
+        self.errors[name] = self.errors.get(name, 0) + 1
+        if error_type == 1:
+            self.missfeeds[fields['location']] = self.missfeeds.get(fields['location'], 0) + 1
+        elif error_type == 2:
+            self.doublefeeds[fields['location']] = self.doublefeeds.get(fields['location'], 0) + 1
+
+    def add_telegram(self, packet, start, end):
+        """
+        Registers a valid telegram (packet is None for telegrams filtered by method_filter).
+
+        Returns:
+            AnalyzerFrame: ROLLUP frame of a closed window, or None
+        """
+        closed = self._roll(start, end)
+        if packet is None:
+            return closed
+
+        frame_type = packet.type
+        fields = packet.data
+        if frame_type == 'COPY_COMPLETE':
+            self.completed += 1
+            if not fields['good']:
+                self.faulty += 1
+        elif frame_type == 'COPY_FAILED':
+            self.failed += 1
+            self._count_error(fields)
+        elif frame_type == 'STATISTIC_MSG':
+            self._count_error(fields)
+        elif frame_type == 'ERROR_MSG':
+            state = fields['state']
+            if state == 'Error':
+                self.active_errors.add((fields['fault'], fields['cause']))
+            elif state == 'Error Cleared':
+                self.active_errors.discard((fields['fault'], fields['cause']))
+            else:
+                self.active_errors.clear()
+        return closed
+
+    def add_nak(self, start, end):
+        closed = self._roll(start, end)
+        self.naks += 1
+        return closed
+
+    def add_bad_frame(self, start, end):
+        closed = self._roll(start, end)
+        self.bad_frames += 1
+        return closed
+
+    def frame(self):
+        return AnalyzerFrame('ROLLUP', self.start, self.end, {
+            'completed': self.completed,
+            'faulty': self.faulty,
+            'failed': self.failed,
+            'errors': _format_counts(self.errors),
+            'missfeeds': _format_counts(self.missfeeds),
+            'doublefeeds': _format_counts(self.doublefeeds),
+            'active_errors': len(self.active_errors),
+            'naks': self.naks,
+            'bad_frames': self.bad_frames,
+        })
+
+    def flush(self):
+        """
+        Returns:
+            AnalyzerFrame: ROLLUP frame of the open window, None if nothing was registered since the last one
+        """
+        if self.start is None:
+            return None
+        frame = self.frame()
+        self._reset()
+        self.start = None
+        return frame
+
+
+class RunningStats:
+    """
+    Count, min, max, mean and variance of a value stream in constant memory (Welford's algorithm).
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = 0
+        self.maximum = 0
+
+    def add(self, value):
+        self.count += 1
+        if self.count == 1:
+            self.minimum = self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def variance(self):
+        """
+        Returns:
+            float: sample variance, 0.0 for fewer than two values
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class DetectorChannel:
+    """
+    Running thickness statistics of one feeder and sensor, full and empty grippers kept apart.
+    """
+
+    __slots__ = ('full', 'empty', 'faulty', 'plc_mean', 'pending', 'start', 'end')
+
+    def __init__(self):
+        self.full = RunningStats()
+        self.empty = RunningStats()
+        self.faulty = 0
+        self.plc_mean = 0
+        self.pending = 0       # tests since the last DETECTOR_STATS frame
+        self.start = None      # first and last of these tests
+        self.end = None
+
+
+class DetectorSummary:
+    """
+    Downsamples the cyclic Double Detector Test stream of diagnostic mode.
+
+    Every test updates the statistics of its feeder and sensor; instead of one frame per test a
+    DETECTOR_STATS frame is emitted every interval tests of a feeder and sensor, or with a later
+    test once the oldest test of a feeder and sensor waited period seconds (so a feeder that is
+    tested rarely is still reported while the tests go on). Frames span the test that emits
+    them: Logic 2 needs frames in time order and never calls flush(). Tests the PLC flags as
+    faulty are still emitted individually. Statistics cover all tests since the start.
+    """
+
+    def __init__(self, interval=DETECTOR_SUMMARY_INTERVAL, period=DETECTOR_SUMMARY_PERIOD):
+        self.interval = interval
+        self.period = period
+        self.channels = {}  # (feeder, sensor) -> DetectorChannel
+        self.oldest = None  # key of the channel whose pending tests started first
+        self.last_start = None  # last test seen
+        self.last_end = None
+
+    def add(self, packet):
+        """
+        Registers a decoded DOUBLE_DETECTOR_TEST frame.
+
+        Returns:
+            AnalyzerFrame: the test itself if it is faulty, a DETECTOR_STATS frame when one is due, or None
+        """
+        fields = packet.data
+        key = (fields['feeder'], fields['sensor'])
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = self.channels[key] = DetectorChannel()
+
+        (channel.full if fields['copy_present'] else channel.empty).add(fields['thickness'])
+        channel.plc_mean = fields['mean']
+        start = packet.start_time
+        end = packet.end_time
+        if not channel.pending:
+            channel.start = start
+            if self.oldest is None:
+                self.oldest = key
+        channel.end = end
+        channel.pending += 1
+        self.last_start = start
+        self.last_end = end
+
+        if fields['faulty']:
+            channel.faulty += 1
+            return packet
+        if channel.pending >= self.interval:
+            return self.frame(key, start, end)
+        # Times are GraphTime in Logic 2: only their differences convert to seconds
+        if float(start - self.channels[self.oldest].start) >= self.period:
+            return self.frame(self.oldest, start, end)
+        return None
+
+    def frame(self, key, start, end):
+        """
+        Args:
+            key: (feeder, sensor)
+            start, end: time of the frame (the test that emits it)
+
+        Returns:
+            AnalyzerFrame: DETECTOR_STATS frame of a feeder and sensor, window_s is the time covered
+                by the tests since its previous one
+        """
+        channel = self.channels[key]
+        channel.pending = 0
+        if key == self.oldest:
+            pending = [other for other in self.channels if self.channels[other].pending]
+            self.oldest = min(pending, key=lambda other: float(self.channels[other].start - start)) if pending else None
+        full = channel.full
+        empty = channel.empty
+        return AnalyzerFrame('DETECTOR_STATS', start, end, {
+            'feeder': key[0],
+            'sensor': key[1],
+            'window_s': round(float(channel.end - channel.start), 3),
+            'tests': full.count + empty.count,
+            'faulty': channel.faulty,
+            'plc_mean': channel.plc_mean,
+            'full_count': full.count,
+            'full_min': full.minimum,
+            'full_max': full.maximum,
+            'full_mean': round(full.mean, 3),
+            'full_variance': round(full.variance(), 3),
+            'empty_count': empty.count,
+            'empty_min': empty.minimum,
+            'empty_max': empty.maximum,
+            'empty_mean': round(empty.mean, 3),
+            'empty_variance': round(empty.variance(), 3),
+        })
+
+    def flush(self):
+        """
+        Returns:
+            list: DETECTOR_STATS frames of every feeder and sensor with tests since its last frame,
+                  spanning the last test
+        """
+        return [self.frame(key, self.last_start, self.last_end)
+                for key in sorted(self.channels) if self.channels[key].pending]
+
+
 # High level analyzers must subclass the HighLevelAnalyzer class.
 class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
 
     # List of settings that a user can set for this High Level Analyzer.
     com_dir = ChoicesSetting(
-        choices=['Controller (Transmit)', 'AlphaLiner (Receive)'],
+        choices=['Controller (Transmit)', 'AlphaLiner (Receive)', 'Auto (Both Directions)'],
         label='Communication Direction',)
     show_ack = ChoicesSetting(
         choices=['Yes', 'No'],
@@ -22,37 +1105,20 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
     show_nak = ChoicesSetting(
         choices=['Yes', 'No'],
         label='Show NAK')
-
-    PACKET_LENGTHS = {
-        # PC → AlphaLiner
-        0x01: 3 + 0 + 2,   # Manual Mode
-        0x02: 3 + 0 + 2,   # Auto Mode
-        0x03: 3 + 2 + 2,   # Diagnostic Mode (D1,D2)
-        0x05: 3 + 25 + 2,  # Production Config (D1..D25)
-        0x06: 3 + 12 + 2,  # Production Order (D1..D12)
-        0x07: 3 + 0 + 2,   # Software Stop
-        0x08: 3 + 0 + 2,   # Erase Stop
-        0x10: 3 + 0 + 2,   # Request Machine Config
-        0x11: 3 + 2 + 2,   # Backup Feeder Definition
-        0x12: 3 + 3 + 2,   # Consecutive Errors
-        0x13: 3 + 2 + 2,   # Pocket/Gripper Silence
-        0x14: 3 + 2 + 2,   # Forced Reject
-        0x15: 3 + 0 + 2,   # Delete Production Data
-        0x16: 3 + 5 + 2,   # Disable Green Lights (5 bytes)
-        0x64: 3 + 2 + 2,   # Control Commands (D1,D2)
-        0x65: 3 + 7 + 2,   # Parameter Data (D1..D8)
-
-        # AlphaLiner → PC
-        0x01: 3 + 2 + 2,   # Status Message
-        0x02: 3 + 3 + 2,   # Error Message
-        0x03: 3 + 5 + 2,   # Statistic Message
-        0x04: 3 + 9 + 2,   # Copy Complete
-        0x05: 3 + 10 + 2,  # Copy Failed
-        0x06: 3 + 6 + 2,   # Machine Configuration
-        0x07: 3 + 0 + 2,   # Copy Inhibit
-        0x65: 3 + 7 + 2,   # Configuration Data Feature (same as PC→AL)
-        0x78: 3 + 6 + 2,   # Double Detector Test (D1..D6)
-    }
+    link_stats = ChoicesSetting(
+        choices=['No', 'Yes'],
+        label='Link Statistics (ACK latency, retransmissions)')
+    profiling = ChoicesSetting(
+        choices=['No', 'Yes'],
+        label='Profiling (counters and timings)')
+    method_filter = StringSetting(
+        label='Only Telegrams (e.g. COPY_FAILED, ERROR_MSG; empty = all)')
+    rollup_window = NumberSetting(
+        label='Rollup Window (seconds, 0 = one frame per telegram)',
+        min_value=0)
+    detector_frames = ChoicesSetting(
+        choices=['Statistics per Feeder', 'Every Test'],
+        label='Double Detector Test Frames')
 
     result_types = {
         # Both
@@ -62,6 +1128,25 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
         'NAK': {
             'format': 'NAK'
         },
+        'PROFILE': {
+            'format': 'PROFILE ({{data.telegrams}} telegrams, framing {{data.framing_ms}} ms, '
+                      'decoders {{data.decoders_ms}} ms, {{data.failures}} failures, {{data.resyncs}} resyncs)'
+        },
+        'LINK_EVENT': {
+            'format': '{{data.event}} {{data.seq}}𝑛'
+        },
+        'DETECTOR_STATS': {
+            'format': 'DETECTOR STATS (Feeder: {{data.feeder}}, Sensor: {{data.sensor}}, Tests: {{data.tests}}, '
+                      'Window: {{data.window_s}} s, '
+                      'Faulty: {{data.faulty}}, Full: {{data.full_mean}} [{{data.full_min}}..{{data.full_max}}] '
+                      'var {{data.full_variance}}, Empty: {{data.empty_mean}} [{{data.empty_min}}..{{data.empty_max}}] '
+                      'var {{data.empty_variance}})'
+        },
+        'ROLLUP': {
+            'format': 'ROLLUP ({{data.completed}} completed, {{data.faulty}} faulty, {{data.failed}} failed, '
+                      'Errors: {{data.errors}}, Missfeeds: {{data.missfeeds}}, Doublefeeds: {{data.doublefeeds}}, '
+                      'Active Errors: {{data.active_errors}}, NAKs: {{data.naks}}, Bad Frames: {{data.bad_frames}})'
+        },
 
         # Controller
         'MANUAL_MODE': {
@@ -70,43 +1155,78 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
         'AUTO_MODE': {
             'format': 'AUTO MODE {{data.seq}}𝑛'
         },
+        'DIAGNOSTIC_MODE': {
+            'format': 'DIAGNOSTIC MODE {{data.seq}}𝑛 (Tests: {{data.tests}}, Feeder: {{data.feeder}})'
+        },
         'STOP': {
             'format': 'STOP {{data.seq}}𝑛'
         },
         'ERASE_STOP': {
             'format': 'ERASE STOP {{data.seq}}𝑛'
         },
-        'AUTO_MODE': {
-            'format': 'AUTO MODE {{data.seq}}𝑛'
-        },
         'PROD_CONFIG': {
-            'format': 'PRODUCT CONFIG {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'PRODUCT CONFIG {{data.seq}}𝑛 (Feeder: {{data.feeders}} DoubleFeed: {{data.doublefeed}} Missfeed: {{data.missfeed}} Backup: {{data.backup}} LowLevel: {{data.low_level}})'
         },
         'PROD_ORDER': {
-            'format': 'PRODUCT ORDER {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'PRODUCT ORDER {{data.seq}}𝑛 (CopyID: {{data.copy_id}}, Inserts: {{data.inserts}} Reserved: {{data.reserved}}, Copies: {{data.copies}})'
+        },
+        'REQUEST_CONFIG': {
+            'format': 'REQUEST CONFIG {{data.seq}}𝑛'
+        },
+        'BACKUP_FEEDER': {
+            'format': 'BACKUP FEEDER {{data.seq}}𝑛 (Master: {{data.master}}, Backup: {{data.backup}})'
         },
         'CONSECUTIVE_ERRORS': {
-            'format': 'CONSECUTIVE ERRORS {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'CONSECUTIVE ERRORS {{data.seq}}𝑛 (Type: {{data.control}}, Feeder: {{data.feeder_label}}, Count: {{data.count}})'
+        },
+        'SILENCE': {
+            'format': 'SILENCE {{data.seq}}𝑛 ({{data.target}}: {{data.number}} ({{data.state}}))'
+        },
+        'FORCED_REJECT': {
+            'format': 'FORCED REJECT {{data.seq}}𝑛 (CopyID: {{data.copy_id}})'
+        },
+        'DELETE_PROD_DATA': {
+            'format': 'DELETE PRODUCTION DATA {{data.seq}}𝑛'
+        },
+        'DISABLE_GREEN_LIGHTS': {
+            'format': 'DISABLE GREEN LIGHTS {{data.seq}}𝑛 (Disabled: {{data.disabled}})'
+        },
+        'CONTROL_COMMANDS': {
+            'format': 'CONTROL COMMANDS {{data.seq}}𝑛 ({{data.commands}})'
+        },
+        'PARAMETER_DATA': {
+            'format': 'PARAMETER DATA {{data.seq}}𝑛 (DataID: {{data.data_id}}, Data: {{data.values}})'
         },
 
         # AlphaLiner
         'STATUS_MSG': {
-            'format': 'STATUS MSG {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'STATUS MSG {{data.seq}}𝑛 (Mode: {{data.mode}}, ReadyToGo: {{data.ready_to_go}}, DataReady: {{data.data_ready}})'
         },
         'ERROR_MSG': {
-            'format': 'ERROR MSG {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'ERROR MSG {{data.seq}}𝑛 ({{data.state}} - Fault: {{data.fault}}, Cause: {{data.cause}}, Priority: {{data.priority}})'
         },
         'STATISTIC_MSG': {
-            'format': 'STATISTIC MSG {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'STATISTIC MSG {{data.seq}}𝑛 (CopyID: {{data.copy_id}} ({{data.error_name}}), {{data.location_kind}}: {{data.location}})'
         },
         'COPY_COMPLETE': {
-            'format': 'COPY COMPLETE {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'COPY COMPLETE {{data.seq}}𝑛 (CopyID: {{data.copy_id}} ({{data.status}}), Gripper: {{data.gripper}}, Inserts: {{data.inserts}})'
         },
         'COPY_FAILED': {
-            'format': 'COPY FAILED {{data.seq}}𝑛 ({{data.info}})'
+            'format': 'COPY FAILED {{data.seq}}𝑛 (CopyID: {{data.copy_id}} ({{data.error_name}}), {{data.location_kind}}: {{data.location}}, Inserts: {{data.inserts}})'
         },
-        'UNKNOWN': {
-            'format': 'Unknown Packet ({{data.info}})'
+        'MACHINE_CONFIG': {
+            'format': 'MACHINE CONFIG {{data.seq}}𝑛 (Feeders: {{data.feeders}}, Double Detectors: {{data.detectors}})'
+        },
+        'COPY_INHIBIT': {
+            'format': 'COPY INHIBIT {{data.seq}}𝑛'
+        },
+        'CONFIG_DATA': {
+            'format': 'CONFIG DATA {{data.seq}}𝑛 (DataID: {{data.data_id}} {{data.kind}}, {{data.details}})'
+        },
+        'DOUBLE_DETECTOR_TEST': {
+            'format': 'DOUBLE DETECTOR TEST {{data.seq}}𝑛 (Feeder: {{data.feeder}}, Sensor: {{data.sensor}}, '
+                      'Copy: {{data.copy_present}}, Thickness: {{data.thickness}}, Mean: {{data.mean}}, '
+                      'Faulty: {{data.faulty}})'
         },
 
         # Unknown
@@ -116,16 +1236,42 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
     }
 
     def __init__(self):
-        self.buffer = []
-        self.packet_start_time = None
-        self.expected_length = None
+        # Instrumentation replaces decode on this instance only, so it costs nothing when disabled
+        self.profile = DecodeProfile() if self.profiling == 'Yes' else None
+        if self.profile is not None:
+            self.decode = self._decode_profiled
+
         self.controller_side = (self.com_dir == 'Controller (Transmit)')
+        if self.com_dir == 'Auto (Both Directions)':
+            # One dispatch table per sender; the framer cannot know the length before the sender
+            self.direction = AUTO
+            self.classifier = DirectionClassifier(TELEGRAM_TABLES)
+            selected = parse_auto_method_filter(self.method_filter, TELEGRAM_TABLES)
+            self.dispatch = {direction: self.compile_dispatch(table, selected.get(direction) if selected else None)
+                             for direction, table in TELEGRAM_TABLES.items()}
+            self.telegrams = None
+            self.framer = TelegramFramer({}, etx_bcc=self.classifier.lengths)
+        else:
+            self.direction = CONTROLLER if self.controller_side else ALPHALINER
+            self.classifier = None
+            table = TELEGRAM_TABLES[self.direction]
+            self.telegrams = self.compile_dispatch(table, parse_method_filter(self.method_filter, table))
+            self.framer = TelegramFramer({method: entry[0] for method, entry in self.telegrams.items()})
         self.should_show_ack = (self.show_ack == 'Yes')
         self.should_show_nak = (self.show_nak == 'Yes')
+        if self.link_stats != 'Yes':
+            self.link = None
+        else:
+            self.link = DuplexLinkTracker() if self.classifier is not None else LinkTracker()
+        self.rollup = RollupWindow(float(self.rollup_window)) if self.rollup_window else None
+        # Rollups already replace the per-telegram frames
+        summarize = (self.direction != CONTROLLER and self.rollup is None
+                     and self.detector_frames != 'Every Test')
+        self.detector = DetectorSummary() if summarize else None
 
     def get_status_msg(self, data_bytes):
         """
-        Converts the first two status bytes to human-readable format.
+        Decodes the two status bytes.
         
         D1: First status byte bit definitions:
             Bit 0 = 0 AND bit 1 = 0: mode = NotDefined
@@ -135,54 +1281,27 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
             Bit 2 = 1: ReadyToGo
         
         D2: Second status byte bit definitions:
-            Bit 0 = 1: [definition appears cut off in your message]
+            Bit 0 = 1: end of the configuration data (Data Ready bit)
         
         Args:
-            data_bytes: list of data bytes from the packet
+            data_bytes: data bytes from the packet
         
         Returns:
-            string: human-readable status message
+            dict: mode, ready_to_go, data_ready
         """
-        if len(data_bytes) < 2:
-            return "Insufficient status data"
-        
         d1 = data_bytes[0] & 0x7F  # Remove MSB, keep 7 bits
         d2 = data_bytes[1] & 0x7F  # Remove MSB, keep 7 bits
-        
-        # Decode D1 (first status byte)
-        bit0 = d1 & 0x01  # Bit 0
-        bit1 = (d1 & 0x02) >> 1  # Bit 1
-        bit2 = (d1 & 0x04) >> 2  # Bit 2
-        
-        # Determine mode from bits 0 and 1
-        if bit0 == 0 and bit1 == 0:
-            mode = "NotDefined"
-        elif bit0 == 1 and bit1 == 0:
-            mode = "Manual"
-        elif bit0 == 0 and bit1 == 1:
-            mode = "Automatic"
-        elif bit0 == 1 and bit1 == 1:
-            mode = "Diagnosis"
-        
-        # Check ReadyToGo status
-        ready_to_go = "ReadyToGo" if bit2 == 1 else "NotReady"
-        
-        # Decode D2 (second status byte)
-        d2_bit0 = d2 & 0x01
-        # Add more D2 bit definitions as needed when you provide the complete definition
-        
-        # Build status message
-        status_parts = [mode, ready_to_go]
-        
-        if d2_bit0 == 1:
-            status_parts.append("DataReady")
-        
-        return ", ".join(status_parts)
+
+        return {
+            'mode': STATUS_MODES[d1 & 0x03],  # Bits 0 and 1
+            'ready_to_go': (d1 & 0x04) != 0,  # Bit 2
+            'data_ready': (d2 & 0x01) != 0,   # Bit 0
+        }
 
 
     def get_error_msg(self, data_bytes):
         """
-        Converts the first three error bytes to human-readable format.
+        Decodes the three error bytes.
         
         D1: Fault (Value between 0..99)
         D2: Cause (Value between 0..99) 
@@ -193,251 +1312,159 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
         - If all three values are 0, the entire fault pool is cleared
         
         Args:
-            data_bytes: list of data bytes from the packet
+            data_bytes: data bytes from the packet
         
         Returns:
-            string: human-readable error message
+            dict: fault, cause, priority, state
         """
-        if len(data_bytes) < 3:
-            return "Insufficient error data"
-        
         d1_fault = data_bytes[0] & 0x7F  # Remove MSB, keep 7 bits (0..99)
         d2_cause = data_bytes[1] & 0x7F  # Remove MSB, keep 7 bits (0..99)
         d3_priority = data_bytes[2] & 0x7F  # Remove MSB, keep 7 bits (0..99)
-        
+
         # Check special cases
         if d1_fault == 0 and d2_cause == 0 and d3_priority == 0:
-            return "Cleared All Faults"
+            state = 'Cleared All Faults'
         elif d3_priority == 0:
-            return f"Error cleared - Fault: {d1_fault}, Cause: {d2_cause}, Priority: {d3_priority}"
+            state = 'Error Cleared'
         else:
-            return f"Fault: {d1_fault}, Cause: {d2_cause}, Priority: {d3_priority}"
+            state = 'Error'
+
+        return {'fault': d1_fault, 'cause': d2_cause, 'priority': d3_priority, 'state': state}
 
 
     def get_statistic_msg(self, data_bytes):
         """
-        Converts the first five statistic bytes to human-readable format.
+        Decodes the five statistic bytes.
         
         D1: Error type (0-14)
         D2..D3: Error Location (depends on error type)
         D4..D5: CopyID (1-8191)
         
         Args:
-            data_bytes: list of data bytes from the packet
+            data_bytes: data bytes from the packet
         
         Returns:
-            string: human-readable statistic message
+            dict: copy_id, error_type, error_name, location_kind, location
         """
-        if len(data_bytes) < 5:
-            return "Insufficient statistic data"
-        
         d1_error = data_bytes[0] & 0x7F  # Remove MSB, keep 7 bits
         d2_location_high = data_bytes[1] & 0x7F  # Remove MSB, keep 7 bits
         d3_location_low = data_bytes[2] & 0x7F  # Remove MSB, keep 7 bits
         d4_copy_high = data_bytes[3] & 0x7F  # Remove MSB, keep 7 bits
         d5_copy_low = data_bytes[4] & 0x7F  # Remove MSB, keep 7 bits
-        
-        # Error type mapping
-        error_types = {
-            0: "Other Errors",
-            1: "Missfeed",
-            2: "Doublefeed", 
-            3: "Opening Error",
-            4: "Profile Error",
-            5: "Defective Pocket",
-            6: "Defective Gripper",
-            7: "Maximum Number of Repair Attempts",
-            8: "Gap Errors",
-            9: "Controlled Forced Reject",
-            10: "Wrongfeed",
-            11: "Clutch",
-            12: "Package Removed from Gripper Chain",
-            13: "Mode Change",
-            14: "Empty Pocket Error"
-        }
-        
-        error_name = error_types.get(d1_error, f"Unknown Error ({d1_error})")
-        
+
         # Combine D2..D3 for error location
         error_location = (d2_location_high << 7) | d3_location_low
-        
-        # Combine D4..D5 for CopyID
-        copy_id = (d4_copy_high << 7) | d5_copy_low
-        
-        # Format location based on error type
-        if d1_error in [1, 2, 10]:  # Missfeed, Doublefeed, Wrongfeed
-            location_str = f"Feeder: {error_location}"
-        elif d1_error in [3, 5, 14]:  # Opening Error, Defective Pocket, Empty Pocket Error
-            location_str = f"Pocket: {error_location}"
-        elif d1_error in [4, 6, 12]:  # Profile Error, Defective Gripper, Package Removed
-            location_str = f"Gripper: {error_location}"
-        elif d1_error == 11:  # Clutch
-            if error_location == 99:
-                location_str = "Location: Pocket Wheel / Jacket Feeder"
-            else:
-                location_str = f"Insert Feeder Module: {error_location}"
-        else:
-            location_str = f"Location: {error_location}"
-        
-        return f"CopyID: {copy_id} ({error_name}), {location_str}"
 
+        # Format location based on error type
+        location_kind = ERROR_LOCATION_KINDS.get(d1_error, 'Location')
+        if d1_error == 11 and error_location == 99:  # Clutch of the pocket wheel
+            location_kind = 'Pocket Wheel / Jacket Feeder'
 
-    def get_bit_positions(self, number, num_bits=31):
-        """
-        Returns a comma-separated string of bit positions that contain '1' 
-        in the first num_bits of the number (0-indexed from the right).
-        
-        Args:
-            number: integer to analyze
-            num_bits: number of bits to check from the right (default 31)
-        
-        Returns:
-            string: comma-separated positions of '1' bits
-        """
-        positions = []
-        
-        # Check each bit position from 0 to num_bits-1
-        for i in range(num_bits):
-            if number & (1 << i):  # Check if bit at position i is set
-                if i == 0:
-                    positions.append('P')  # Replace position 0 with 'P'
-                else:
-                    positions.append(str(i))
-        
-        return ','.join(reversed(positions)) if positions else '0'
+        return {
+            'copy_id': (d4_copy_high << 7) | d5_copy_low,  # Combine D4..D5 for CopyID
+            'error_type': d1_error,
+            'error_name': ERROR_TYPES.get(d1_error, 'Unknown Error'),
+            'location_kind': location_kind,
+            'location': error_location,
+        }
 
 
     def get_copy_complete_msg(self, data_bytes):
         """
-        Converts the first nine bytes to human-readable format for copy complete/failed messages.
+        Decodes the nine bytes of a copy complete message.
         
         D1..D2: CopyID (1-8191) with good/faulty indication
         D3..D4: Gripper number (1-4095)
         D5..D9: Table of available inserts
         
         Args:
-            data_bytes: list of data bytes from the packet
+            data_bytes: data bytes from the packet
         
         Returns:
-            string: human-readable copy complete message
+            dict: copy_id, good, status, gripper, insert_mask, inserts
         """
-        if len(data_bytes) < 9:
-            return "Insufficient copy data"
-        
         # D1..D2: CopyID with good/faulty indication
         d1 = data_bytes[0] & 0x7F  # Remove MSB, keep 7 bits
         d2 = data_bytes[1] & 0x7F  # Remove MSB, keep 7 bits
-        
-        # Check bit 6 of D1 for good/faulty indication (before masking)
-        is_good_copy = (data_bytes[0] & 0x40) != 0  # Bit 6
-        
-        # Extract CopyID (6 highest bits from D1, 7 lowest bits from D2)
-        copy_id_high = d1 & 0x3F  # Keep only lower 6 bits of D1
-        copy_id = (copy_id_high << 7) | d2
-        
-        # D3..D4: Gripper number
+
+        # Check bit 6 of D1 for good/faulty indication
+        is_good_copy = (d1 & 0x40) != 0
+
+        # D3..D4: Gripper number (5 highest bits from D3, 7 lowest bits from D4)
         d3 = data_bytes[2] & 0x7F  # Remove MSB, keep 7 bits
         d4 = data_bytes[3] & 0x7F  # Remove MSB, keep 7 bits
+
+        # D5..D9: Table of available inserts
+        insert_mask, inserts = self.get_table(data_bytes, 4)
+
+        return {
+            'copy_id': ((d1 & 0x3F) << 7) | d2,  # 6 highest bits from D1, 7 lowest bits from D2
+            'good': is_good_copy,
+            'status': 'Good' if is_good_copy else 'Faulty',
+            'gripper': ((d3 & 0x1F) << 7) | d4,
+            'insert_mask': insert_mask,
+            'inserts': inserts,
+        }
+
+
+    def get_table(self, data_bytes, start_index=0):
+        """
+        Decodes the 5-byte feeder/insert table starting at start_index.
+        Results are cached on the raw D-bytes since tables repeat from copy to copy.
         
-        # Extract gripper number (5 highest bits from D3, 7 lowest bits from D4)
-        gripper_high = d3 & 0x1F  # Keep only lower 5 bits of D3
-        gripper_number = (gripper_high << 7) | d4
-        
-        # D5..D9: Table of available inserts (5 bytes)
-        insert_bytes = []
-        for i in range(4, 9):  # D5 through D9 (indices 4-8)
-            insert_bytes.append(data_bytes[i] & 0x7F)  # Remove MSB from each
-        
-        # Concatenate the 7-bit values into a single 35-bit number for insert table
-        insert_table = 0
-        for val in insert_bytes:
-            insert_table = (insert_table << 7) | val
-        
-        # Convert to binary and get bit positions for inserts
-        insert_positions = self.get_bit_positions(insert_table)
-        
-        # Build the message
-        copy_status = "Good" if is_good_copy else "Faulty"
+        Args:
+            data_bytes: data bytes from the packet
+            start_index: starting index in the list (default 0)
         
-        return f"CopyID: {copy_id} ({copy_status}), Gripper: {gripper_number}, Inserts: {insert_positions}"
+        Returns:
+            tuple: (35-bit table value, comma-separated bit positions)
+        """
+        return decode_table(bytes(data_bytes[start_index:start_index + 5]))
 
 
     def format_hp_binary(self, data_bytes, start_index=0):
         """
-        Takes 5 bytes from data_bytes starting at start_index,
-        removes MSB from each (keeps 7 bits), concatenates them,
-        and formats as binary with 'HP' prefix for leading bit if it's 1.
+        Takes 5 bytes from data_bytes starting at start_index and formats
+        the feeder/insert table as a list of bit positions.
         
         Args:
             data_bytes: list of bytes
             start_index: starting index in the list (default 0)
         
         Returns:
-            string: formatted binary representation
+            string: formatted bit positions
         """
         if len(data_bytes) < start_index + 5:
             return "Insufficient data"
-        
-        # Extract 5 bytes and remove MSB (keep 7 bits each)
-        seven_bit_values = []
-        for i in range(5):
-            byte_val = data_bytes[start_index + i] & 0x7F  # Remove MSB
-            seven_bit_values.append(byte_val)
-        
-        # Concatenate the 7-bit values into a single 35-bit number
-        concatenated = 0
-        for val in seven_bit_values:
-            concatenated = (concatenated << 7) | val
-        
-        return self.get_bit_positions(concatenated, 31)
-
 
-    def get_control_type(self, control_code):
-        control_types = {
-            0x00: 'Missfeed',
-            0x01: 'DoubleFeed',
-            0x02: 'Opening',
-            0x03: 'Profile',
-            0x04: 'Tolerance',
-            0x05: 'Gap'
-        }
-        return control_types.get(control_code, 'Unknown Control')
+        return self.get_table(data_bytes, start_index)[1]
 
 
-    def get_bit_positions(self, number, num_bits=31):
+    def get_bit_positions(self, number, num_bits=TABLE_BITS):
         """
         Returns a comma-separated string of bit positions that contain '1' 
         in the first num_bits of the number (0-indexed from the right).
+        Position 0 is shown as 'J' (Jacket).
         
         Args:
             number: integer to analyze
             num_bits: number of bits to check from the right (default 31)
         
         Returns:
-            string: comma-separated positions of '1' bits
+            string: comma-separated positions of '1' bits, highest first
         """
-        positions = []
-        
-        # Check each bit position from 0 to num_bits-1
-        for i in range(num_bits):
-            if number & (1 << i):  # Check if bit at position i is set
-                if i == 0:
-                    positions.append('J')  # Replace position 0 with 'J'
-                else:
-                    positions.append(str(i))
-        
-        return ','.join(reversed(positions)) if positions else 'CEALR'
+        return render_table_positions(number & ((1 << num_bits) - 1))
 
 
     def get_copy_id(self, data_bytes, start_index=0):
         """
-        Takes the first two bytes from self.buffer, removes MSB from each (keeps 7 bits),
+        Takes two bytes from data_bytes starting at start_index, removes MSB from each (keeps 7 bits),
         and combines them into a single number.
         
         Returns:
             int: combined 14-bit number from the two 7-bit values, or 0 if insufficient data
         """
-        if len(self.buffer) < 2:
+        if len(data_bytes) < start_index + 2:
             return 0
         
         # Get first two bytes and remove MSB (keep 7 bits each)
@@ -452,13 +1479,13 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
 
     def get_count(self, data_bytes, start_index=0):
         """
-        Takes the first two bytes from self.buffer, removes MSB from each (keeps 7 bits),
+        Takes four bytes from data_bytes starting at start_index, removes MSB from each (keeps 7 bits),
         and combines them into a single number.
         
         Returns:
-            int: combined 14-bit number from the two 7-bit values, or 0 if insufficient data
+            int: combined 28-bit number from the four 7-bit values, or 0 if insufficient data
         """
-        if len(self.buffer) < 4:
+        if len(data_bytes) < start_index + 4:
             return 0
         
         # Get first two bytes and remove MSB (keep 7 bits each)
@@ -473,145 +1500,440 @@ class AlphaLinerSerialAnalyzer(HighLevelAnalyzer):
         return count
 
 
-    def handle_packet(self, method, seq, data_bytes, start, end):
-        if self.controller_side:
-            if method == 0x01:
-                return AnalyzerFrame('MANUAL_MODE', start, end, {'seq': seq})
-            elif method == 0x02:
-                return AnalyzerFrame('AUTO_MODE', start, end, {'seq': seq})
-            elif method == 0x05:
-                info = "Feeder: {} DoubleFeed: {} Missfeed: {} Backup: {} LowLevel: {}".format(
-                    self.format_hp_binary(data_bytes, 0),
-                    self.format_hp_binary(data_bytes, 5),
-                    self.format_hp_binary(data_bytes, 10),
-                    self.format_hp_binary(data_bytes, 15),
-                    self.format_hp_binary(data_bytes, 20)
-                )
-                return AnalyzerFrame('PROD_CONFIG', start, end, {'seq': seq, 'info': info})
-            elif method == 0x06:  # Product Order
-                info = "CopyID: {}, Inserts: {} Reserved: {}, Copies: {}".format(
-                    self.get_copy_id(data_bytes),
-                    self.format_hp_binary(data_bytes, 2),
-                    data_bytes[7] & 0x7F,
-                    self.get_count(data_bytes, 8)
-                )
-                return AnalyzerFrame('PROD_ORDER', start, end, {
-                    'seq': seq,
-                    'info': info
-                })
-            elif method == 0x07:  # Stop
-                return AnalyzerFrame('STOP', start, end, {'seq': seq})
-            elif method == 0x08:  # Erase Stop
-                return AnalyzerFrame('ERASE_STOP', start, end, {'seq': seq})
-            elif method == 0x0C:  # Consecutive Errors
-                info = "Type: {}, Feeder: {}, Count: {}".format(
-                    self.get_control_type(data_bytes[0] & 0x7F),
-                    (lambda v: ("ALL" if v == 99 else ("J" if v == 0 else v))) (data_bytes[1] & 0x7F),
-                    data_bytes[2] & 0x7F
-                )
-                return AnalyzerFrame('CONSECUTIVE_ERRORS', start, end, {
-                    'seq': seq,
-                    'info': info
-                })
+    def get_copy_failed_msg(self, data_bytes):
+        """
+        Faulty copy feedback: D1..D5 as in the statistic message, D6..D10 table of the current inserts.
+        """
+        fields = self.get_statistic_msg(data_bytes)
+        fields['insert_mask'], fields['inserts'] = self.get_table(data_bytes, 5)
+        return fields
+
+
+    def get_prod_config_msg(self, data_bytes):
+        """
+        Production configuration: five 5-byte feeder tables (ON/OFF, Doublefeed, Missfeed, Backup, Low Level).
+        """
+        fields = {}
+        for index, name in enumerate(PROD_CONFIG_TABLES):
+            fields[name + '_mask'], fields[name] = self.get_table(data_bytes, index * 5)
+        return fields
+
+
+    def get_prod_order_msg(self, data_bytes):
+        """
+        Production order: D1..D2 CopyID, D3..D7 selective inserts, D8 reserved, D9..D12 number of copies.
+        """
+        insert_mask, inserts = self.get_table(data_bytes, 2)
+        return {
+            'copy_id': self.get_copy_id(data_bytes),
+            'insert_mask': insert_mask,
+            'inserts': inserts,
+            'reserved': data_bytes[7] & 0x7F,
+            'copies': self.get_count(data_bytes, 8),
+        }
+
+
+    def get_consecutive_errors_msg(self, data_bytes):
+        """
+        Number of consecutive errors: D1 control type, D2 feeder (0 = Jacket, 99 = all), D3 allowed errors.
+        """
+        control_type = data_bytes[0] & 0x7F
+        feeder = data_bytes[1] & 0x7F
+        return {
+            'control_type': control_type,
+            'control': CONTROL_TYPES.get(control_type, 'Unknown Control'),
+            'feeder': feeder,
+            'feeder_label': 'ALL' if feeder == 99 else ('J' if feeder == 0 else str(feeder)),
+            'count': data_bytes[2] & 0x7F,
+        }
+
+
+    def get_diagnostic_mode_msg(self, data_bytes):
+        """
+        Diagnostic mode: D1 test selection bits, D2 feeder number for the double detector test.
+        """
+        d1 = data_bytes[0] & 0x7F
+        tests = [name for bit, name in enumerate(DIAGNOSTIC_TESTS) if d1 & (1 << bit)]
+        return {'test_bits': d1, 'tests': ','.join(tests) if tests else 'None', 'feeder': data_bytes[1] & 0x7F}
+
+
+    def get_backup_feeder_msg(self, data_bytes):
+        """
+        Backup feeder definition: D1 master feeder, D2 backup feeder.
+        """
+        return {'master': data_bytes[0] & 0x7F, 'backup': data_bytes[1] & 0x7F}
+
+
+    def get_silence_msg(self, data_bytes):
+        """
+        Pocket/gripper silence: D1 bit 6 defective/repaired, bit 5 gripper/pocket,
+        remaining bits of D1..D2 the number (0 = all).
+        """
+        d1 = data_bytes[0] & 0x7F
+        return {
+            'target': 'Gripper' if d1 & 0x20 else 'Pocket',
+            'number': ((d1 & 0x1F) << 7) | (data_bytes[1] & 0x7F),
+            'defective': (d1 & 0x40) != 0,
+            'state': 'Defective' if d1 & 0x40 else 'Repaired',
+        }
+
+
+    def get_forced_reject_msg(self, data_bytes):
+        """
+        Forced reject: D1..D2 CopyID of the copy to reject.
+        """
+        return {'copy_id': self.get_copy_id(data_bytes)}
+
+
+    def get_green_lights_msg(self, data_bytes):
+        """
+        Disable green lights: D1..D5 feeder table, a set bit disables the light.
+        """
+        disabled_mask, disabled = self.get_table(data_bytes, 0)
+        return {'disabled_mask': disabled_mask, 'disabled': disabled}
+
+
+    def get_control_commands_msg(self, data_bytes):
+        """
+        Control commands: D1/D2 command bits.
+        """
+        d1 = data_bytes[0] & 0x7F
+        d2 = data_bytes[1] & 0x7F
+        commands = [name for bit, name in enumerate(CONTROL_COMMANDS) if d1 & (1 << bit)]
+        if d2 & 0x01:
+            commands.append('Burn Config')
+        return {'d1': d1, 'd2': d2, 'commands': ', '.join(commands) if commands else 'None'}
+
+
+    def get_parameter_data_msg(self, data_bytes):
+        """
+        Parameter data: D1 DataID, D2..D8 configuration data (7-bit values).
+        """
+        return {
+            'data_id': data_bytes[0] & 0x7F,
+            'values': ' '.join(str(b & 0x7F) for b in data_bytes[1:8]),
+        }
+
+
+    def get_machine_config_msg(self, data_bytes):
+        """
+        Machine configuration: D1 number of feeders, D2..D6 table of the existing double detectors.
+        """
+        detectors_mask, detectors = self.get_table(data_bytes, 1)
+        return {'feeders': data_bytes[0] & 0x7F, 'detectors_mask': detectors_mask, 'detectors': detectors}
+
+
+    def get_config_data_msg(self, data_bytes):
+        """
+        Configuration data: D1 DataID, D2..D8 values. Feeder distances (IDs 0..30) and the
+        identification IDs (100..104) are decoded into fields, other IDs only show the values.
+        """
+        data_id = data_bytes[0] & 0x7F
+        values = [b & 0x7F for b in data_bytes[1:8]]
+        if data_id <= 30:
+            kind, layout = f'Feeder {data_id}', CONFIG_FEEDER_FIELDS
         else:
-            if method == 0x01:
-                return AnalyzerFrame('STATUS_MSG', start, end, {'seq': seq, 'info': self.get_status_msg(data_bytes)})
-            elif method == 0x02:
-                return AnalyzerFrame('ERROR_MSG', start, end, {'seq': seq, 'info': self.get_error_msg(data_bytes)})
-            elif method == 0x03:  # Statistic Message
-                return AnalyzerFrame('STATISTIC_MSG', start, end, {'seq': seq, 'info': self.get_statistic_msg(data_bytes)})
-            elif method == 0x04:  # Copy Complete
-                return AnalyzerFrame('COPY_COMPLETE', start, end, {'seq': seq, 'info': self.get_copy_complete_msg(data_bytes)})
-            elif method == 0x05:  # Copy Failed
-                info = "{}, Inserts: {}".format(self.get_statistic_msg(data_bytes), self.format_hp_binary(data_bytes, 5))
-                return AnalyzerFrame('COPY_FAILED', start, end, {'seq': seq, 'info': info})
+            kind, layout = CONFIG_DATA_FIELDS.get(data_id, ('Parameter', ()))
+
+        fields = {'data_id': data_id, 'kind': kind, 'values': ' '.join(str(v) for v in values)}
+        details = []
+        for name, first, length in layout:
+            value = 0
+            for v in values[first - 2:first - 2 + length]:
+                value = (value << 7) | v
+            fields[name] = value
+            details.append(f"{name}: {value}")
+        fields['details'] = ', '.join(details) if details else fields['values']
+        return fields
+
+
+    def get_double_detector_test_msg(self, data_bytes):
+        """
+        Double detector test: D1 feeder (bits 0..4), copy present (bit 5) and sensor (bit 6),
+        D2..D3 thickness measurement, D4..D5 calculated mean (of the full or the empty gripper),
+        D6 bit 0 faulty copy detected by the PLC.
+        """
+        d1 = data_bytes[0] & 0x7F
+        return {
+            'feeder': d1 & 0x1F,
+            'sensor': (d1 >> 6) & 0x01,
+            'copy_present': (d1 & 0x20) != 0,
+            'thickness': self.get_copy_id(data_bytes, 1),
+            'mean': self.get_copy_id(data_bytes, 3),
+            'faulty': (data_bytes[5] & 0x01) != 0,
+        }
+
+
+    def get_raw_data_msg(self, data_bytes):
+        """
+        Fallback for telegrams whose fields are not decoded yet: the 7-bit data values.
+        """
+        return {'values': ' '.join(str(b & 0x7F) for b in data_bytes)}
+
+
+    def compile_dispatch(self, table, selected=None):
+        """
+        Binds the decoder names of a compiled telegram table to this instance.
+
+        Methods outside the selection keep their packet length (they are still framed and
+        BCC-checked) but get neither a frame type nor a decoder, so they never produce a frame.
+
+        Args:
+            table: {method: (packet_length, frame_type, decoder_name)} from TELEGRAM_TABLES
+            selected: methods to decode (None = all)
+
+        Returns:
+            dict: {method: (packet_length, frame_type or None, bound decoder or None)}
+        """
+        profile = self.profile
+        dispatch = {}
+        for method, (length, frame_type, decoder) in table.items():
+            if selected is not None and method not in selected:
+                dispatch[method] = (length, None, None)
+                continue
+            bound = getattr(self, decoder) if decoder else None
+            if bound is not None and profile is not None:
+                bound = profile.wrap(decoder, bound)
+            dispatch[method] = (length, frame_type, bound)
+        return dispatch
+
+
+    def handle_packet(self, method, seq, data_bytes, start, end, telegrams=None):
+        entry = (self.telegrams if telegrams is None else telegrams).get(method)
+        if entry is None:
+            return AnalyzerFrame('UNKNOWN', start, end, {'info': f'Method {method} not implemented'})
+
+        _, frame_type, decoder = entry
+        if frame_type is None:  # filtered out by the method_filter setting
+            return None
+        if decoder is None:
+            return AnalyzerFrame(frame_type, start, end, {'seq': seq})
 
-        return AnalyzerFrame('UNKNOWN', start, end, {'info': f'Method {method} not implemented'})
+        fields = decoder(data_bytes)
+        fields['seq'] = seq
+        packet = AnalyzerFrame(frame_type, start, end, fields)
+        if self.detector is not None and frame_type == 'DOUBLE_DETECTOR_TEST':
+            return self.detector.add(packet)
+        return packet
 
 
+    @staticmethod
     def compute_bcc(payload):
         bcc = 0
         for b in payload:
             bcc ^= b
 
         # Apply reserved-character increment rule
-        if bcc in (0x00, 0x02, 0x03, 0x06, 0x15):
-            bcc = (bcc + 1) & 0xFF
-
-        return bcc
+        return BCC_FIXUP[bcc]
 
 
     def decode(self, frame: AnalyzerFrame):
 
-        if frame.type == "data" and "data" in frame.data:
-            byte = frame.data["data"][0]
+        if frame.type != "data" or "data" not in frame.data:
+            return None
+
+        byte = frame.data["data"][0]
 
-        start_time = frame.start_time
-        end_time = frame.end_time
+        framer = self.framer
 
         # ACK / NAK handling
-        if byte == ACK:
-            return AnalyzerFrame('ACK', start_time, end_time, None) if self.should_show_ack else None
+        if byte == ACK or byte == NAK:
+            return self.present_ack(FRAME_ACK if byte == ACK else FRAME_NAK, frame.start_time, frame.end_time,
+                                    framer.count != 0)
 
-        if byte == NAK:
-            return AnalyzerFrame('NAK', start_time, end_time, None) if self.should_show_nak else None
+        result = framer.feed(byte, frame.start_time)
+        if result == FRAME_PENDING:
+            return None
 
-        # Start of packet
-        if byte == STX:
-            self.buffer = [byte]
-            self.packet_start_time = start_time
-            self.expected_length = None
+        if result == FRAME_OK:
+            return self.present_telegram(framer.seq, framer.method, framer.data, framer.start_time, frame.end_time)
+        return self.present_error(result, framer.error_info(result), frame.start_time, frame.end_time)
+
+
+    def iter_framed(self, input_frames):
+        """
+        Framing stage on its own: the same byte handling as decode, without building frames.
+
+        The framed stream depends only on the capture and the direction, so it can be kept and
+        presented again (present) with other display settings without re-framing the bytes.
+
+        Args:
+            input_frames: low level serial frames
+
+        Yields:
+            tuple: (result, start, end, seq, method, data, interrupted), one per
+                   - ACK/NAK: FRAME_ACK/FRAME_NAK, seq and method 0, data None, interrupted True when it
+                     arrived inside an unfinished telegram (see present_ack)
+                   - valid telegram: FRAME_OK, seq/method from C1/C2, data the D bytes
+                   - framing error: the FRAME_* failure, seq and method 0, data the error description
+                   interrupted is False for telegrams and framing errors
+        """
+        framer = self.framer
+        feed = framer.feed
+        for frame in input_frames:
+            if frame.type != "data" or "data" not in frame.data:
+                continue
+            byte = frame.data["data"][0]
+            if byte == ACK or byte == NAK:
+                yield (FRAME_ACK if byte == ACK else FRAME_NAK, frame.start_time, frame.end_time,
+                       0, 0, None, framer.count != 0)
+                continue
+            result = feed(byte, frame.start_time)
+            if result == FRAME_PENDING:
+                continue
+            if result == FRAME_OK:
+                yield (FRAME_OK, framer.start_time, frame.end_time, framer.seq, framer.method, bytes(framer.data),
+                       False)
+            else:
+                yield (result, frame.start_time, frame.end_time, 0, 0, framer.error_info(result), False)
+
+
+    def present(self, event):
+        """
+        Presentation stage: turns one framed event from iter_framed into frames.
+
+        Returns:
+            AnalyzerFrame, list of AnalyzerFrame or None, like decode
+        """
+        result, start, end, seq, method, data, interrupted = event
+        if result == FRAME_OK:
+            return self.present_telegram(seq, method, data, start, end)
+        if result == FRAME_ACK or result == FRAME_NAK:
+            return self.present_ack(result, start, end, interrupted)
+        return self.present_error(result, data, start, end)
+
+
+    def present_ack(self, result, start, end, interrupted=False):
+        """
+        Args:
+            interrupted: the ACK/NAK arrived inside an unfinished telegram, it answers a telegram
+                that was cut short or lost its ETX (the framer drops it without an error)
+        """
+        kind = 'ACK' if result == FRAME_ACK else 'NAK'
+        if self.classifier is not None:
+            self.classifier.on_ack(kind)
+        latency = None
+        if self.link is not None:
+            if interrupted:
+                self.link.on_error()
+            latency = self.link.on_ack(kind, start)
+        if self.rollup is not None:
+            return self.rollup.add_nak(start, end) if result == FRAME_NAK else None
+        if not (self.should_show_ack if result == FRAME_ACK else self.should_show_nak):
             return None
+        return AnalyzerFrame(kind, start, end, {'latency_ms': latency * 1000.0} if latency is not None else None)
 
-        # If inside a packet, accumulate bytes
-        if self.packet_start_time:
-            self.buffer.append(byte)
 
-            # Once we have STX + C1 + C2, determine expected length
-            if len(self.buffer) == 3:
-                method_raw = self.buffer[2]
-                method = method_raw & 0x7F
-                self.expected_length = self.PACKET_LENGTHS.get(method)
+    def present_telegram(self, seq, method, data_bytes, start, end):
+        if self.classifier is not None:
+            return self.present_auto(seq, method, data_bytes, start, end)
 
-            # If we know the expected length and have enough bytes, finalize
-            if self.expected_length and len(self.buffer) == self.expected_length:
+        if self.profile is not None:
+            self.profile.count_telegram(self.direction, method)
 
-                # Validate ETX
-                if self.buffer[-1] != ETX:
-                    info = f"Invalid ETX: expected 0x03, got {hex(self.buffer[-1])}"
-                    self._reset_state()
-                    return AnalyzerFrame('UNKNOWN', start_time, end_time, {'info': info})
+        # Dispatch to existing logic
+        packet = self.handle_packet(method, seq, data_bytes, start, end)
+        if self.link is not None:
+            event = self.link.on_telegram(seq, start, end)
+            if event is not None and self.rollup is None:
+                link_event = AnalyzerFrame('LINK_EVENT', start, end, {'event': event, 'seq': seq})
+                return [link_event, packet] if packet is not None else link_event
+        if self.rollup is not None:
+            return self.rollup.add_telegram(packet, start, end)
+        return packet
 
-                # Validate BCC
-                bcc_received = self.buffer[-2]
-                payload = self.buffer[1:-2]  # C1, C2, D1..Dn
-                bcc_expected = self.compute_bcc(payload)
 
-                if bcc_received != bcc_expected:
-                    info = f"BCC mismatch: expected {hex(bcc_expected)}, got {hex(bcc_received)}"
-                    self._reset_state()
-                    return AnalyzerFrame('UNKNOWN', start_time, end_time, {'info': info})
+    def present_auto(self, seq, method, data_bytes, start, end):
+        """
+        present_telegram of the Auto direction: the sender is inferred first, then the telegram
+        is decoded with that sender's table and counted in its link statistics.
+        """
+        packet_length = HEADER_LENGTH + len(data_bytes) + TRAILER_LENGTH
+        direction = self.classifier.classify(seq, method, packet_length)
+        if direction is None:
+            lengths = self.classifier.lengths.get(method)
+            if lengths is None:
+                info = f'Method {method} not implemented'
+            else:
+                expected = ' or '.join(str(length) for length in sorted(lengths))
+                info = f"Invalid length: ETX after {packet_length} bytes, expected {expected}"
+            return self.present_error(FRAME_BAD_LENGTH, info, start, end)
 
-                # Extract fields
-                seq_raw = self.buffer[1]
-                method_raw = self.buffer[2]
-                data_bytes = self.buffer[3:-2]
+        if self.profile is not None:
+            self.profile.count_telegram(direction, method)
+        packet = self.handle_packet(method, seq, data_bytes, start, end, self.dispatch[direction])
+        if self.link is not None:
+            event = self.link.on_telegram(direction, seq, start, end)
+            if event is not None and self.rollup is None:
+                link_event = AnalyzerFrame('LINK_EVENT', start, end, {'event': f'{direction} {event}', 'seq': seq})
+                return [link_event, packet] if packet is not None else link_event
+        if self.rollup is not None:
+            return self.rollup.add_telegram(packet, start, end)
+        return packet
 
-                seq = seq_raw & 0x7F
-                method = method_raw & 0x7F
 
-                frame_start = self.packet_start_time
+    def present_error(self, result, info, start, end):
+        if self.link is not None:
+            self.link.on_error(end)
+        if self.profile is not None:
+            self.profile.count_failure(result)
+        if self.rollup is not None:
+            return self.rollup.add_bad_frame(start, end)
+        return AnalyzerFrame('UNKNOWN', start, end, {'info': info})
 
-                # Reset before dispatch
-                self._reset_state()
 
-                # Dispatch to existing logic
-                return self.handle_packet(method, seq, data_bytes, frame_start, end_time)
+    def _decode_profiled(self, frame: AnalyzerFrame):
+        """
+        decode with instrumentation, installed by __init__ when profiling is enabled.
+        """
+        profile = self.profile
+        started = perf_counter()
+        result = AlphaLinerSerialAnalyzer.decode(self, frame)
+        profile.decode_total += perf_counter() - started
+        profile.bytes += 1
 
-        return None
+        # Telegrams are counted by present_telegram, also those that produce no frame
+        if profile.since_summary < profile.interval:
+            return result
+
+        profile.since_summary = 0
+        report = self.profile_report()
+        summary = AnalyzerFrame('PROFILE', frame.start_time, frame.end_time, {
+            'telegrams': sum(report['telegrams'].values()),
+            'failures': sum(report['failures'].values()),
+            'resyncs': report['resyncs'],
+            'framing_ms': round(report['framing_s'] * 1000.0, 3),
+            'decoders_ms': round((report['decode_s'] - report['framing_s']) * 1000.0, 3),
+        })
+        if result is None:
+            return summary
+        return (result if isinstance(result, list) else [result]) + [summary]
+
+
+    def flush(self):
+        """
+        Returns the frames still held back at the end of a capture (the open rollup window,
+        pending double detector statistics). Logic 2 has no end-of-capture callback, offline
+        tools call this after the last byte.
 
+        Returns:
+            list: pending frames, possibly empty
+        """
+        frames = []
+        if self.rollup is not None:
+            pending = self.rollup.flush()
+            if pending is not None:
+                frames.append(pending)
+        if self.detector is not None:
+            frames.extend(self.detector.flush())
+        return frames
 
-    def _reset_state(self):
-        self.buffer = []
-        self.packet_start_time = None
-        self.expected_length = None
+
+    def profile_report(self):
+        """
+        Returns:
+            dict: profiling totals (see DecodeProfile.report), None when profiling is disabled
+        """
+        if self.profile is None:
+            return None
+        return self.profile.report(self.framer.resyncs)
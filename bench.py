@@ -0,0 +1,238 @@
+# Decoder benchmark
+# Generates reproducible synthetic AlphaLiner traffic and measures the analyzer hot path.
+#
+#   python bench.py                        # both directions, default corpus
+#   python bench.py --telegrams 200000 --repeat 5 --seed 7
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import encoder
+import offline
+from HighLevelAnalyzer import ETX, ACK, NAK, CONTROLLER, ALPHALINER
+
+
+def _random_mask(rng, density=0.3):
+    return 1 | sum(1 << bit for bit in range(1, 31) if rng.random() < density)
+
+
+def _table(rng, density=0.3):
+    return encoder.table(_random_mask(rng, density))
+
+
+def _alphaliner_telegram(rng, copy_id, inserts):
+    r = rng.random()
+    if r < 0.80:
+        good = 0x40 if rng.random() > 0.02 else 0
+        gripper = rng.randrange(1, 4096)
+        return 4, [good | (copy_id >> 7), copy_id & 0x7F, gripper >> 7, gripper & 0x7F] + inserts
+    if r < 0.86:
+        error = rng.choice((1, 1, 1, 2, 2, 3, 10))
+        location = rng.randrange(0, 31)
+        return 5, [error, location >> 7, location & 0x7F, copy_id >> 7, copy_id & 0x7F] + inserts
+    if r < 0.93:
+        error = rng.choice((1, 2, 4, 6, 8))
+        location = rng.randrange(0, 31)
+        return 3, [error, location >> 7, location & 0x7F, copy_id >> 7, copy_id & 0x7F]
+    if r < 0.98:
+        return 2, [rng.randrange(100), rng.randrange(100), rng.choice((0, 1, 2, 5))]
+    return 1, [rng.choice((0x06, 0x02, 0x01)), rng.randrange(2)]
+
+
+def _controller_telegram(rng, copy_id, inserts):
+    r = rng.random()
+    if r < 0.90:
+        copies = 1
+        return 6, [copy_id >> 7, copy_id & 0x7F] + inserts + [0, 0, 0, copies >> 7, copies & 0x7F]
+    if r < 0.93:
+        return 5, _table(rng, 0.8) + _table(rng, 0.5) + _table(rng, 0.8) + _table(rng, 0.1) + _table(rng, 0.5)
+    if r < 0.96:
+        return 14, [copy_id >> 7, copy_id & 0x7F]
+    if r < 0.98:
+        return 12, [rng.randrange(6), rng.choice((0, 5, 99)), rng.randrange(10)]
+    return rng.choice((1, 2, 7, 8)), []
+
+
+def iter_traffic(direction, rng, burst_rate=0.005):
+    """
+    Endless synthetic telegram contents of one side of the link.
+
+    High copy rate with a slowly changing insert table and, on the AlphaLiner side, occasional
+    STATISTIC/ERROR bursts.
+
+    Args:
+        direction: CONTROLLER or ALPHALINER
+        rng: random.Random, shared with the caller so corpora stay reproducible
+        burst_rate: probability of starting a STATISTIC/ERROR burst
+
+    Yields:
+        tuple: (method, data values)
+    """
+    make = _alphaliner_telegram if direction == ALPHALINER else _controller_telegram
+    copy_id = 1
+    inserts = _table(rng)
+
+    while True:
+        if rng.random() < 0.01:
+            inserts = _table(rng)  # new production zone
+
+        if direction == ALPHALINER and rng.random() < burst_rate:
+            burst = [(3, [1, 0, rng.randrange(31), copy_id >> 7, copy_id & 0x7F]) for _ in range(rng.randrange(5, 20))]
+            burst += [(2, [rng.randrange(100), rng.randrange(100), 1]) for _ in range(rng.randrange(2, 6))]
+        else:
+            burst = [make(rng, copy_id, inserts)]
+
+        yield from burst
+        copy_id = copy_id % 8191 + 1
+
+
+def generate_corpus(direction, telegrams=50000, seed=1, corrupt_rate=0.01, burst_rate=0.005):
+    """
+    Generates line traffic as seen on one side of the link.
+
+    Telegrams from iter_traffic, an ACK (sometimes NAK + retransmission) after every telegram
+    and a share of telegrams with a corrupted BCC or ETX.
+
+    Args:
+        direction: CONTROLLER or ALPHALINER
+        telegrams: number of telegrams
+        seed: random seed, the same seed always gives the same corpus
+        corrupt_rate: share of telegrams with a damaged BCC or ETX
+        burst_rate: probability of starting a STATISTIC/ERROR burst
+
+    Returns:
+        tuple: (bytes, number of telegrams)
+    """
+    rng = random.Random(seed)
+    traffic = iter_traffic(direction, rng, burst_rate)
+    out = bytearray()
+    seq = 0
+    count = 0
+
+    while count < telegrams:
+        method, data = next(traffic)
+        telegram = encoder.build_telegram(seq, method, data)
+        if rng.random() < corrupt_rate:
+            out += rng.choice((encoder.damage_etx, encoder.damage_bcc))(telegram)
+            out.append(NAK)  # followed by the retransmission, same C1
+        out += telegram
+        out.append(ACK)
+        seq = (seq + 1) & 0x7F
+        count += 1
+
+    return bytes(out), count
+
+
+def _input_frames(data):
+    char_time = offline.CHAR_TIME
+    return list(offline.iter_input_frames((i * char_time, i * char_time + char_time, b) for i, b in enumerate(data)))
+
+
+def run_decode(direction, frames):
+    analyzer = offline.create_analyzer(direction)
+    decode = analyzer.decode
+    produced = 0
+    for frame in frames:
+        if decode(frame) is not None:
+            produced += 1
+    return produced
+
+
+def measure(direction, data, telegrams, repeat=3):
+    """
+    Times the per-byte decode path and samples allocations with tracemalloc.
+
+    Returns:
+        dict: frames/sec, µs/byte, telegrams/sec, allocated blocks and bytes per telegram
+    """
+    frames = _input_frames(data)
+
+    best = None
+    produced = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        produced = run_decode(direction, frames)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Allocations: blocks still alive per decoded telegram plus the transient peak
+    sample = frames[:min(len(frames), 200000)]
+    sample_telegrams = max(1, sum(1 for f in sample if f.data['data'][0] == ETX))
+    analyzer = offline.create_analyzer(direction)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [analyzer.decode(f) for f in sample]
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del kept
+
+    return {
+        'direction': direction,
+        'bytes': len(data),
+        'telegrams': telegrams,
+        'frames': produced,
+        'seconds': best,
+        'frames_per_sec': produced / best,
+        'telegrams_per_sec': telegrams / best,
+        'us_per_byte': best * 1e6 / len(data),
+        'blocks_per_telegram': blocks / sample_telegrams,
+        'bytes_per_telegram': size / sample_telegrams,
+        'peak_kib': peak / 1024,
+    }
+
+
+def measure_retained(direction, frames, telegrams, compact):
+    """
+    Memory held by the complete list of decoded frames, as kept by batch and parallel modes.
+
+    Returns:
+        float: bytes per telegram
+    """
+    analyzer = offline.create_analyzer(direction)
+    gc.collect()
+    tracemalloc.start()
+    kept = list(offline.decode_frames(analyzer, iter(frames), compact=compact))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / telegrams
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AlphaLiner decoder benchmark')
+    parser.add_argument('--telegrams', type=int, default=50000, help='telegrams per direction')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs, best is reported')
+    parser.add_argument('--corrupt-rate', type=float, default=0.01)
+    parser.add_argument('--write-corpus', metavar='PREFIX', help='also write PREFIX_<direction>.bin')
+    args = parser.parse_args(argv)
+
+    print(f"{'direction':<11} {'bytes':>9} {'telegrams':>9} {'frames/s':>10} {'telegr/s':>10} "
+          f"{'us/byte':>8} {'blk/tel':>8} {'B/tel':>8} {'peak KiB':>9} {'kept B/tel':>10} {'compact':>8}")
+    for direction in (ALPHALINER, CONTROLLER):
+        data, telegrams = generate_corpus(direction, args.telegrams, args.seed, args.corrupt_rate)
+        if args.write_corpus:
+            with open(f"{args.write_corpus}_{direction}.bin", 'wb') as f:
+                f.write(data)
+        r = measure(direction, data, telegrams, args.repeat)
+        frames = _input_frames(data)
+        kept = measure_retained(direction, frames, telegrams, compact=False)
+        compact = measure_retained(direction, frames, telegrams, compact=True)
+        print(f"{r['direction']:<11} {r['bytes']:>9} {r['telegrams']:>9} {r['frames_per_sec']:>10,.0f} "
+              f"{r['telegrams_per_sec']:>10,.0f} {r['us_per_byte']:>8.3f} {r['blocks_per_telegram']:>8.2f} "
+              f"{r['bytes_per_telegram']:>8.0f} {r['peak_kib']:>9.0f} {kept:>10.0f} {compact:>8.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# Vectorised bulk decoder
+# Frames and validates a whole capture at once with NumPy, using the same framing rules,
+# spec tables and field layouts as AlphaLinerSerialAnalyzer. The produced frames are identical
+# to feeding the capture byte by byte through AlphaLinerSerialAnalyzer.decode.
+
+import os
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for bulk decoding
+    np = None
+
+import offline
+from HighLevelAnalyzer import (
+    STX, ETX, ACK, NAK, HEADER_LENGTH, TRAILER_LENGTH, MAX_TELEGRAM_LENGTH, BCC_FIXUP,
+    FRAME_OK, FRAME_BAD_ETX, FRAME_BAD_BCC, FRAME_BAD_LENGTH, FRAME_TOO_LONG, decode_table, describe_frame_error,
+)
+from saleae.analyzers import AnalyzerFrame
+
+
+COPY_COMPLETE = 4
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("bulk decoding requires numpy (pip install numpy)")
+
+
+def load_capture(path, fmt=None, stats=None):
+    """
+    Loads a whole capture into arrays.
+
+    Args:
+        path: capture file
+        fmt: input format (see offline.READERS), default by extension
+        stats: optional dict, updated with the UART error counts of raw-edge captures
+
+    Returns:
+        tuple: (uint8 bytes, float64 start times, float64 end times)
+    """
+    _require_numpy()
+    fmt = fmt or offline.guess_format(path)
+    if fmt == 'edges':
+        import uart
+        return uart.load_capture(path, stats=stats)
+    if fmt == 'bin':
+        data = np.fromfile(path, dtype=np.uint8)
+        starts = np.arange(len(data), dtype=np.float64) * offline.CHAR_TIME
+        return data, starts, starts + offline.CHAR_TIME
+
+    if fmt == 'sniff':
+        return load_sniffer_log(path)
+
+    events = list(offline.READERS[fmt](path))
+    data = np.fromiter((e[2] for e in events), dtype=np.uint8, count=len(events))
+    starts = np.fromiter((e[0] for e in events), dtype=np.float64, count=len(events))
+    ends = np.fromiter((e[1] for e in events), dtype=np.float64, count=len(events))
+    return data, starts, ends
+
+
+# struct codes of offline.SNIFFER_RECORD style formats -> numpy field types
+_STRUCT_TO_NUMPY = {'d': 'f8', 'f': 'f4', 'Q': 'u8', 'q': 'i8', 'I': 'u4', 'i': 'i4', 'B': 'u1'}
+
+
+def load_sniffer_log(path, record_format=None, time_scale=None):
+    """
+    Maps a raw sniffer log (see offline.iter_sniffer_bytes) as a structured array without reading it.
+
+    Returns:
+        tuple: (uint8 bytes, float64 start times, float64 end times)
+    """
+    record_format = record_format or offline.SNIFFER_RECORD
+    time_scale = offline.SNIFFER_TIME_SCALE if time_scale is None else time_scale
+    order = '>' if record_format[0] in '>!' else '<'
+    time_code, byte_code = record_format.lstrip('<>!=@')
+    dtype = np.dtype([('time', order + _STRUCT_TO_NUMPY[time_code]), ('byte', _STRUCT_TO_NUMPY[byte_code])])
+
+    count = os.path.getsize(path) // dtype.itemsize
+    if not count:
+        records = np.zeros(0, dtype=dtype)
+    else:
+        records = np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+    starts = records['time'].astype(np.float64) * time_scale
+    return records['byte'], starts, starts + offline.CHAR_TIME
+
+
+def packet_length_table(telegrams):
+    """
+    Returns:
+        ndarray: packet length per method (0 = unknown, framed up to ETX)
+    """
+    lengths = np.zeros(128, dtype=np.int64)
+    for method, entry in telegrams.items():
+        lengths[method] = entry[0]
+    return lengths
+
+
+def frame_telegrams(data, lengths):
+    """
+    Finds every telegram attempt in a byte stream (ACK/NAK already removed).
+
+    Every STX starts an attempt that ends at the first of: ETX (not counting an ETX in the BCC
+    position of a known method), the spec length of its method, or MAX_TELEGRAM_LENGTH. Attempts interrupted by the next STX (or the end of the
+    capture) produce nothing, exactly like TelegramFramer.
+
+    Args:
+        data: uint8 array without ACK/NAK bytes
+        lengths: packet length per method from packet_length_table
+
+    Returns:
+        tuple: (start index, end index, expected length, FRAME_* status) arrays of the completed attempts
+    """
+    n = len(data)
+    stx = np.flatnonzero(data == STX)
+    if not len(stx):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+
+    next_stx = np.append(stx[1:], n)
+
+    # First ETX after each STX
+    etx = np.flatnonzero(data == ETX)
+    etx = np.append(etx, [n, n])  # sentinels: no (further) ETX
+    etx_pos = np.searchsorted(etx, stx, side='right')
+    first_etx = etx[etx_pos]
+
+    # Expected length from C2 (only when C1 and C2 are not ETX)
+    method_pos = np.minimum(stx + 2, n - 1)
+    expected = lengths[data[method_pos] & 0x7F]
+    expected = np.where((stx + 2 < n) & (first_etx > stx + 2), expected, 0)
+
+    # An ETX in the BCC position of a known method is the BCC (0x02 after the reserved-value
+    # increment), the telegram ends at the next ETX
+    bcc_etx = (expected > 0) & (first_etx == stx + expected - 2)
+    first_etx = np.where(bcc_etx, etx[np.minimum(etx_pos + 1, len(etx) - 1)], first_etx)
+
+    length_end = np.where(expected > 0, stx + expected - 1, n)
+    capacity_end = stx + MAX_TELEGRAM_LENGTH - 1
+    end = np.minimum(np.minimum(first_etx, length_end), capacity_end)
+
+    done = end < next_stx
+    stx, end, expected = stx[done], end[done], expected[done]
+
+    count = end - stx + 1
+    is_etx = data[end] == ETX
+    bad_length = is_etx & (((expected > 0) & (count != expected)) | (count < HEADER_LENGTH + TRAILER_LENGTH))
+
+    # Segmented XOR over C1..Dn through the prefix XOR
+    prefix = np.zeros(n + 1, dtype=np.uint8)
+    np.bitwise_xor.accumulate(data, out=prefix[1:])
+    payload_xor = prefix[np.maximum(end - 1, stx + 1)] ^ prefix[stx + 1]
+    fixup = np.frombuffer(BCC_FIXUP, dtype=np.uint8)
+    bcc_ok = fixup[payload_xor] == data[np.maximum(end - 1, 0)]
+
+    status = np.full(len(stx), FRAME_TOO_LONG, dtype=np.int64)
+    status[~is_etx & (end == stx + expected - 1) & (expected > 0)] = FRAME_BAD_ETX
+    status[is_etx] = np.where(bad_length[is_etx], FRAME_BAD_LENGTH,
+                              np.where(bcc_ok[is_etx], FRAME_OK, FRAME_BAD_BCC))
+    return stx, end, expected, status
+
+
+def decode_copy_complete(data, starts):
+    """
+    Extracts COPY_COMPLETE fields for many telegrams at once.
+
+    Args:
+        data: uint8 array
+        starts: STX indices of valid COPY_COMPLETE telegrams
+
+    Returns:
+        dict: copy_id, good, gripper, insert_mask arrays
+    """
+    d = data[starts[:, None] + HEADER_LENGTH + np.arange(9)].astype(np.int64) & 0x7F
+    insert_mask = np.zeros(len(starts), dtype=np.int64)
+    for column in range(4, 9):
+        insert_mask = (insert_mask << 7) | d[:, column]
+    return {
+        'copy_id': ((d[:, 0] & 0x3F) << 7) | d[:, 1],
+        'good': (d[:, 0] & 0x40) != 0,
+        'gripper': ((d[:, 2] & 0x1F) << 7) | d[:, 3],
+        'insert_mask': insert_mask,
+    }
+
+
+def decode_bulk(analyzer, data, start_times, end_times, compact=False):
+    """
+    Decodes a capture in bulk with the settings of an AlphaLinerSerialAnalyzer.
+
+    Args:
+        analyzer: configured AlphaLinerSerialAnalyzer (provides spec table, decoders and ACK/NAK settings)
+        data, start_times, end_times: arrays from load_capture
+        compact: return TelegramRecords (see offline.compact_frame) instead of AnalyzerFrames
+
+    Returns:
+        list: frames in capture order, identical to the per-byte decode path
+    """
+    _require_numpy()
+    if analyzer.link is not None or analyzer.rollup is not None:
+        raise ValueError("link statistics and rollups follow the telegram sequence, use the per-byte decode path")
+    if analyzer.classifier is not None:
+        raise ValueError("the Auto direction classifies telegrams in sequence, use the per-byte decode path")
+    data = np.asarray(data, dtype=np.uint8)
+
+    is_control = (data == ACK) | (data == NAK)
+    keep = np.flatnonzero(~is_control)
+    stream = data[keep]
+
+    starts, ends, expected, status = frame_telegrams(stream, packet_length_table(analyzer.telegrams))
+
+    # Frames with the original index of the byte that emits them
+    emitted = []
+    emitted_at = []
+
+    ack_type = {ACK: ('ACK', analyzer.should_show_ack), NAK: ('NAK', analyzer.should_show_nak)}
+    control = np.flatnonzero(is_control)
+    controls = zip(control.tolist(), data[control].tolist(), start_times[control].tolist(), end_times[control].tolist())
+    for index, byte, frame_start, frame_end in controls:
+        frame_type, shown = ack_type[byte]
+        if shown:
+            frame = AnalyzerFrame(frame_type, frame_start, frame_end, None)
+            emitted.append(offline.compact_frame(frame) if compact else frame)
+            emitted_at.append(index)
+
+    ok = status == FRAME_OK
+    methods = np.zeros(len(starts), dtype=np.int64)
+    methods[ok] = stream[starts[ok] + 2] & 0x7F
+
+    # COPY_COMPLETE fields in one vectorised pass
+    copy_rows = np.flatnonzero(ok & (methods == COPY_COMPLETE))
+    copy_entry = analyzer.telegrams.get(COPY_COMPLETE)
+    copy_fields = {}
+    if copy_entry is not None and copy_entry[2] == analyzer.get_copy_complete_msg and len(copy_rows):
+        columns = decode_copy_complete(stream, starts[copy_rows])
+        raw_tables = stream[starts[copy_rows][:, None] + HEADER_LENGTH + 4 + np.arange(5)]
+        copy_fields = {
+            row: (copy_id, good, gripper, mask, bytes(raw))
+            for row, copy_id, good, gripper, mask, raw in zip(
+                copy_rows.tolist(), columns['copy_id'].tolist(), columns['good'].tolist(),
+                columns['gripper'].tolist(), columns['insert_mask'].tolist(), raw_tables)
+        }
+
+    # Times and C1 of every attempt in one pass, the loop below only handles Python values
+    end_indices = keep[ends]
+    rows = zip(starts.tolist(), ends.tolist(), expected.tolist(), status.tolist(), methods.tolist(),
+               end_indices.tolist(), start_times[keep[starts]].tolist(), start_times[end_indices].tolist(),
+               end_times[end_indices].tolist(), (stream[np.minimum(starts + 1, len(stream) - 1)] & 0x7F).tolist())
+    for row, (start, end, expected_length, result, method, end_index, frame_start, error_start, frame_end, seq) \
+            in enumerate(rows):
+        if result != FRAME_OK:
+            info = describe_frame_error(result, stream[start:end + 1].tobytes(), expected_length)
+            frame = AnalyzerFrame('UNKNOWN', error_start, frame_end, {'info': info})
+        else:
+            fields = copy_fields.get(row)
+            if fields is not None:
+                copy_id, good, gripper, mask, raw = fields
+                frame = AnalyzerFrame('COPY_COMPLETE', frame_start, frame_end, {
+                    'copy_id': copy_id,
+                    'good': good,
+                    'status': 'Good' if good else 'Faulty',
+                    'gripper': gripper,
+                    'insert_mask': mask,
+                    'inserts': decode_table(raw)[1],
+                    'seq': seq,
+                })
+            else:
+                payload = stream[start + HEADER_LENGTH:end + 1 - TRAILER_LENGTH].tobytes()
+                frame = analyzer.handle_packet(method, seq, payload, frame_start, frame_end)
+                if frame is None:  # filtered out by the method_filter setting
+                    continue
+        emitted.append(offline.compact_frame(frame) if compact else frame)
+        emitted_at.append(end_index)
+
+    order = np.argsort(np.array(emitted_at, dtype=np.int64), kind='stable')
+    frames = [emitted[position] for position in order.tolist()]
+    frames.extend(offline.compact_frame(frame) if compact else frame for frame in analyzer.flush())
+    return frames
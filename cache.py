@@ -0,0 +1,229 @@
+# Persistent cache of decoded captures
+# Decoded frame streams are stored per (capture content, settings, decoder version) so archived
+# captures that are opened again load in a fraction of the decode time. Entries are marshalled
+# TelegramRecord rows compressed with zlib; the least recently used entries are evicted when the
+# cache grows above its size limit. Any change to the decoding modules (DECODER_SOURCES) or the
+# record layout changes the key, so stale entries are never returned and simply age out.
+# The framed stream of a capture (offline.FramedStream) is cached per direction as well, so a
+# capture decoded again with other display settings only runs the presentation stage.
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import zlib
+
+import offline
+import HighLevelAnalyzer
+
+
+CACHE_FORMAT = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'alphaliner')
+DEFAULT_MAX_BYTES = 1 << 30
+HASH_BLOCK = 1 << 20
+ENTRY_SUFFIX = '.frames'
+
+# Modules whose source shapes the cached streams: analyzer, readers/records/FramedStream, raw-edge
+# UART decoding and the bulk/parallel decoders that can fill the cache
+DECODER_SOURCES = ('HighLevelAnalyzer.py', 'offline.py', 'uart.py', 'bulk.py', 'parallel.py')
+
+
+def decoder_version():
+    """
+    Fingerprint of everything that shapes the decoded frames: source of the DECODER_SOURCES,
+    cache format and Python version (marshal data is version specific).
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(HighLevelAnalyzer.__file__))
+    for name in DECODER_SOURCES:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    digest.update(f"{CACHE_FORMAT}:{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    return digest.hexdigest()
+
+
+def cache_key(path, fmt, settings):
+    """
+    Args:
+        path: capture file
+        fmt: input format
+        settings: analyzer settings (direction, ACK/NAK visibility, ...)
+
+    Returns:
+        str: hex digest of the capture content, the settings and the decoder version
+    """
+    digest = hashlib.sha256()
+    digest.update(decoder_version().encode())
+    digest.update(json.dumps({'format': fmt, **settings}, sort_keys=True).encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pack(frames):
+    rows = []
+    for frame in frames:
+        data = frame.data or {}
+        fields = tuple(data)
+        rows.append((frame.type, fields, frame.start_time, frame.end_time, tuple(data[key] for key in fields)))
+    return zlib.compress(marshal.dumps(rows), 1)
+
+
+def _unpack(blob):
+    make_record = offline.make_record
+    return [make_record(*row) for row in marshal.loads(zlib.decompress(blob))]
+
+
+class DecodeCache:
+    """
+    Directory of cached decode results with size-based LRU eviction (modification time, refreshed on every hit).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+
+    def load(self, key, unpack):
+        """
+        Args:
+            key: entry key
+            unpack: callable turning the stored bytes back into the cached object
+
+        Returns:
+            the cached object, None on a miss or an unreadable entry
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = unpack(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            os.unlink(path)
+            return None
+        os.utime(path)  # mark as recently used
+        return value
+
+
+    def store(self, key, blob):
+        """
+        Writes an entry atomically and evicts old entries if the cache got too large.
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+
+    def get(self, key):
+        """
+        Returns:
+            list: cached TelegramRecords, None on a miss or an unreadable entry
+        """
+        return self.load(key, _unpack)
+
+
+    def put(self, key, frames):
+        """
+        Stores a decoded frame stream.
+        """
+        self.store(key, _pack(frames))
+
+
+    def entries(self):
+        """
+        Returns:
+            list: (mtime, size, path) of every entry, oldest first
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def cached_decode(cache, path, fmt=None, decode=None, **analyzer_settings):
+    """
+    Returns the decoded frames of a capture from the cache, decoding and storing them on a miss.
+
+    Args:
+        cache: DecodeCache
+        path: capture file
+        fmt: input format (see offline.READERS), default by extension
+        decode: optional callable returning the frames on a miss (default: sequential decode)
+        **analyzer_settings: passed to offline.create_analyzer
+
+    Returns:
+        tuple: (list of TelegramRecords, True if loaded from the cache)
+    """
+    fmt = fmt or offline.guess_format(path)
+    key = cache_key(path, fmt, analyzer_settings)
+    frames = cache.get(key)
+    if frames is not None:
+        return frames, True
+
+    if decode is None:
+        frames = [offline.compact_frame(f) for f in offline.decode_file(path, fmt, **analyzer_settings)]
+    else:
+        frames = [offline.compact_frame(f) for f in decode()]
+    cache.put(key, frames)
+    return frames, False
+
+
+def cached_framing(cache, path, fmt=None, direction='controller'):
+    """
+    Returns the framed stream of a capture from the cache, framing and storing it on a miss.
+
+    Framing depends only on the capture and the direction, so one entry serves every display
+    setting (ACK/NAK visibility, telegram selection, rollups, link statistics, ...).
+
+    Args:
+        cache: DecodeCache
+        path: capture file
+        fmt: input format (see offline.READERS), default by extension
+        direction: 'controller', 'alphaliner' or 'auto'
+
+    Returns:
+        tuple: (offline.FramedStream, True if loaded from the cache)
+    """
+    fmt = fmt or offline.guess_format(path)
+    key = cache_key(path, fmt, {'framed': direction})
+    stream = cache.load(key, offline.FramedStream.from_bytes)
+    if stream is not None:
+        return stream, True
+
+    stream = offline.frame_capture(offline.create_analyzer(direction), offline.READERS[fmt](path))
+    cache.store(key, stream.to_bytes())
+    return stream, False
@@ -0,0 +1,381 @@
+# Command line entry point for decoding AlphaLiner captures outside of Logic 2
+#
+#   python cli.py decode capture.csv --direction alphaliner
+#   python cli.py decode capture.bin --direction controller --no-ack -o decoded.txt
+#   python cli.py decode digital.csv --direction alphaliner      (raw edges, see uart.py)
+#   python cli.py export capture.bin --direction alphaliner -o shift.db
+#   python cli.py index capture.bin --direction alphaliner -o shift.npz
+#   python cli.py query shift.npz --gripper 1234 --faulty
+#   python cli.py fleet /data/captures --config fleet.json -o /data/decoded
+#   python cli.py live /dev/ttyUSB0 --direction alphaliner --socket /tmp/alphaliner.sock
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+import cache
+import copy_index
+import export
+import offline
+
+
+def _count(events, counter):
+    for event in events:
+        counter[0] += 1
+        yield event
+
+
+def _detector_frames(args):
+    return 'Every Test' if args.all_detector_tests else 'Statistics per Feeder'
+
+
+def _create_analyzer(args):
+    """
+    Returns:
+        AlphaLinerSerialAnalyzer: configured from the decode options, None after printing an invalid setting
+    """
+    if (args.link_stats or args.profile or args.rollup) and (args.bulk or args.jobs > 1):
+        print("--link-stats/--profile/--rollup need the sequential decoder (no --bulk/--jobs)", file=sys.stderr)
+        return None
+    if args.direction == 'auto' and (args.bulk or args.jobs > 1):
+        print("--direction auto needs the sequential decoder (no --bulk/--jobs)", file=sys.stderr)
+        return None
+    if args.profile and args.cache:
+        print("--profile times the framing, which --cache skips", file=sys.stderr)
+        return None
+    try:
+        return offline.create_analyzer(args.direction, show_ack=not args.no_ack, show_nak=not args.no_nak,
+                                       method_filter=args.only, rollup_window=args.rollup,
+                                       detector_frames=_detector_frames(args),
+                                       link_stats='Yes' if args.link_stats else 'No',
+                                       profiling='Yes' if args.profile else 'No')
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return None
+
+
+def _decode(args, analyzer, byte_count, stats):
+    """
+    Decodes args.input with the sequential, bulk, parallel or cached path selected by the options.
+
+    With --cache, the decoded frames are reused for identical settings and the framed stream for
+    any settings of the same direction (only the presentation stage runs again).
+
+    Returns:
+        tuple: (iterable of decoded frames, 'frames', 'framing' or None depending on what came from the cache)
+    """
+    fmt = args.format or offline.guess_format(args.input)
+    reader = offline.READERS[fmt]
+    if fmt == 'edges':
+        reader = functools.partial(offline.iter_edge_bytes, stats=stats)
+    decode_cache = cache.DecodeCache(args.cache_dir, args.cache_size << 20) if args.cache else None
+    cached = None
+
+    def decode():
+        nonlocal cached
+        if args.jobs > 1:
+            import parallel
+            return parallel.decode_parallel(args.input, args.format, args.jobs, stats=stats, direction=args.direction,
+                                            show_ack=not args.no_ack, show_nak=not args.no_nak,
+                                            method_filter=args.only, detector_frames=_detector_frames(args))
+        if args.bulk:
+            import bulk
+            data, start_times, end_times = bulk.load_capture(args.input, args.format, stats=stats)
+            byte_count[0] = len(data)
+            return bulk.decode_bulk(analyzer, data, start_times, end_times, compact=True)
+        if decode_cache is not None:
+            framed, hit = cache.cached_framing(decode_cache, args.input, args.format, args.direction)
+            byte_count[0] = framed.bytes
+            cached = 'framing' if hit else None
+            return offline.present_frames(analyzer, framed)
+        events = _count(reader(args.input), byte_count)
+        return offline.decode_frames(analyzer, offline.iter_input_frames(events))
+
+    # Link statistics and rollups are produced while presenting, so their frames are not cached
+    if decode_cache is not None and not (args.link_stats or args.rollup):
+        frames, hit = cache.cached_decode(decode_cache, args.input, args.format, decode, direction=args.direction,
+                                          show_ack=not args.no_ack, show_nak=not args.no_nak,
+                                          method_filter=args.only, detector_frames=_detector_frames(args))
+        return frames, 'frames' if hit else cached
+    frames = decode()
+    return frames, cached
+
+
+def _print_summary(args, analyzer, byte_count, stats, frame_count, elapsed, cached):
+    if 'bytes' in stats:
+        byte_count[0] = stats['bytes']
+    if not args.quiet:
+        rate = byte_count[0] / elapsed if elapsed else 0.0
+        if cached == 'frames':
+            print(f"{args.input}: {frame_count} frames from cache in {elapsed:.3f}s", file=sys.stderr)
+        elif cached == 'framing':
+            print(f"{args.input}: {byte_count[0]} bytes, {frame_count} frames in {elapsed:.3f}s "
+                  f"(framing from cache)", file=sys.stderr)
+        else:
+            print(f"{args.input}: {byte_count[0]} bytes, {frame_count} frames in {elapsed:.3f}s "
+                  f"({rate:,.0f} bytes/s)", file=sys.stderr)
+    if 'uart_chars' in stats and not args.quiet:
+        for key in ('uart_chars', 'uart_parity_errors', 'uart_framing_errors', 'uart_glitches'):
+            print(f"  {key}: {stats[key]}", file=sys.stderr)
+    if analyzer.classifier is not None and not args.quiet:
+        for key, value in analyzer.classifier.summary().items():
+            print(f"  {key}: {value}", file=sys.stderr)
+    if analyzer.link is not None:
+        for key, value in analyzer.link.summary().items():
+            print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}", file=sys.stderr)
+    if analyzer.profile is not None:
+        json.dump(analyzer.profile_report(), sys.stderr, indent=2)
+        print(file=sys.stderr)
+
+
+def cmd_decode(args):
+    analyzer = _create_analyzer(args)
+    if analyzer is None:
+        return 2
+    formatter = offline.FrameFormatter()
+
+    byte_count = [0]
+    frame_count = 0
+    stats = {}
+    started = time.perf_counter()
+    frames, cached = _decode(args, analyzer, byte_count, stats)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for frame in frames:
+            out.write(f"{frame.start_time:.6f}\t{frame.end_time:.6f}\t{formatter(frame)}\n")
+            frame_count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    _print_summary(args, analyzer, byte_count, stats, frame_count, time.perf_counter() - started, cached)
+    return 0
+
+
+def cmd_export(args):
+    analyzer = _create_analyzer(args)
+    if analyzer is None:
+        return 2
+
+    byte_count = [0]
+    stats = {}
+    started = time.perf_counter()
+    frames, cached = _decode(args, analyzer, byte_count, stats)
+
+    if args.output == '-' or args.output.endswith(export.JSONL_SUFFIXES):
+        out = sys.stdout if args.output == '-' else open(args.output, 'w')
+        try:
+            frame_count = export.export_jsonl(frames, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        frame_count = export.export_sqlite(frames, args.output, capture=args.capture or args.input,
+                                           batch_size=args.batch_size)
+
+    _print_summary(args, analyzer, byte_count, stats, frame_count, time.perf_counter() - started, cached)
+    return 0
+
+
+def cmd_index(args):
+    reader = offline.READERS[args.format or offline.guess_format(args.input)]
+    analyzer = offline.create_analyzer(args.direction, show_ack=False, show_nak=False)
+    builder = copy_index.CopyIndexBuilder()
+    builder.add_frames(offline.decode_frames(analyzer, offline.iter_input_frames(reader(args.input))))
+    index = builder.build(origin=args.origin)
+    index.save(args.output)
+    if not args.quiet:
+        print(f"{args.input}: {len(index)} copy records -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_query(args):
+    index = copy_index.CopyIndex.load(args.index)
+    good = True if args.good else False if args.faulty else None
+    kind = copy_index.KINDS[args.type] if args.type else None
+    rows = index.query(copy_id=args.copy_id, gripper=args.gripper, kind=kind, good=good,
+                       error_type=args.error_type, location=args.location, start=args.start, end=args.end)
+    for record in index.rows(rows):
+        print(json.dumps(record))
+    if not args.quiet:
+        print(f"{len(rows)} of {len(index)} records", file=sys.stderr)
+    return 0
+
+
+def cmd_fleet(args):
+    import fleet
+    paths = fleet.find_captures(args.inputs, exclude=args.output_dir)
+    if not paths:
+        print("no captures found", file=sys.stderr)
+        return 2
+    defaults = {'direction': args.direction, 'format': args.format, 'no_ack': args.no_ack, 'no_nak': args.no_nak,
+                'only': args.only, 'all_detector_tests': args.all_detector_tests, 'link_stats': args.link_stats}
+
+    def progress(done, total, entry):
+        if args.quiet:
+            return
+        status = entry['error'] if 'error' in entry else f"{entry['frames']} frames in {entry['decode_s']:.1f}s"
+        print(f"[{done}/{total}] {entry['machine']}: {entry['file']}: {status}", file=sys.stderr)
+
+    try:
+        config = fleet.load_config(args.config)
+        report = fleet.run_fleet(paths, args.output_dir, config, defaults, args.output_type, args.jobs, progress)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    if not args.quiet:
+        fleet.print_report(report)
+        totals = report['fleet']
+        print(f"{totals['files']} captures, {totals.get('bytes', 0)} bytes in {totals['elapsed_s']:.1f}s "
+              f"-> {os.path.join(args.output_dir, fleet.REPORT_NAME)}", file=sys.stderr)
+    return 1 if report['fleet'].get('failed_files') else 0
+
+
+def cmd_live(args):
+    import asyncio
+    import signal
+    import live
+    try:
+        analyzer = offline.create_analyzer(args.direction, show_ack=not args.no_ack, show_nak=not args.no_nak,
+                                           method_filter=args.only, rollup_window=args.rollup,
+                                           detector_frames=_detector_frames(args))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    async def run():
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        return await live.run_tap(args.device, analyzer, stdout=not args.no_stdout, socket_path=args.socket,
+                                  queue_size=args.queue_size, stop=stop)
+
+    summary = asyncio.run(run())
+    if not args.quiet:
+        print(f"{args.device}: {summary['bytes']} bytes, {summary['frames']} frames, latency avg "
+              f"{summary['latency_avg_us']:.1f}us max {summary['latency_max_us']:.1f}us, "
+              f"{summary['dropped_lines']} lines dropped", file=sys.stderr)
+    return 0
+
+
+def _add_decode_options(parser):
+    parser.add_argument('input', help='Async Serial CSV export, hex text log or raw byte log')
+    parser.add_argument('-f', '--format', choices=sorted(offline.READERS), help='input format (default: by extension and content)')
+    parser.add_argument('-d', '--direction', choices=sorted(offline.DIRECTIONS), default='controller',
+                        help='which side transmitted the capture (auto: both, inferred per telegram)')
+    parser.add_argument('--no-ack', action='store_true', help='hide ACK frames')
+    parser.add_argument('--no-nak', action='store_true', help='hide NAK frames')
+    parser.add_argument('--only', default='', metavar='TYPES',
+                        help='only decode these telegrams, e.g. "COPY_FAILED,ERROR_MSG,STATISTIC_MSG"')
+    parser.add_argument('--rollup', type=float, default=0, metavar='SECONDS',
+                        help='one ROLLUP summary frame per window instead of one frame per telegram')
+    parser.add_argument('--all-detector-tests', action='store_true',
+                        help='one frame per Double Detector Test instead of per-feeder statistics')
+    parser.add_argument('--link-stats', action='store_true',
+                        help='pair telegrams with ACK/NAK, flag retransmissions and sequence gaps')
+    parser.add_argument('--profile', action='store_true', help='count telegrams/failures and time framing vs decoders')
+    parser.add_argument('--bulk', action='store_true', help='vectorised whole-capture decoding (requires numpy)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='decode in N processes')
+    parser.add_argument('--cache', action='store_true',
+                        help='reuse the decoded frames of an identical earlier run (same content and settings), '
+                             'or its framing when only display settings changed')
+    parser.add_argument('--cache-dir', default=cache.DEFAULT_CACHE_DIR,
+                        help='cache directory (default: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=1024, help='cache size limit in MiB (default: %(default)s)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not print the summary line')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='AlphaLiner serial protocol decoder')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    decode = commands.add_parser('decode', help='decode an exported capture')
+    _add_decode_options(decode)
+    decode.add_argument('-o', '--output', help='write decoded frames here instead of stdout')
+    decode.set_defaults(func=cmd_decode)
+
+    dump = commands.add_parser('export', help='export decoded telegrams to SQLite or JSON lines')
+    _add_decode_options(dump)
+    dump.add_argument('-o', '--output', required=True,
+                      help='SQLite database (rows are appended), .jsonl file or - for JSON lines on stdout')
+    dump.add_argument('--capture', help='value of the capture column (default: input path)')
+    dump.add_argument('--batch-size', type=int, default=export.BATCH_SIZE, help='rows per executemany')
+    dump.set_defaults(func=cmd_export)
+
+    index = commands.add_parser('index', help='build a columnar copy index (.npz, requires numpy)')
+    index.add_argument('input', help='capture of the AlphaLiner side')
+    index.add_argument('-f', '--format', choices=sorted(offline.READERS), help='input format (default: by extension and content)')
+    index.add_argument('-d', '--direction', choices=sorted(offline.DIRECTIONS), default='alphaliner',
+                       help='which side transmitted the capture')
+    index.add_argument('-o', '--output', required=True, help='index file (.npz)')
+    index.add_argument('--origin', type=float, default=0.0, help='absolute time of capture time 0, e.g. epoch seconds')
+    index.add_argument('-q', '--quiet', action='store_true', help='do not print the summary line')
+    index.set_defaults(func=cmd_index)
+
+    query = commands.add_parser('query', help='query a copy index, prints one JSON record per line')
+    query.add_argument('index', help='index file from the index command')
+    query.add_argument('--copy-id', type=int)
+    query.add_argument('--gripper', type=int)
+    query.add_argument('--type', choices=sorted(copy_index.KINDS), help='telegram type')
+    status = query.add_mutually_exclusive_group()
+    status.add_argument('--good', action='store_true', help='only good copies')
+    status.add_argument('--faulty', action='store_true', help='only faulty copies')
+    query.add_argument('--error-type', type=int, help='error type code (1 = Missfeed, 2 = Doublefeed, ...)')
+    query.add_argument('--location', type=int, help='feeder/pocket/gripper of the error')
+    query.add_argument('--start', type=float, help='from this time (index time base)')
+    query.add_argument('--end', type=float, help='up to this time (index time base)')
+    query.add_argument('-q', '--quiet', action='store_true', help='do not print the summary line')
+    query.set_defaults(func=cmd_query)
+
+    batch = commands.add_parser('fleet', help='decode the captures of many machines in a process pool')
+    batch.add_argument('inputs', nargs='+', help='capture directories (searched recursively), files or glob patterns')
+    batch.add_argument('-o', '--output-dir', required=True, help='per-machine outputs and fleet_report.json')
+    batch.add_argument('--config', help='JSON file with per-machine settings (see fleet.py)')
+    batch.add_argument('--output-type', choices=('txt', 'jsonl', 'sqlite', 'none'), default='txt',
+                       help='per-capture output (none = report only)')
+    batch.add_argument('-j', '--jobs', type=int, default=None, help='processes (default: CPU count)')
+    batch.add_argument('-f', '--format', choices=sorted(offline.READERS),
+                       help='input format (default: by extension and content)')
+    batch.add_argument('-d', '--direction', choices=sorted(offline.DIRECTIONS), default='controller',
+                       help='direction of machines the config does not set')
+    batch.add_argument('--no-ack', action='store_true', help='hide ACK frames')
+    batch.add_argument('--no-nak', action='store_true', help='hide NAK frames')
+    batch.add_argument('--only', default='', metavar='TYPES', help='only decode these telegrams (see decode --only)')
+    batch.add_argument('--all-detector-tests', action='store_true',
+                       help='one frame per Double Detector Test instead of per-feeder statistics')
+    batch.add_argument('--link-stats', action='store_true',
+                       help='link statistics in the outputs and the report (NAKs, timeouts, retransmissions, gaps)')
+    batch.add_argument('-q', '--quiet', action='store_true', help='do not print progress and the report table')
+    batch.set_defaults(func=cmd_fleet)
+
+    tap = commands.add_parser('live', help='decode a serial device or pty live, publishing JSON lines')
+    tap.add_argument('device', help='serial device or pty, opened raw 19200 8O1')
+    tap.add_argument('-d', '--direction', choices=sorted(offline.DIRECTIONS), default='controller',
+                     help='which side transmits on the tapped line')
+    tap.add_argument('--no-ack', action='store_true', help='hide ACK frames')
+    tap.add_argument('--no-nak', action='store_true', help='hide NAK frames')
+    tap.add_argument('--only', default='', metavar='TYPES', help='only decode these telegrams (see decode --only)')
+    tap.add_argument('--rollup', type=float, default=0, metavar='SECONDS',
+                     help='publish one ROLLUP summary per window instead of every telegram')
+    tap.add_argument('--all-detector-tests', action='store_true',
+                     help='one frame per Double Detector Test instead of per-feeder statistics')
+    tap.add_argument('--socket', help='also publish to clients of this unix socket')
+    tap.add_argument('--no-stdout', action='store_true', help='do not publish to stdout')
+    tap.add_argument('--queue-size', type=int, default=4096, help='lines buffered per subscriber')
+    tap.add_argument('-q', '--quiet', action='store_true', help='do not print the summary line')
+    tap.set_defaults(func=cmd_live)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
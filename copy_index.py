@@ -0,0 +1,189 @@
+# Columnar copy index
+# Collects the per-copy fields of COPY_COMPLETE, COPY_FAILED and STATISTIC_MSG frames into
+# compact columns and answers CopyID / gripper / feeder / time range queries without scanning
+# the decoded text. Indexes can be saved to and loaded from a compressed .npz file.
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for the index
+    np = None
+
+
+# Row kinds
+KIND_COMPLETE = 0
+KIND_FAILED = 1
+KIND_STATISTIC = 2
+
+KINDS = {
+    'COPY_COMPLETE': KIND_COMPLETE,
+    'COPY_FAILED': KIND_FAILED,
+    'STATISTIC_MSG': KIND_STATISTIC,
+}
+
+# Column name -> (array typecode while building, numpy dtype when frozen)
+COLUMNS = {
+    'time': ('d', 'float64'),
+    'kind': ('b', 'int8'),
+    'copy_id': ('h', 'int16'),
+    'gripper': ('h', 'int16'),       # -1 when the telegram has no gripper
+    'good': ('b', 'bool'),
+    'error_type': ('b', 'int8'),     # -1 for COPY_COMPLETE
+    'location': ('h', 'int16'),      # feeder/pocket/gripper of the error, -1 for COPY_COMPLETE
+    'insert_mask': ('q', 'int64'),   # 0 for STATISTIC_MSG
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the copy index requires numpy (pip install numpy)")
+
+
+class CopyIndexBuilder:
+    """
+    Appends rows from decoded frames into array.array columns (constant per-row cost, no dicts).
+    """
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+
+    def add_frame(self, frame):
+        """
+        Adds a decoded frame, frames of other types are ignored.
+
+        Returns:
+            bool: True if a row was added
+        """
+        kind = KINDS.get(frame.type)
+        if kind is None:
+            return False
+        data = frame.data
+        c = self.columns
+        c['time'].append(float(frame.start_time))
+        c['kind'].append(kind)
+        c['copy_id'].append(data['copy_id'])
+        if kind == KIND_COMPLETE:
+            c['gripper'].append(data['gripper'])
+            c['good'].append(data['good'])
+            c['error_type'].append(-1)
+            c['location'].append(-1)
+            c['insert_mask'].append(data['insert_mask'])
+        else:
+            c['gripper'].append(data['location'] if data['location_kind'] == 'Gripper' else -1)
+            c['good'].append(kind == KIND_STATISTIC)  # statistic errors did not spoil the copy
+            c['error_type'].append(data['error_type'])
+            c['location'].append(data['location'])
+            c['insert_mask'].append(data.get('insert_mask', 0))
+        return True
+
+    def add_frames(self, frames):
+        for frame in frames:
+            self.add_frame(frame)
+        return self
+
+    def build(self, origin=0.0):
+        """
+        Args:
+            origin: absolute time (e.g. epoch seconds) of capture time 0
+
+        Returns:
+            CopyIndex
+        """
+        _require_numpy()
+        columns = {name: np.asarray(self.columns[name]).astype(dtype) for name, (_, dtype) in COLUMNS.items()}
+        return CopyIndex(columns, origin)
+
+
+class CopyIndex:
+    """
+    Frozen columnar index with sorted lookups by CopyID and gripper and time range queries.
+    """
+
+    def __init__(self, columns, origin=0.0):
+        _require_numpy()
+        self.columns = columns
+        self.origin = float(origin)
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.columns['time'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def _sorted_index(self, name):
+        # (row order sorted by the column, sorted column values), built on first use
+        entry = self._sorted.get(name)
+        if entry is None:
+            order = np.argsort(self.columns[name], kind='stable')
+            entry = (order, self.columns[name][order])
+            self._sorted[name] = entry
+        return entry
+
+    def _lookup(self, name, value):
+        order, values = self._sorted_index(name)
+        lo = np.searchsorted(values, value, side='left')
+        hi = np.searchsorted(values, value, side='right')
+        return np.sort(order[lo:hi])
+
+    def _time_range(self, start, end):
+        times = self.columns['time']
+        lo = 0 if start is None else np.searchsorted(times, start - self.origin, side='left')
+        hi = len(times) if end is None else np.searchsorted(times, end - self.origin, side='right')
+        return np.arange(lo, hi)
+
+    def query(self, copy_id=None, gripper=None, kind=None, good=None, error_type=None, location=None,
+              start=None, end=None):
+        """
+        Returns the row numbers matching all given conditions, in capture order.
+
+        CopyID and gripper use the sorted indexes, start/end (in the time base given by origin)
+        the capture order of the rows; the remaining conditions filter that candidate set.
+        """
+        if copy_id is not None:
+            rows = self._lookup('copy_id', copy_id)
+        elif gripper is not None:
+            rows = self._lookup('gripper', gripper)
+        else:
+            rows = self._time_range(start, end)
+
+        c = self.columns
+        mask = np.ones(len(rows), dtype=bool)
+        if gripper is not None:
+            mask &= c['gripper'][rows] == gripper
+        if kind is not None:
+            mask &= c['kind'][rows] == kind
+        if good is not None:
+            mask &= c['good'][rows] == good
+        if error_type is not None:
+            mask &= c['error_type'][rows] == error_type
+        if location is not None:
+            mask &= c['location'][rows] == location
+        if start is not None:
+            mask &= c['time'][rows] >= start - self.origin
+        if end is not None:
+            mask &= c['time'][rows] <= end - self.origin
+        return rows[mask]
+
+    def rows(self, row_numbers):
+        """
+        Yields:
+            dict: one record per row number
+        """
+        names = list(self.columns)
+        for row in row_numbers:
+            record = {name: self.columns[name][row].item() for name in names}
+            record['time'] += self.origin
+            yield record
+
+    def save(self, path):
+        np.savez_compressed(path, origin=np.float64(self.origin), **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        _require_numpy()
+        with np.load(path) as f:
+            columns = {name: f[name] for name in COLUMNS}
+            origin = float(f['origin'])
+        return cls(columns, origin)
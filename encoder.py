@@ -0,0 +1,176 @@
+# Telegram encoder
+# Builds valid AlphaLiner telegrams from the same spec tables and BCC rule the analyzer decodes with:
+# MSB set on C1, C2 and every data character, BCC = XOR over C1..Dn with the reserved-value increment.
+#
+#   encode_telegram(CONTROLLER, 'PROD_ORDER', seq, prod_order_data(copy_id=17, insert_mask=0b1011))
+
+import saleae_stub
+
+saleae_stub.install()
+
+from HighLevelAnalyzer import (  # noqa: E402
+    STX, ETX, HEADER_LENGTH, TRAILER_LENGTH, TABLE_BITS, TELEGRAM_TABLES, BCC_RESERVED, AlphaLinerSerialAnalyzer,
+)
+
+
+def build_telegram(seq, method, data):
+    """
+    Frames raw values: MSB set on C1, C2 and data, BCC with reserved-value increment.
+
+    Args:
+        seq: message number C1 (0..127, wraps)
+        method: message identification C2 (0..127)
+        data: D1..Dn values (0..127 each, higher bits are dropped)
+
+    Returns:
+        bytes: telegram STX .. ETX
+    """
+    payload = bytes([0x80 | (seq & 0x7F), 0x80 | (method & 0x7F)] + [0x80 | (d & 0x7F) for d in data])
+    return bytes((STX,)) + payload + bytes((AlphaLinerSerialAnalyzer.compute_bcc(payload), ETX))
+
+
+def method_of(direction, telegram):
+    """
+    Args:
+        direction: CONTROLLER or ALPHALINER
+        telegram: frame type name (e.g. 'COPY_COMPLETE') or C2 code
+
+    Returns:
+        int: C2 code
+    """
+    table = TELEGRAM_TABLES[direction]
+    if isinstance(telegram, int):
+        if telegram not in table:
+            raise ValueError(f"Unknown {direction} method {telegram}")
+        return telegram
+    for method, (_, frame_type, _) in table.items():
+        if frame_type == telegram:
+            return method
+    raise ValueError(f"Unknown {direction} telegram '{telegram}'")
+
+
+def encode_telegram(direction, telegram, seq, data=()):
+    """
+    Builds a telegram after checking the data length against the spec of the direction.
+
+    Args:
+        direction: CONTROLLER or ALPHALINER
+        telegram: frame type name or C2 code
+        seq: message number C1
+        data: D1..Dn values
+
+    Returns:
+        bytes: telegram STX .. ETX
+    """
+    method = method_of(direction, telegram)
+    expected = TELEGRAM_TABLES[direction][method][0] - HEADER_LENGTH - TRAILER_LENGTH
+    if len(data) != expected:
+        raise ValueError(f"{telegram} takes {expected} data bytes, got {len(data)}")
+    return build_telegram(seq, method, data)
+
+
+def damage_bcc(telegram):
+    """
+    Flips one bit of the BCC, the lowest one that does not turn it into a control character, so
+    the receiver sees a BCC mismatch rather than a resync, an early ETX or an ACK/NAK.
+
+    Args:
+        telegram: valid telegram STX .. ETX
+
+    Returns:
+        bytearray: the telegram with a wrong BCC
+    """
+    damaged = bytearray(telegram)
+    bcc = damaged[-2]
+    damaged[-2] = next(bcc ^ bit for bit in (0x01, 0x02, 0x04, 0x08) if bcc ^ bit not in BCC_RESERVED)
+    return damaged
+
+
+def damage_etx(telegram):
+    """
+    Sets the MSB of the ETX: the receiver gets a data character where the ETX belongs (invalid
+    ETX) instead of another control character.
+
+    Returns:
+        bytearray: the telegram with a wrong last character
+    """
+    damaged = bytearray(telegram)
+    damaged[-1] = ETX | 0x80
+    return damaged
+
+
+# Field encoders, the inverse of the analyzer decoders. All return lists of 7-bit values.
+
+def word(value):
+    """
+    14-bit value as two 7-bit characters (high, low), e.g. CopyID, gripper, error location.
+    """
+    return [(value >> 7) & 0x7F, value & 0x7F]
+
+
+def long_word(value):
+    """
+    28-bit value as four 7-bit characters, e.g. the number of copies of a production order.
+    """
+    return [(value >> shift) & 0x7F for shift in (21, 14, 7, 0)]
+
+
+def table(mask):
+    """
+    Feeder/insert table (bit 0 = Jacket .. bit 30 = feeder 30) as the five characters D1..D5.
+    """
+    mask &= (1 << TABLE_BITS) - 1
+    return [(mask >> shift) & 0x7F for shift in (28, 21, 14, 7, 0)]
+
+
+def table_of(feeders):
+    """
+    Returns:
+        int: table mask with the given feeder numbers set (0 = Jacket)
+    """
+    mask = 0
+    for feeder in feeders:
+        mask |= 1 << feeder
+    return mask
+
+
+def status_data(mode=2, ready_to_go=False, data_ready=False):
+    return [(mode & 0x03) | (0x04 if ready_to_go else 0), 1 if data_ready else 0]
+
+
+def error_data(fault, cause, priority):
+    return [fault, cause, priority]
+
+
+def statistic_data(error_type, location, copy_id):
+    return [error_type] + word(location) + word(copy_id)
+
+
+def copy_complete_data(copy_id, gripper, insert_mask, good=True):
+    copy_high, copy_low = word(copy_id & 0x1FFF)
+    return [(0x40 if good else 0) | (copy_high & 0x3F), copy_low] + word(gripper & 0xFFF) + table(insert_mask)
+
+
+def copy_failed_data(error_type, location, copy_id, insert_mask):
+    return statistic_data(error_type, location, copy_id) + table(insert_mask)
+
+
+def prod_config_data(feeders, doublefeed=0, missfeed=0, backup=0, low_level=0):
+    return table(feeders) + table(doublefeed) + table(missfeed) + table(backup) + table(low_level)
+
+
+def prod_order_data(copy_id, insert_mask, copies=1, reserved=0):
+    return word(copy_id) + table(insert_mask) + [reserved] + long_word(copies)
+
+
+def machine_config_data(feeders, detector_mask):
+    return [feeders] + table(detector_mask)
+
+
+def config_data(data_id, values):
+    return [data_id] + list(values)
+
+
+def double_detector_test_data(feeder, thickness, mean, sensor=0, copy_present=True, faulty=False):
+    d1 = (feeder & 0x1F) | (0x20 if copy_present else 0) | ((sensor & 0x01) << 6)
+    return [d1] + word(thickness) + word(mean) + [1 if faulty else 0]
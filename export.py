@@ -0,0 +1,156 @@
+# Export of decoded telegrams
+# Streams decoded frames into an SQLite database (one row per frame, batched executemany inserts
+# committed in large transactions, indexes built after the load) or into JSON lines. Both writers
+# consume the frames as they are decoded and keep at most one batch in memory.
+#
+#   python cli.py export capture.bin --direction alphaliner -o shift.db
+#   sqlite3 shift.db "SELECT timestamp, gripper FROM telegrams WHERE type = 'COPY_FAILED'"
+
+import json
+import sqlite3
+import sys
+from itertools import islice
+
+import saleae_stub
+
+saleae_stub.install()
+
+import offline  # noqa: E402
+from HighLevelAnalyzer import TELEGRAM_TABLES  # noqa: E402
+
+
+BATCH_SIZE = 10000         # rows per executemany
+TRANSACTION_ROWS = 500000  # rows per commit
+CACHE_KIB = 65536          # SQLite page cache during the export
+JSONL_SUFFIXES = ('.jsonl', '.json', '.ndjson')
+
+# Frame type -> C2 code (frame type names are unique across both directions)
+METHOD_CODES = {entry[1]: method for table in TELEGRAM_TABLES.values() for method, entry in table.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS telegrams (
+    id INTEGER PRIMARY KEY,
+    capture TEXT,
+    timestamp REAL NOT NULL,
+    end_time REAL NOT NULL,
+    type TEXT NOT NULL,
+    method INTEGER,
+    seq INTEGER,
+    copy_id INTEGER,
+    gripper INTEGER,
+    data TEXT
+)
+"""
+
+# Index name -> column, created after the rows are loaded
+INDEXES = {
+    'telegrams_copy_id': 'copy_id',
+    'telegrams_gripper': 'gripper',
+    'telegrams_method': 'method',
+    'telegrams_timestamp': 'timestamp',
+}
+
+INSERT = ("INSERT INTO telegrams (capture, timestamp, end_time, type, method, seq, copy_id, gripper, data) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+_encode = json.JSONEncoder(separators=(',', ':'), check_circular=False).encode
+
+
+def iter_rows(frames, capture=None):
+    """
+    Args:
+        frames: decoded AnalyzerFrames or TelegramRecords
+        capture: value of the capture column (e.g. the capture file name)
+
+    Yields:
+        tuple: one telegrams row per frame (without id)
+    """
+    methods = METHOD_CODES
+    for frame in frames:
+        data = frame.data
+        if data:
+            get = data.get
+            yield (capture, frame.start_time, frame.end_time, frame.type, methods.get(frame.type), get('seq'),
+                   get('copy_id'), get('gripper'), _encode(dict(data)))
+        else:
+            yield (capture, frame.start_time, frame.end_time, frame.type, methods.get(frame.type), None,
+                   None, None, None)
+
+
+def create_indexes(connection):
+    for name, column in INDEXES.items():
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON telegrams ({column})")
+
+
+def export_sqlite(frames, path, capture=None, batch_size=BATCH_SIZE, transaction_rows=TRANSACTION_ROWS):
+    """
+    Appends decoded frames to the telegrams table of an SQLite database (created if missing).
+
+    The indexes are dropped for the load and rebuilt at the end (also when the load fails),
+    which is much faster than maintaining them row by row.
+
+    Args:
+        frames: decoded frames, consumed lazily
+        path: database file
+        capture: value of the capture column
+        batch_size: rows per executemany call
+        transaction_rows: rows per transaction
+
+    Returns:
+        int: number of rows written
+    """
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA cache_size = -{CACHE_KIB}")  # also speeds up the index build
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute(SCHEMA)
+        for name in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {name}")
+
+        rows = iter_rows(frames, capture)
+        written = 0
+        in_transaction = 0
+        try:
+            connection.execute("BEGIN")
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                connection.executemany(INSERT, batch)
+                written += len(batch)
+                in_transaction += len(batch)
+                if in_transaction >= transaction_rows:
+                    connection.execute("COMMIT")
+                    connection.execute("BEGIN")
+                    in_transaction = 0
+            connection.execute("COMMIT")
+        finally:
+            # A failed load keeps the transactions committed so far, the indexes are rebuilt either way
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            create_indexes(connection)
+    finally:
+        connection.close()
+    return written
+
+
+def export_jsonl(frames, out=None):
+    """
+    Writes one JSON object per decoded frame and line.
+
+    Args:
+        frames: decoded frames, consumed lazily
+        out: text file (default stdout)
+
+    Returns:
+        int: number of lines written
+    """
+    out = out or sys.stdout
+    write = out.write
+    written = 0
+    for frame in frames:
+        write(_encode(offline.frame_json(frame)))
+        write('\n')
+        written += 1
+    return written
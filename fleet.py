@@ -0,0 +1,388 @@
+# Fleet batch decoding
+# Decodes the captures of many machines (a directory tree or glob patterns) in a process pool,
+# one capture per job, with per-machine settings. Every capture gets its own output file (see
+# output_path) and a merged report sums throughput, fault counts and link statistics per machine
+# and for the fleet.
+#
+#   python cli.py fleet /data/captures/2026-10-17 --config fleet.json -o /data/decoded/2026-10-17
+#
+# fleet.json (all keys optional; machine settings override the defaults, which override the
+# command line):
+#   {
+#     "default": {"direction": "alphaliner"},
+#     "machines": {
+#       "AL01": {"files": "*AL01*", "link_stats": true},
+#       "AL02": {"files": ["*AL02*", "*line2*"], "direction": "auto", "only": "COPY_FAILED,ERROR_MSG"}
+#     }
+#   }
+
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatch
+
+import export
+import offline
+
+
+CAPTURE_SUFFIXES = ('.csv', '.bin', '.txt', '.hex', '.sniff', '.snf')
+OUTPUT_SUFFIXES = {'txt': '.txt', 'jsonl': '.jsonl', 'sqlite': '.db'}
+REPORT_NAME = 'fleet_report.json'
+
+# Settings a machine entry may set (same names as the decode options)
+SETTING_KEYS = ('direction', 'format', 'no_ack', 'no_nak', 'only', 'all_detector_tests', 'link_stats')
+
+# Link summary counters carried into the report when link_stats is set (in Auto mode summed over
+# both senders and the answers to framing errors)
+LINK_COUNTERS = ('naks', 'timeouts', 'retransmissions', 'seq_gaps')
+
+# Report counters summed per machine and for the fleet
+TOTALS = ('files', 'failed_files', 'bytes', 'frames', 'decode_s', 'capture_s', 'copies_complete',
+          'copies_failed', 'error_msgs', 'bad_frames') + LINK_COUNTERS
+
+
+def find_captures(inputs, exclude=None):
+    """
+    Expands directories (searched recursively for capture files) and glob patterns.
+
+    Args:
+        inputs: directories, files or glob patterns
+        exclude: directory whose files are skipped (e.g. the output directory)
+
+    Returns:
+        list: capture paths, sorted and without duplicates
+    """
+    exclude = os.path.abspath(exclude) + os.sep if exclude else None
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                found.update(os.path.join(root, name) for name in names if name.lower().endswith(CAPTURE_SUFFIXES))
+        elif os.path.isfile(item):
+            found.add(item)
+        else:
+            found.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    found = {os.path.normpath(path) for path in found}
+    return sorted(path for path in found if not (exclude and os.path.abspath(path).startswith(exclude)))
+
+
+def load_config(path):
+    """
+    Returns:
+        dict: fleet configuration (see the module header), empty without a path
+    """
+    if not path:
+        return {}
+    with open(path) as f:
+        config = json.load(f)
+    for name, machine in config.get('machines', {}).items():
+        unknown = set(machine) - set(SETTING_KEYS) - {'files'}
+        if unknown:
+            raise ValueError(f"{path}: machine {name}: unknown settings {', '.join(sorted(unknown))}")
+    return config
+
+
+def machine_of(path, config, defaults):
+    """
+    Finds the machine of a capture: the first machine whose files pattern matches the path,
+    otherwise the file name without extension.
+
+    Args:
+        path: capture path
+        config: fleet configuration
+        defaults: settings from the command line
+
+    Returns:
+        tuple: (machine name, settings dict)
+    """
+    settings = dict(defaults, **config.get('default', {}))
+    for name, machine in config.get('machines', {}).items():
+        patterns = machine.get('files', f'*{name}*')
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if any(fnmatch(path, pattern) for pattern in patterns):
+            settings.update((key, value) for key, value in machine.items() if key != 'files')
+            return name, settings
+    return os.path.splitext(os.path.basename(path))[0], settings
+
+
+class FrameTally:
+    """
+    Counts the frames of a capture on their way to the output.
+    """
+
+    def __init__(self):
+        self.types = Counter()
+        self.failures = Counter()   # COPY_FAILED error name -> count
+        self.first = None
+        self.last = None
+
+
+    def count(self, frames):
+        """
+        Yields:
+            frames unchanged
+        """
+        types = self.types
+        for frame in frames:
+            frame_type = frame.type
+            types[frame_type] += 1
+            if frame_type == 'COPY_FAILED':
+                self.failures[frame.data.get('error_name')] += 1
+            if self.first is None:
+                self.first = frame.start_time
+            self.last = frame.end_time
+            yield frame
+
+
+    def report(self):
+        """
+        Returns:
+            dict: frame, copy and fault counts and the copy rate over the captured time span
+        """
+        types = self.types
+        capture_s = float(self.last - self.first) if self.first is not None else 0.0
+        copies = types['COPY_COMPLETE']
+        return {
+            'frames': sum(types.values()),
+            'capture_s': capture_s,
+            'copies_complete': copies,
+            'copies_failed': types['COPY_FAILED'],
+            'copies_per_hour': copies * 3600.0 / capture_s if capture_s > 0 else None,
+            'error_msgs': types['ERROR_MSG'],
+            'bad_frames': types['UNKNOWN'],
+            'failures': dict(self.failures),
+        }
+
+
+def _count_bytes(events, counter):
+    for event in events:
+        counter[0] += 1
+        yield event
+
+
+def _remove_output(job):
+    """
+    Removes the output of a failed capture, so no partial output is left behind.
+    """
+    output = job['output']
+    if output is not None and os.path.exists(output):
+        try:
+            os.remove(output)
+        except OSError:
+            pass
+
+
+def _failed_entry(job, error):
+    """
+    Returns:
+        dict: report entry of a capture whose worker did not return one (e.g. the process died)
+    """
+    _remove_output(job)
+    return {'file': job['path'], 'machine': job['machine'], 'direction': job['settings']['direction'],
+            'output': job['output'], 'error': f"{type(error).__name__}: {error}"}
+
+
+def decode_capture(job):
+    """
+    Worker: decodes one capture, writes its output and returns its report entry.
+
+    Args:
+        job: dict with path, machine, settings, output (None = no output) and output_type
+
+    Returns:
+        dict: report entry of the capture; 'error' is set when it could not be decoded
+    """
+    path = job['path']
+    settings = job['settings']
+    entry = {'file': path, 'machine': job['machine'], 'direction': settings['direction'], 'output': job['output']}
+    started = time.perf_counter()
+    try:
+        analyzer = offline.create_analyzer(settings['direction'], show_ack=not settings.get('no_ack'),
+                                           show_nak=not settings.get('no_nak'),
+                                           method_filter=settings.get('only') or '',
+                                           detector_frames='Every Test' if settings.get('all_detector_tests')
+                                           else 'Statistics per Feeder',
+                                           link_stats='Yes' if settings.get('link_stats') else 'No')
+        fmt = settings.get('format') or offline.guess_format(path)
+        stats = {}
+        byte_count = [0]
+        reader = offline.READERS[fmt]
+        events = reader(path, stats=stats) if fmt == 'edges' else reader(path)
+        frames = offline.decode_frames(analyzer, offline.iter_input_frames(_count_bytes(events, byte_count)))
+
+        tally = FrameTally()
+        frames = tally.count(frames)
+        output, output_type = job['output'], job['output_type']
+        if output is None:
+            for _ in frames:
+                pass
+        else:
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            if output_type == 'sqlite':
+                if os.path.exists(output):
+                    os.remove(output)  # a rerun replaces the rows of the previous run
+                export.export_sqlite(frames, output, capture=path)
+            else:
+                with open(output, 'w') as out:
+                    if output_type == 'jsonl':
+                        export.export_jsonl(frames, out)
+                    else:
+                        formatter = offline.FrameFormatter()
+                        for frame in frames:
+                            out.write(f"{frame.start_time:.6f}\t{frame.end_time:.6f}\t{formatter(frame)}\n")
+    except Exception as e:  # one broken capture must not end the batch
+        entry['error'] = f"{type(e).__name__}: {e}"
+        entry['decode_s'] = time.perf_counter() - started
+        _remove_output(job)
+        return entry
+
+    entry['bytes'] = byte_count[0]
+    entry['decode_s'] = time.perf_counter() - started
+    entry.update(tally.report())
+    if analyzer.link is not None:
+        link = analyzer.link.summary()
+        for counter in LINK_COUNTERS:
+            entry[counter] = sum(value for key, value in link.items()
+                                 if (key == counter or key.endswith('_' + counter)) and value is not None)
+    entry.update(stats)
+    return entry
+
+
+def _add_totals(totals, entry):
+    totals['files'] = totals.get('files', 0) + 1
+    if 'error' in entry:
+        totals['failed_files'] = totals.get('failed_files', 0) + 1
+        return
+    for key in TOTALS[2:]:
+        if key in entry:  # link counters only with link statistics
+            totals[key] = totals.get(key, 0) + (entry[key] or 0)
+    failures = totals.setdefault('failures', {})
+    for name, count in entry['failures'].items():
+        failures[name] = failures.get(name, 0) + count
+
+
+def merge_report(entries, elapsed):
+    """
+    Args:
+        entries: report entries of the captures
+        elapsed: wall-clock seconds of the batch
+
+    Returns:
+        dict: per-file entries, totals per machine and for the fleet, batch throughput
+    """
+    machines = {}
+    fleet = {}
+    for entry in entries:
+        _add_totals(machines.setdefault(entry['machine'], {}), entry)
+        _add_totals(fleet, entry)
+    for totals in list(machines.values()) + [fleet]:
+        capture_s = totals.get('capture_s', 0.0)
+        totals['copies_per_hour'] = totals.get('copies_complete', 0) * 3600.0 / capture_s if capture_s else None
+    fleet['elapsed_s'] = elapsed
+    fleet['bytes_per_sec'] = fleet.get('bytes', 0) / elapsed if elapsed else None
+    return {
+        'fleet': fleet,
+        'machines': dict(sorted(machines.items())),
+        'files': sorted(entries, key=lambda entry: (entry['machine'], entry['file'])),
+    }
+
+
+def output_path(path, root, machine, output_dir, output_type):
+    """
+    Output file of a capture: its path below the common input directory, file name with
+    extension, plus the suffix of the output type, so captures that share a name (a/cap.bin and
+    b/cap.bin, or cap.csv and cap.bin) never share an output file.
+
+    Args:
+        path: capture path
+        root: common directory of all captures of the batch
+        machine: machine name of the capture
+        output_dir: base output directory
+        output_type: 'txt', 'jsonl' or 'sqlite'
+
+    Returns:
+        string: e.g. <output_dir>/<machine>/2026-10-17/cap.bin.txt
+    """
+    relative = os.path.relpath(os.path.abspath(path), root)
+    return os.path.normpath(os.path.join(output_dir, machine, relative + OUTPUT_SUFFIXES[output_type]))
+
+
+def run_fleet(paths, output_dir, config=None, defaults=None, output_type='txt', workers=None, progress=None):
+    """
+    Decodes captures in a process pool and writes the merged report.
+
+    Args:
+        paths: capture files (see find_captures)
+        output_dir: per-machine output directories and the report go here
+        config: fleet configuration (see load_config)
+        defaults: settings from the command line (direction, no_ack, ...)
+        output_type: 'txt', 'jsonl', 'sqlite' or 'none'
+        workers: number of processes (default: CPU count)
+        progress: optional callable(done, total, entry) called as captures finish
+
+    Returns:
+        dict: merged report (see merge_report), also saved as REPORT_NAME in output_dir
+    """
+    config = config or {}
+    defaults = dict({'direction': 'controller'}, **(defaults or {}))
+    workers = workers or os.cpu_count() or 1
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else ''
+    jobs = []
+    outputs = {}
+    for path in paths:
+        machine, settings = machine_of(path, config, defaults)
+        if settings['direction'] not in offline.DIRECTIONS:
+            raise ValueError(f"{machine}: unknown direction {settings['direction']!r}")
+        output = None
+        if output_type != 'none':
+            output = output_path(path, root, machine, output_dir, output_type)
+            if output in outputs:
+                raise ValueError(f"{outputs[output]} and {path} would both be written to {output}")
+            outputs[output] = path
+        jobs.append({'path': path, 'machine': machine, 'settings': settings, 'output': output,
+                     'output_type': output_type})
+    # Largest captures first, so one long capture does not start last and hold up the batch
+    jobs.sort(key=lambda job: os.path.getsize(job['path']), reverse=True)
+
+    started = time.perf_counter()
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(decode_capture, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                entry = future.result()
+            except Exception as e:  # e.g. BrokenProcessPool: report the capture and go on
+                entry = _failed_entry(futures[future], e)
+            entries.append(entry)
+            if progress is not None:
+                progress(len(entries), len(jobs), entries[-1])
+
+    report = merge_report(entries, time.perf_counter() - started)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, REPORT_NAME), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report, out=None):
+    """
+    Prints the per-machine totals of a merged report as a table.
+    """
+    out = out or sys.stderr
+    columns = ('files', 'bytes', 'copies_complete', 'copies_failed', 'error_msgs', 'bad_frames', 'naks',
+               'retransmissions', 'decode_s')
+    headers = ('machine',) + columns
+    rows = [(name,) + tuple(totals.get(column, '-') for column in columns)
+            for name, totals in report['machines'].items()]
+    rows.append(('FLEET',) + tuple(report['fleet'].get(column, '-') for column in columns))
+    cells = [headers] + [tuple(f"{value:.1f}" if isinstance(value, float) else str(value) for value in row)
+                         for row in rows]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(headers))]
+    for row in cells:
+        print('  '.join(cell.rjust(width) if index else cell.ljust(width)
+                        for index, (cell, width) in enumerate(zip(row, widths))), file=out)
@@ -0,0 +1,271 @@
+# Live serial tap
+# Reads one side of the controller <-> AlphaLiner link from a serial device (or a pty) with asyncio and
+# decodes telegrams with AlphaLinerSerialAnalyzer as the bytes arrive. Decoded frames are published as
+# JSON lines to stdout and/or to clients of a local unix socket.
+#
+#   python cli.py live /dev/ttyUSB0 --direction alphaliner --socket /tmp/alphaliner.sock
+
+import asyncio
+import json
+import os
+import sys
+import termios
+import time
+
+import offline
+
+
+READ_SIZE = 4096
+DEFAULT_QUEUE_SIZE = 4096  # published lines buffered per subscriber before the oldest are dropped
+
+
+def configure_serial(fd, speed=termios.B19200):
+    """
+    Puts a tty into raw 8O1 mode at 19200 baud.
+
+    Characters with a parity error are delivered as NUL (INPCK without IGNPAR/PARMRK); NUL never
+    appears inside a valid telegram, so the framer reports the damaged telegram instead of hiding it.
+    """
+    iflag, oflag, cflag, lflag, ispeed, ospeed, cc = termios.tcgetattr(fd)
+    iflag = termios.INPCK
+    oflag = 0
+    cflag = termios.CS8 | termios.PARENB | termios.PARODD | termios.CREAD | termios.CLOCAL
+    lflag = 0
+    cc[termios.VMIN] = 1
+    cc[termios.VTIME] = 0
+    try:
+        termios.tcsetattr(fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, speed, speed, cc])
+    except termios.error:
+        # Some pty drivers refuse PARENB once it is set (e.g. a pty opened a second time); a pty
+        # carries no parity anyway, so fall back to plain 8N1
+        cflag &= ~(termios.PARENB | termios.PARODD)
+        termios.tcsetattr(fd, termios.TCSANOW, [0, oflag, cflag, lflag, speed, speed, cc])
+
+
+def open_serial(path):
+    """
+    Returns:
+        int: non-blocking file descriptor of the configured device
+    """
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        configure_serial(fd)
+    except termios.error:
+        os.close(fd)
+        raise
+    return fd
+
+
+class Publisher:
+    """
+    Fans published lines out to subscriber queues.
+
+    Queues are bounded: a subscriber that falls behind loses its oldest lines instead of
+    delaying the decoder.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.dropped = 0
+
+
+    def subscribe(self):
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+
+    def publish(self, line):
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(line)
+
+
+    def close(self):
+        """
+        Ends every subscriber after its queued lines.
+        """
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(None)
+
+
+    async def drain(self, timeout):
+        """
+        Waits until every subscriber has taken its queued lines, at most timeout seconds.
+        """
+        deadline = time.perf_counter() + timeout
+        while any(not queue.empty() for queue in self.subscribers) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+
+
+async def write_stdout(publisher, out=None):
+    """
+    Subscriber: writes published lines to stdout, flushing whenever the queue runs empty.
+    """
+    out = out or sys.stdout
+    queue = publisher.subscribe()
+    try:
+        while True:
+            line = await queue.get()
+            if line is None:
+                break
+            out.write(line)
+            if queue.empty():
+                out.flush()
+    finally:
+        out.flush()
+        publisher.unsubscribe(queue)
+
+
+async def serve_socket(publisher, path):
+    """
+    Serves published lines to every client connecting to the unix socket at path.
+
+    Returns:
+        asyncio.Server
+    """
+    async def client(reader, writer):
+        queue = publisher.subscribe()
+        try:
+            while True:
+                line = await queue.get()
+                if line is None:
+                    break
+                writer.write(line.encode())
+                if queue.empty():
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            publisher.unsubscribe(queue)
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(client, path)
+
+
+class LiveTap:
+    """
+    Decodes the bytes of a readable file descriptor as they arrive.
+
+    Character times are reconstructed from the arrival time of each read: the last character of a
+    read ended at the arrival time, the ones before it one character time earlier each.
+    Times are seconds since the tap was created.
+    """
+
+    def __init__(self, analyzer, publisher):
+        self.analyzer = analyzer
+        self.publisher = publisher
+        self.origin = time.perf_counter()
+        self.bytes = 0
+        self.frames = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.closed = asyncio.get_running_loop().create_future()
+
+
+    def _events(self, chunk, arrived):
+        char_time = offline.CHAR_TIME
+        end = arrived - self.origin - len(chunk) * char_time
+        for byte in chunk:
+            start = end
+            end = start + char_time
+            yield start, end, byte
+
+
+    def on_readable(self, fd):
+        try:
+            chunk = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:  # EIO: the other end of a pty went away
+            chunk = b''
+        if not chunk:
+            if not self.closed.done():
+                self.closed.set_result(None)
+            return
+
+        arrived = time.perf_counter()
+        self.bytes += len(chunk)
+        publish = self.publisher.publish
+        for frame in offline.decode_frames(self.analyzer, offline.iter_input_frames(self._events(chunk, arrived)),
+                                            flush=False):
+            latency = time.perf_counter() - arrived
+            self.frames += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            publish(json.dumps(dict(offline.frame_json(frame), latency_us=round(latency * 1e6, 1))) + '\n')
+
+
+    def summary(self):
+        return {
+            'bytes': self.bytes,
+            'frames': self.frames,
+            'latency_avg_us': self.latency_total * 1e6 / self.frames if self.frames else 0.0,
+            'latency_max_us': self.latency_max * 1e6,
+            'dropped_lines': self.publisher.dropped,
+        }
+
+
+async def run_tap(device, analyzer, stdout=True, socket_path=None, queue_size=DEFAULT_QUEUE_SIZE, stop=None):
+    """
+    Taps a serial device until it closes or stop is set.
+
+    Args:
+        device: path of the serial device or pty (or an already open file descriptor)
+        analyzer: configured AlphaLinerSerialAnalyzer
+        stdout: publish JSON lines to stdout
+        socket_path: also publish to clients of this unix socket
+        queue_size: lines buffered per subscriber
+        stop: optional asyncio.Event that ends the tap
+
+    Returns:
+        dict: tap summary (bytes, frames, decode latency, dropped lines)
+    """
+    loop = asyncio.get_running_loop()
+    publisher = Publisher(queue_size)
+    tap = LiveTap(analyzer, publisher)
+    tasks = []
+    server = None
+    if stdout:
+        tasks.append(asyncio.ensure_future(write_stdout(publisher)))
+    if socket_path:
+        server = await serve_socket(publisher, socket_path)
+
+    fd = device if isinstance(device, int) else open_serial(device)
+    waits = [tap.closed]
+    if stop is not None:
+        waits.append(asyncio.ensure_future(stop.wait()))
+    loop.add_reader(fd, tap.on_readable, fd)
+    try:
+        await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        loop.remove_reader(fd)
+        if not isinstance(device, int):
+            os.close(fd)
+        for waiter in waits[1:]:
+            waiter.cancel()
+        for pending in analyzer.flush():
+            publisher.publish(json.dumps(dict(offline.frame_json(pending), latency_us=0.0)) + '\n')
+        # Let subscribers write out what was published last, then end them
+        publisher.close()
+        await publisher.drain(1.0)
+        for task in tasks:
+            task.cancel()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            os.unlink(socket_path)
+    return tap.summary()
@@ -0,0 +1,572 @@
+# Offline decoding pipeline
+# Runs AlphaLinerSerialAnalyzer outside of Logic 2 on exported captures.
+# Every stage is a generator, so memory use stays constant regardless of capture length.
+
+import csv
+import marshal
+import mmap
+import re
+import struct
+import sys
+import zlib
+from array import array
+from itertools import islice
+
+import saleae_stub
+
+saleae_stub.install()
+
+from HighLevelAnalyzer import AlphaLinerSerialAnalyzer, FRAME_OK, FRAME_ACK, FRAME_NAK  # noqa: E402
+from saleae.analyzers import AnalyzerFrame  # noqa: E402
+
+
+BAUD_RATE = 19200
+BITS_PER_CHAR = 11  # 1 start + 8 data + 1 parity + 1 stop
+CHAR_TIME = BITS_PER_CHAR / BAUD_RATE
+
+# Logic 2 binary export of digital channels (raw edges, decoded by uart.py)
+DIGITAL_EXPORT_MAGIC = b'<SALEAE>'
+
+# Raw sniffer logs: packed (timestamp, byte) records, timestamp = start of the character
+SNIFFER_RECORD = '<dB'    # float64 seconds + byte, 9 bytes per record
+SNIFFER_TIME_SCALE = 1.0  # seconds per timestamp unit (e.g. 1e-9 for '<QB' nanosecond stamps)
+
+DIRECTIONS = {
+    'controller': 'Controller (Transmit)',
+    'alphaliner': 'AlphaLiner (Receive)',
+    'auto': 'Auto (Both Directions)',
+}
+
+
+def create_analyzer(direction='controller', show_ack=True, show_nak=True, **settings):
+    """
+    Builds an AlphaLinerSerialAnalyzer configured like the Logic 2 settings dialog would.
+
+    Args:
+        direction: 'controller', 'alphaliner', 'auto' (or the full ChoicesSetting text)
+        show_ack: emit ACK frames
+        show_nak: emit NAK frames
+        **settings: any further analyzer settings by attribute name
+
+    Returns:
+        AlphaLinerSerialAnalyzer: ready to decode
+    """
+    return saleae_stub.create_analyzer(
+        AlphaLinerSerialAnalyzer,
+        com_dir=DIRECTIONS.get(direction, direction),
+        show_ack='Yes' if show_ack else 'No',
+        show_nak='Yes' if show_nak else 'No',
+        **settings)
+
+
+def _parse_byte(text):
+    text = text.strip()
+    if text.lower().startswith('0x'):
+        return int(text, 16)
+    if text.isdigit():
+        return int(text)
+    if text.startswith('\\x'):
+        return int(text[2:], 16)
+    if len(text) == 1:
+        return ord(text)
+    if text.startswith("b'") or text.startswith('b"'):
+        # Python bytes repr as written by some exporters
+        return text[2:-1].encode('latin-1').decode('unicode_escape').encode('latin-1')[0]
+    raise ValueError(f"Cannot parse byte value {text!r}")
+
+
+def iter_csv_bytes(path):
+    """
+    Reads a Logic 2 Async Serial export (name,type,start_time,duration,data[,error]).
+    Logic 1 style exports (Time [s],Value,...) are accepted as well.
+
+    Yields:
+        tuple: (start_time, end_time, byte)
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [h.strip().strip('"').lower() for h in next(reader)]
+
+        if 'start_time' in header:
+            time_col = header.index('start_time')
+            duration_col = header.index('duration') if 'duration' in header else None
+            data_col = header.index('data')
+        elif 'time [s]' in header:
+            time_col = header.index('time [s]')
+            duration_col = None
+            data_col = header.index('value')
+        else:
+            raise ValueError(f"{path}: unrecognised CSV header {header}")
+        type_col = header.index('type') if 'type' in header else None
+
+        for row in reader:
+            if not row:
+                continue
+            if type_col is not None and row[type_col] != 'data':
+                continue
+            start = float(row[time_col])
+            end = start + (float(row[duration_col]) if duration_col is not None else CHAR_TIME)
+            yield start, end, _parse_byte(row[data_col])
+
+
+def iter_binary_bytes(path, chunk_size=1 << 16):
+    """
+    Reads a raw byte log. Timing is synthesised from the 19200 baud 8O1 character time.
+
+    Yields:
+        tuple: (start_time, end_time, byte)
+    """
+    index = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            for byte in chunk:
+                start = index * CHAR_TIME
+                yield start, start + CHAR_TIME, byte
+                index += 1
+
+
+def iter_hex_bytes(path):
+    """
+    Reads a text byte log of whitespace separated hex values (e.g. "02 81 84 ... 03").
+    Timing is synthesised like iter_binary_bytes.
+
+    Yields:
+        tuple: (start_time, end_time, byte)
+    """
+    index = 0
+    with open(path) as f:
+        for line in f:
+            for token in line.split('#', 1)[0].split():
+                start = index * CHAR_TIME
+                yield start, start + CHAR_TIME, int(token, 16)
+                index += 1
+
+
+def iter_sniffer_bytes(path, record_format=SNIFFER_RECORD, time_scale=SNIFFER_TIME_SCALE):
+    """
+    Reads a raw sniffer log of packed (timestamp, byte) records through mmap.
+
+    The file is never read into memory: records are unpacked straight from a memoryview of
+    the mapping, so multi-GB logs stream at page cache speed. An incomplete record at the end
+    (log still being written) is ignored.
+
+    Args:
+        path: sniffer log
+        record_format: struct format of one record, timestamp field first, byte field second
+        time_scale: seconds per timestamp unit
+
+    Yields:
+        tuple: (start_time, end_time, byte)
+    """
+    record = struct.Struct(record_format)
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        usable = size - size % record.size
+        if not usable:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            view = memoryview(mapping)[:usable]
+            records = record.iter_unpack(view)
+            try:
+                for timestamp, byte in records:
+                    start = timestamp * time_scale
+                    yield start, start + CHAR_TIME, byte
+            finally:
+                # Drop the buffer exports before the mapping is closed
+                del records
+                view.release()
+
+
+def iter_edge_bytes(path, stats=None):
+    """
+    Reads a Logic 2 raw digital export of the UART line and recovers the characters from the
+    signal transitions (uart.py, requires numpy) instead of the Async Serial analyzer.
+    Characters with a parity or framing error are delivered as NUL.
+
+    Args:
+        path: digital export, CSV or binary
+        stats: optional dict, updated with the UART error counts
+
+    Yields:
+        tuple: (start_time, end_time, byte)
+    """
+    import uart  # numpy is only needed for raw-edge captures
+    data, starts, ends = uart.load_capture(path, stats=stats)
+    yield from zip(starts.tolist(), ends.tolist(), data.tolist())
+
+
+def is_edge_export(path):
+    """
+    Returns:
+        bool: True if path is a Logic 2 raw digital export (binary, or CSV with a time column
+              followed by channel columns) rather than Async Serial data or a byte log
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(256)
+    except OSError:
+        return False
+    if head.startswith(DIGITAL_EXPORT_MAGIC):
+        return True
+    try:
+        header = [h.strip().strip('"').lower() for h in head.decode('ascii').splitlines()[0].split(',')]
+    except (UnicodeDecodeError, IndexError):
+        return False
+    return len(header) > 1 and header[0] == 'time [s]' and 'value' not in header
+
+
+READERS = {
+    'csv': iter_csv_bytes,
+    'bin': iter_binary_bytes,
+    'hex': iter_hex_bytes,
+    'sniff': iter_sniffer_bytes,
+    'edges': iter_edge_bytes,
+}
+
+
+def guess_format(path):
+    lower = str(path).lower()
+    if lower.endswith(('.txt', '.hex')):
+        return 'hex'
+    if lower.endswith(('.sniff', '.snf')):
+        return 'sniff'
+    if is_edge_export(path):
+        return 'edges'
+    return 'csv' if lower.endswith('.csv') else 'bin'
+
+
+# One shared, never modified data dict per byte value instead of a new dict and bytes object per character
+_BYTE_DATA = tuple({'data': bytes((byte,))} for byte in range(256))
+
+
+def iter_input_frames(byte_events):
+    """
+    Wraps (start, end, byte) tuples into the 'data' frames Async Serial hands to an HLA.
+
+    Yields:
+        AnalyzerFrame: low level serial frames
+    """
+    data = _BYTE_DATA
+    for start, end, byte in byte_events:
+        yield AnalyzerFrame('data', start, end, data[byte])
+
+
+class TelegramRecord:
+    """
+    Compact replacement for a decoded AnalyzerFrame that is kept around (batch results, worker results).
+
+    Every frame type/field set gets its own subclass with one slot per field instead of a dict,
+    repeated strings (status texts, error names, insert positions) are interned. The record is its
+    own data mapping, so record.data['copy_id'] and record.data.get(...) work like on a frame.
+    """
+
+    __slots__ = ('type', 'start_time', 'end_time')
+    fields = ()
+
+    @property
+    def data(self):
+        return self if self.fields else None
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.fields else default
+
+    def keys(self):
+        return self.fields
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.fields}
+
+    def __reduce__(self):
+        values = tuple(getattr(self, key) for key in self.fields)
+        return make_record, (self.type, self.fields, self.start_time, self.end_time, values)
+
+    def __repr__(self):
+        return f"TelegramRecord({self.type!r}, {self.start_time!r}, {self.end_time!r}, {self.as_dict()!r})"
+
+
+_RECORD_TYPES = {}
+_RECORD_KINDS = {}
+_RESERVED_FIELDS = frozenset(dir(TelegramRecord))
+
+
+def _record_type(fields):
+    cls = _RECORD_TYPES.get(fields)
+    if cls is None:
+        cls = type('TelegramRecord', (TelegramRecord,), {'__slots__': fields, 'fields': fields})
+        _RECORD_TYPES[fields] = cls
+    return cls
+
+
+def _record_kind(frame_type, fields):
+    """
+    Checks the field names and interns the frame type once per frame type/field set.
+
+    Returns:
+        tuple: (record class, interned frame type), None if the fields cannot be slots
+    """
+    key = (frame_type, fields)
+    if key not in _RECORD_KINDS:
+        if _RESERVED_FIELDS.intersection(fields) or not all(name.isidentifier() for name in fields):
+            _RECORD_KINDS[key] = None
+        else:
+            _RECORD_KINDS[key] = (_record_type(fields), sys.intern(frame_type))
+    return _RECORD_KINDS[key]
+
+
+def _new_record(kind, start_time, end_time, items):
+    cls, frame_type = kind
+    record = cls.__new__(cls)
+    record.type = frame_type
+    record.start_time = start_time
+    record.end_time = end_time
+    intern = sys.intern
+    for name, value in items:
+        setattr(record, name, intern(value) if value.__class__ is str else value)
+    return record
+
+
+def make_record(frame_type, fields, start_time, end_time, values):
+    """
+    Returns:
+        TelegramRecord: record with the given field names and values, strings interned
+    """
+    kind = _RECORD_KINDS.get((frame_type, fields)) or _record_kind(frame_type, fields)
+    if kind is None:
+        raise ValueError(f"{frame_type}: fields {fields} cannot be record slots")
+    return _new_record(kind, start_time, end_time, zip(fields, values))
+
+
+def compact_frame(frame):
+    """
+    Returns:
+        TelegramRecord: compact copy of the frame (the frame itself if its fields cannot be slots)
+    """
+    if isinstance(frame, TelegramRecord):
+        return frame
+    data = frame.data or {}
+    key = (frame.type, tuple(data))
+    kind = _RECORD_KINDS.get(key) or _record_kind(*key)
+    if kind is None:
+        return frame
+    return _new_record(kind, frame.start_time, frame.end_time, data.items())
+
+
+def _emit(step, analyzer, items, compact, flush):
+    for item in items:
+        result = step(item)
+        if result is None:
+            continue
+        if isinstance(result, list):
+            if compact:
+                yield from map(compact_frame, result)
+            else:
+                yield from result
+        else:
+            yield compact_frame(result) if compact else result
+
+    if flush:
+        pending = analyzer.flush()
+        yield from map(compact_frame, pending) if compact else pending
+
+
+def decode_frames(analyzer, input_frames, compact=False, flush=True):
+    """
+    Feeds low level frames through analyzer.decode.
+
+    Args:
+        analyzer: configured AlphaLinerSerialAnalyzer
+        input_frames: low level serial frames
+        compact: yield TelegramRecords instead of AnalyzerFrames, for results that are kept in memory
+        flush: input_frames is the end of the capture, also yield what the analyzer still holds back
+
+    Yields:
+        AnalyzerFrame: every frame the analyzer produced, in order
+    """
+    return _emit(analyzer.decode, analyzer, input_frames, compact, flush)
+
+
+class FramedStream:
+    """
+    Output of the framing stage (AlphaLinerSerialAnalyzer.iter_framed) for a whole capture.
+
+    Stored in columns (one array per tuple field, D bytes and error texts concatenated in one
+    buffer) so long captures stay small in memory and serialise quickly for the cache. Framing
+    depends only on the bytes and the direction; presenting the stream again with other display
+    settings (present_frames) skips the byte-level work.
+    """
+
+    def __init__(self):
+        self.results = array('b')
+        self.starts = array('d')
+        self.ends = array('d')
+        self.seqs = array('B')
+        self.methods = array('B')
+        self.interrupted = array('B')   # ACK/NAK inside an unfinished telegram
+        self.offsets = array('q', [0])  # event i owns payload[offsets[i]:offsets[i + 1]]
+        self.payload = bytearray()
+        self.bytes = 0                  # capture bytes that were framed
+
+
+    def append(self, result, start, end, seq, method, data, interrupted):
+        self.results.append(result)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.seqs.append(seq)
+        self.methods.append(method)
+        self.interrupted.append(interrupted)
+        if data:
+            self.payload += data if result == FRAME_OK else data.encode()
+        self.offsets.append(len(self.payload))
+
+
+    def __len__(self):
+        return len(self.results)
+
+
+    def __iter__(self):
+        """
+        Yields:
+            tuple: framed events as produced by iter_framed
+        """
+        payload = bytes(self.payload)
+        offsets = self.offsets
+        columns = zip(self.results, self.starts, self.ends, self.seqs, self.methods, self.interrupted,
+                      offsets, islice(offsets, 1, None))
+        for result, start, end, seq, method, interrupted, first, last in columns:
+            if result == FRAME_OK:
+                data = payload[first:last]
+            elif result == FRAME_ACK or result == FRAME_NAK:
+                data = None
+            else:
+                data = payload[first:last].decode()
+            yield (result, start, end, seq, method, data, interrupted != 0)
+
+
+    def to_bytes(self):
+        columns = (self.results, self.starts, self.ends, self.seqs, self.methods, self.interrupted, self.offsets)
+        return zlib.compress(marshal.dumps((self.bytes, [c.tobytes() for c in columns], bytes(self.payload))), 1)
+
+
+    @classmethod
+    def from_bytes(cls, blob):
+        stream = cls()
+        stream.bytes, columns, payload = marshal.loads(zlib.decompress(blob))
+        stream.offsets = array('q')
+        for column, raw in zip((stream.results, stream.starts, stream.ends, stream.seqs, stream.methods,
+                                stream.interrupted, stream.offsets), columns):
+            column.frombytes(raw)
+        stream.payload = bytearray(payload)
+        return stream
+
+
+def frame_capture(analyzer, byte_events):
+    """
+    Runs only the framing stage over a capture.
+
+    Args:
+        analyzer: AlphaLinerSerialAnalyzer providing the direction's framer (settings other than
+                  the direction do not matter)
+        byte_events: (start, end, byte) tuples, e.g. from READERS
+
+    Returns:
+        FramedStream: framed events of the capture
+    """
+    stream = FramedStream()
+    append = stream.append
+    count = [0]
+
+    def counted():
+        for event in byte_events:
+            count[0] += 1
+            yield event
+
+    for event in analyzer.iter_framed(iter_input_frames(counted())):
+        append(*event)
+    stream.bytes = count[0]
+    return stream
+
+
+def present_frames(analyzer, events, compact=False, flush=True):
+    """
+    Presentation stage: turns framed events (a FramedStream or iter_framed output) into frames
+    with the display settings of analyzer. The result is identical to decode_frames on the capture.
+
+    Yields:
+        AnalyzerFrame: every frame the analyzer produced, in order
+    """
+    return _emit(analyzer.present, analyzer, events, compact, flush)
+
+
+def decode_file(path, fmt=None, **analyzer_settings):
+    """
+    Convenience wrapper: file → analyzer → decoded frames.
+
+    Yields:
+        AnalyzerFrame: decoded frames
+    """
+    reader = READERS[fmt or guess_format(path)]
+    analyzer = create_analyzer(**analyzer_settings)
+    yield from decode_frames(analyzer, iter_input_frames(reader(path)))
+
+
+def frame_json(frame):
+    """
+    Returns:
+        dict: JSON-ready representation of a decoded frame (type, start, end, data), as exported
+              and published by the live tap
+    """
+    data = frame.data
+    return {
+        'type': frame.type,
+        'start': frame.start_time,
+        'end': frame.end_time,
+        'data': dict(data) if data else None,
+    }
+
+
+_TEMPLATE_FIELD = re.compile(r'\{\{\s*data\.(\w+)\s*\}\}')
+
+
+class FrameFormatter:
+    """
+    Renders frames with the analyzer's result_types templates, the same text Logic 2 shows.
+    """
+
+    def __init__(self, result_types=None):
+        self.result_types = result_types or AlphaLinerSerialAnalyzer.result_types
+        self._compiled = {}
+
+    def _compile(self, frame_type):
+        template = self.result_types.get(frame_type, {}).get('format', frame_type)
+        parts = _TEMPLATE_FIELD.split(template)
+        # Even indices are literal text, odd indices are data keys
+        self._compiled[frame_type] = parts
+        return parts
+
+    def __call__(self, frame):
+        parts = self._compiled.get(frame.type) or self._compile(frame.type)
+        data = frame.data or {}
+        out = []
+        for i, part in enumerate(parts):
+            if i & 1:
+                out.append(str(data.get(part, '')))
+            else:
+                out.append(part)
+        return ''.join(out)
@@ -0,0 +1,155 @@
+# Multi-core decoding of large captures
+# The capture is cut into chunks at STX characters and the chunks are decoded in a process pool
+# with the regular AlphaLinerSerialAnalyzer. The framer state is fully reset by every STX, so a
+# chunk starting at an STX decodes exactly like the same bytes inside a sequential run and no
+# overlap between chunks is needed: a telegram still open at the end of a chunk would have been
+# abandoned by that very STX in the sequential run as well. Results are merged back in capture order.
+
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import offline
+from HighLevelAnalyzer import STX
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # bytes per job
+
+
+def _decode_chunk(job):
+    """
+    Worker: decodes one chunk.
+
+    Args:
+        job: (settings, chunk) where chunk is ('bin', path, offset, length)
+             or ('events', data, start_times, end_times)
+
+    Returns:
+        list: compact TelegramRecords of the chunk in order (cheaper to pickle and to keep queued)
+    """
+    settings, chunk = job
+    analyzer = offline.create_analyzer(**settings)
+
+    if chunk[0] == 'bin':
+        _, path, offset, length = chunk
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        char_time = offline.CHAR_TIME
+        events = ((i * char_time, i * char_time + char_time, byte) for i, byte in enumerate(data, offset))
+    else:
+        _, data, start_times, end_times = chunk
+        events = zip(start_times, end_times, data)
+
+    return list(offline.decode_frames(analyzer, offline.iter_input_frames(events), compact=True, flush=False))
+
+
+def iter_binary_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits a raw byte log at STX characters without reading it completely.
+
+    Yields:
+        tuple: ('bin', path, offset, length)
+    """
+    size = os.path.getsize(path)
+    offset = 0
+    with open(path, 'rb') as f:
+        while offset < size:
+            cut = offset + chunk_size
+            while cut < size:
+                f.seek(cut)
+                block = f.read(4096)
+                position = block.find(STX)
+                if position >= 0:
+                    cut += position
+                    break
+                cut += len(block)
+            cut = min(cut, size)
+            yield 'bin', path, offset, cut - offset
+            offset = cut
+
+
+def iter_event_chunks(byte_events, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits (start, end, byte) events at STX characters into compact chunks.
+
+    Yields:
+        tuple: ('events', bytes, start times, end times)
+    """
+    data = bytearray()
+    starts = array('d')
+    ends = array('d')
+    for start, end, byte in byte_events:
+        if byte == STX and len(data) >= chunk_size:
+            yield 'events', bytes(data), starts, ends
+            data = bytearray()
+            starts = array('d')
+            ends = array('d')
+        data.append(byte)
+        starts.append(start)
+        ends.append(end)
+    if data:
+        yield 'events', bytes(data), starts, ends
+
+
+def decode_parallel(path, fmt=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, stats=None, **analyzer_settings):
+    """
+    Decodes a capture on several cores.
+
+    Args:
+        path: capture file
+        fmt: input format (see offline.READERS), default by extension
+        workers: number of processes (default: CPU count)
+        chunk_size: approximate bytes per job
+        stats: optional dict, 'bytes' is updated with the number of bytes dispatched
+        **analyzer_settings: passed to offline.create_analyzer
+
+    Yields:
+        TelegramRecord: decoded frames, identical to a sequential run
+    """
+    fmt = fmt or offline.guess_format(path)
+    workers = workers or os.cpu_count() or 1
+    if fmt == 'bin':
+        chunks = iter_binary_chunks(path, chunk_size)
+    else:
+        chunks = iter_event_chunks(offline.READERS[fmt](path), chunk_size)
+
+    # Double detector statistics run over the whole capture: workers emit every test and the
+    # summary is applied here, in capture order
+    parent = offline.create_analyzer(**analyzer_settings)
+    if parent.classifier is not None:
+        raise ValueError("the Auto direction classifies telegrams in sequence, it cannot be split into chunks")
+    detector = parent.detector
+    worker_settings = dict(analyzer_settings, detector_frames='Every Test') if detector is not None else analyzer_settings
+
+    # Keep a bounded number of jobs in flight so memory stays constant
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            if stats is not None:
+                stats['bytes'] = stats.get('bytes', 0) + (chunk[3] if chunk[0] == 'bin' else len(chunk[1]))
+            pending.append(executor.submit(_decode_chunk, (worker_settings, chunk)))
+            if len(pending) >= workers * 2:
+                yield from _summarize(pending.popleft().result(), detector)
+        while pending:
+            yield from _summarize(pending.popleft().result(), detector)
+
+    if detector is not None:
+        yield from map(offline.compact_frame, detector.flush())
+
+
+def _summarize(records, detector):
+    """
+    Applies the double detector summary of the parent to worker results, which contain every test.
+    """
+    if detector is None:
+        yield from records
+        return
+    for record in records:
+        if record.type == 'DOUBLE_DETECTOR_TEST':
+            record = detector.add(record)
+            if record is None:
+                continue
+            record = offline.compact_frame(record)
+        yield record
@@ -0,0 +1,113 @@
+# Stand-in for saleae.analyzers
+# Lets HighLevelAnalyzer.py be imported and run outside of Logic 2 (offline tools, batch jobs).
+# Only the small subset of the API used by this extension is provided.
+
+import sys
+import types
+
+
+class AnalyzerFrame:
+    """
+    Plain replacement for saleae.analyzers.AnalyzerFrame.
+
+    Times are float seconds instead of GraphTime objects.
+    """
+
+    __slots__ = ('type', 'start_time', 'end_time', 'data')
+
+    def __init__(self, type, start_time, end_time, data=None):
+        self.type = type
+        self.start_time = start_time
+        self.end_time = end_time
+        self.data = data
+
+    def __repr__(self):
+        return f"AnalyzerFrame({self.type!r}, {self.start_time!r}, {self.end_time!r}, {self.data!r})"
+
+
+class HighLevelAnalyzer:
+    result_types = {}
+
+
+class StringSetting:
+    def __init__(self, label=None, **kwargs):
+        self.label = label
+
+
+class NumberSetting:
+    def __init__(self, label=None, min_value=None, max_value=None, **kwargs):
+        self.label = label
+        self.min_value = min_value
+        self.max_value = max_value
+
+
+class ChoicesSetting:
+    def __init__(self, choices, label=None, **kwargs):
+        self.label = label
+        self.choices = tuple(choices)
+
+
+SETTING_TYPES = ('StringSetting', 'NumberSetting', 'ChoicesSetting')
+
+
+def _setting_default(setting):
+    # Works for the stand-in settings as well as the real saleae ones
+    choices = getattr(setting, 'choices', None)
+    if choices:
+        return tuple(choices)[0]
+    if type(setting).__name__ == 'NumberSetting':
+        min_value = getattr(setting, 'min_value', None)
+        return min_value if min_value is not None else 0
+    return ''
+
+
+def install():
+    """
+    Registers this module as saleae.analyzers unless the real package is importable.
+
+    Returns:
+        module: the saleae.analyzers module that HighLevelAnalyzer.py will import
+    """
+    try:
+        import saleae.analyzers
+        return saleae.analyzers
+    except ImportError:
+        pass
+
+    analyzers = types.ModuleType('saleae.analyzers')
+    for name in ('AnalyzerFrame', 'HighLevelAnalyzer', 'StringSetting', 'NumberSetting', 'ChoicesSetting'):
+        setattr(analyzers, name, globals()[name])
+
+    package = types.ModuleType('saleae')
+    package.__path__ = []
+    package.analyzers = analyzers
+    sys.modules['saleae'] = package
+    sys.modules['saleae.analyzers'] = analyzers
+    return analyzers
+
+
+def create_analyzer(cls, **settings):
+    """
+    Instantiates a HighLevelAnalyzer the way Logic 2 does: settings are assigned
+    on the instance before __init__ runs.
+
+    Args:
+        cls: HighLevelAnalyzer subclass
+        **settings: setting values keyed by attribute name; missing ones use the setting default
+
+    Returns:
+        the initialised analyzer instance
+    """
+    analyzer = cls.__new__(cls)
+    for name in dir(cls):
+        setting = getattr(cls, name)
+        if type(setting).__name__ in SETTING_TYPES:
+            value = settings.pop(name, _setting_default(setting))
+            choices = tuple(getattr(setting, 'choices', None) or ())
+            if choices and value not in choices:
+                raise ValueError(f"Invalid value {value!r} for setting '{name}', expected one of {choices}")
+            setattr(analyzer, name, value)
+    if settings:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(settings))}")
+    analyzer.__init__()
+    return analyzer
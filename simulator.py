@@ -0,0 +1,320 @@
+# Traffic simulator and capture replayer
+# Plays the PC or the AlphaLiner side of the link over a pty (or a serial device): sends synthetic
+# telegrams built with encoder.py, waits for the ACK/NAK of the peer (retransmitting after a NAK or
+# a timeout) and answers the peer's telegrams with ACK or NAK. The replay mode writes a recorded
+# capture with its original inter-byte timing, optionally accelerated, and reports how far the
+# writes fell behind schedule.
+#
+#   python simulator.py alphaliner --telegrams 10000 --rate 400     # prints the pty to connect to
+#   python simulator.py controller --device /dev/pts/5              # the other side of that pty
+#   python simulator.py replay capture.csv --speed 10
+
+import argparse
+import os
+import random
+import select
+import sys
+import time
+
+import bench
+import encoder
+import live
+import offline
+from HighLevelAnalyzer import (
+    ACK, NAK, CONTROLLER, ALPHALINER, TELEGRAM_TABLES, FRAME_PENDING, FRAME_OK, TelegramFramer,
+)
+
+
+ACK_TIMEOUT = 0.2   # seconds to wait for ACK/NAK before retransmitting
+RETRIES = 3         # retransmissions per telegram before giving up
+READ_SIZE = 4096
+
+
+def open_pty():
+    """
+    Opens a pty pair with the slave side in raw 19200 8O1 mode (no echo, no newline translation).
+
+    Returns:
+        tuple: (master fd, slave fd, slave path)
+    """
+    master, slave = os.openpty()
+    live.configure_serial(slave)
+    return master, slave, os.ttyname(slave)
+
+
+class LinkPeer:
+    """
+    One side of the link: sends telegrams with ACK/NAK handling and acknowledges the other side.
+    """
+
+    def __init__(self, fd, direction, ack_timeout=ACK_TIMEOUT, retries=RETRIES):
+        self.fd = fd
+        self.direction = direction
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        peer = ALPHALINER if direction == CONTROLLER else CONTROLLER
+        self.framer = TelegramFramer({method: entry[0] for method, entry in TELEGRAM_TABLES[peer].items()})
+
+        self.sent = 0
+        self.acked = 0
+        self.naked = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.received = 0
+        self.received_bad = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+
+    def _process(self, data):
+        """
+        Frames the peer's bytes and answers its telegrams.
+
+        Returns:
+            int: the last ACK/NAK character seen in data, None if there was none
+        """
+        answer = None
+        for byte in data:
+            if byte == ACK or byte == NAK:
+                answer = byte
+                continue
+            result = self.framer.feed(byte, 0.0)
+            if result == FRAME_PENDING:
+                continue
+            if result == FRAME_OK:
+                self.received += 1
+                os.write(self.fd, bytes((ACK,)))
+            else:
+                self.received_bad += 1
+                os.write(self.fd, bytes((NAK,)))
+        return answer
+
+
+    def poll(self, timeout):
+        """
+        Reads and processes the peer's bytes for up to timeout seconds, returning early on ACK/NAK.
+
+        Returns:
+            int: ACK, NAK or None on timeout
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return None
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except OSError:  # EIO: nobody has the other side open
+                time.sleep(min(remaining, 0.01))
+                continue
+            answer = self._process(data)
+            if answer is not None:
+                return answer
+
+
+    def send(self, telegram):
+        """
+        Sends a telegram and retransmits it after NAK or timeout.
+
+        Returns:
+            bool: True once the telegram was acknowledged
+        """
+        for _ in range(1 + self.retries):
+            sent_at = time.perf_counter()
+            os.write(self.fd, telegram)
+            self.sent += 1
+            answer = self.poll(self.ack_timeout)
+            if answer == ACK:
+                latency = time.perf_counter() - sent_at
+                self.acked += 1
+                self.latency_sum += latency
+                self.latency_max = max(self.latency_max, latency)
+                return True
+            if answer == NAK:
+                self.naked += 1
+            else:
+                self.timeouts += 1
+        self.failed += 1
+        return False
+
+
+    def summary(self):
+        return {
+            'sent': self.sent,
+            'acked': self.acked,
+            'naked': self.naked,
+            'timeouts': self.timeouts,
+            'failed': self.failed,
+            'received': self.received,
+            'received_bad': self.received_bad,
+            'ack_latency_avg_ms': 1000.0 * self.latency_sum / self.acked if self.acked else None,
+            'ack_latency_max_ms': 1000.0 * self.latency_max,
+        }
+
+
+def simulate(fd, direction, telegrams=1000, rate=100.0, seed=1, corrupt_rate=0.0, linger=0.0, **peer_settings):
+    """
+    Plays one side of the link with synthetic traffic (see bench.iter_traffic).
+
+    Args:
+        fd: open pty master or serial device
+        direction: CONTROLLER or ALPHALINER, the side to play
+        telegrams: number of telegrams to deliver
+        rate: telegrams per second (0 = as fast as the peer acknowledges)
+        seed: random seed of the traffic
+        corrupt_rate: share of first transmissions sent with a damaged BCC (the peer should NAK them)
+        linger: keep answering the peer for this many seconds after the last telegram
+        **peer_settings: ack_timeout, retries
+
+    Returns:
+        dict: LinkPeer summary plus elapsed seconds
+    """
+    rng = random.Random(seed)
+    traffic = bench.iter_traffic(direction, rng)
+    peer = LinkPeer(fd, direction, **peer_settings)
+    started = time.perf_counter()
+    seq = 0
+
+    for index in range(telegrams):
+        if rate:
+            # Keep answering the peer while waiting for the next send slot
+            due = started + index / rate
+            while time.perf_counter() < due:
+                peer.poll(due - time.perf_counter())
+
+        method, data = next(traffic)
+        telegram = encoder.build_telegram(seq, method, data)
+        if rng.random() < corrupt_rate:
+            os.write(fd, encoder.damage_bcc(telegram))
+            peer.sent += 1
+            if peer.poll(peer.ack_timeout) == NAK:
+                peer.naked += 1
+        peer.send(telegram)
+        seq = (seq + 1) & 0x7F
+
+    finished = time.perf_counter()
+    while time.perf_counter() < finished + linger:
+        peer.poll(finished + linger - time.perf_counter())
+
+    summary = peer.summary()
+    summary['elapsed_s'] = time.perf_counter() - started
+    return summary
+
+
+def replay(fd, byte_events, speed=1.0):
+    """
+    Writes a recorded capture with its original inter-byte timing.
+
+    Bytes that are due are written together; answers of the peer are read and discarded so they
+    never block it.
+
+    Args:
+        fd: open pty master or serial device
+        byte_events: (start, end, byte) tuples, e.g. from offline.READERS
+        speed: time acceleration factor (10 = ten times faster than recorded)
+
+    Returns:
+        dict: bytes written, elapsed and recorded seconds, maximum and average lag behind schedule
+    """
+    started = time.perf_counter()
+    first = None
+    pending = bytearray()
+    written = 0
+    lag_max = 0.0
+    lag_sum = 0.0
+    writes = 0
+    recorded = 0.0
+
+    def write():
+        nonlocal written, lag_max, lag_sum, writes
+        os.write(fd, pending)
+        lag = time.perf_counter() - started - pending_due
+        lag_max = max(lag_max, lag)
+        lag_sum += max(lag, 0.0)
+        writes += 1
+        written += len(pending)
+        pending.clear()
+
+    pending_due = 0.0
+    for start, _, byte in byte_events:
+        if first is None:
+            first = start
+        recorded = float(start - first)
+        due = recorded / speed
+        wait = due - (time.perf_counter() - started)
+        if wait > 0:
+            if pending:
+                write()
+            readable, _, _ = select.select([fd], [], [], wait)
+            if readable:
+                try:
+                    os.read(fd, READ_SIZE)
+                except OSError:
+                    pass
+            remaining = due - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+        if not pending:
+            pending_due = due
+        pending.append(byte)
+        if len(pending) >= READ_SIZE:  # behind schedule: keep writing in bounded blocks
+            write()
+    if pending:
+        write()
+
+    return {
+        'bytes': written,
+        'recorded_s': recorded,
+        'elapsed_s': time.perf_counter() - started,
+        'lag_max_ms': lag_max * 1000.0,
+        'lag_avg_ms': lag_sum * 1000.0 / writes if writes else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AlphaLiner link simulator and capture replayer')
+    parser.add_argument('mode', choices=('controller', 'alphaliner', 'replay'),
+                        help='side of the link to play, or replay a capture')
+    parser.add_argument('input', nargs='?', help='capture to replay')
+    parser.add_argument('-f', '--format', choices=sorted(offline.READERS), help='input format (default: by extension and content)')
+    parser.add_argument('--device', help='serial device or pty to use instead of a new pty')
+    parser.add_argument('--delay', type=float, default=1.0, help='seconds to wait before sending (time to connect)')
+    parser.add_argument('--telegrams', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=100.0, help='telegrams per second, 0 = as fast as possible')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--corrupt-rate', type=float, default=0.0)
+    parser.add_argument('--ack-timeout', type=float, default=ACK_TIMEOUT)
+    parser.add_argument('--linger', type=float, default=0.0,
+                        help='keep acknowledging the peer for this many seconds after the last telegram')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay acceleration factor')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'replay' and not args.input:
+        parser.error('replay needs an input capture')
+
+    if args.device:
+        fd = live.open_serial(args.device)
+        os.set_blocking(fd, True)
+    else:
+        fd, slave, path = open_pty()
+        print(f"pty: {path}", file=sys.stderr, flush=True)
+    time.sleep(args.delay)
+
+    if args.mode == 'replay':
+        reader = offline.READERS[args.format or offline.guess_format(args.input)]
+        summary = replay(fd, reader(args.input), args.speed)
+    else:
+        direction = CONTROLLER if args.mode == 'controller' else ALPHALINER
+        summary = simulate(fd, direction, args.telegrams, args.rate, args.seed, args.corrupt_rate, args.linger,
+                           ack_timeout=args.ack_timeout)
+
+    for key, value in summary.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Test helpers
+# The modules live at the repository root (next to HighLevelAnalyzer.py, as Logic 2 expects them).
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import offline  # noqa: E402
+
+
+CHAR_TIME = offline.CHAR_TIME
+
+
+def byte_events(data, start=0.0):
+    """
+    Returns:
+        list: (start, end, byte) per byte, back to back at the line speed
+    """
+    return [(start + index * CHAR_TIME, start + (index + 1) * CHAR_TIME, byte) for index, byte in enumerate(data)]
+
+
+def decode(data, direction='alphaliner', **settings):
+    """
+    Returns:
+        list: frames of the sequential decode of raw line bytes
+    """
+    analyzer = offline.create_analyzer(direction, **settings)
+    return list(offline.decode_frames(analyzer, offline.iter_input_frames(byte_events(data))))
+
+
+class GraphTimeDelta(float):
+    """
+    Stand-in for Logic 2's GraphTimeDelta: a difference of times, converts to seconds.
+    """
+
+
+class GraphTime:
+    """
+    Stand-in for Logic 2's GraphTime: absolute times only subtract, float(time) is not defined.
+    """
+
+    def __init__(self, seconds):
+        self._seconds = seconds
+
+    def __sub__(self, other):
+        return GraphTimeDelta(self._seconds - other._seconds)
+
+    def __repr__(self):
+        return f"GraphTime({self._seconds!r})"
+
+
+def graph_time_events(data, start=0.0):
+    """
+    Returns:
+        list: byte_events with GraphTime start and end times
+    """
+    return [(GraphTime(begin), GraphTime(end), byte) for begin, end, byte in byte_events(data, start)]
+
+
+@pytest.fixture
+def write_capture(tmp_path):
+    """
+    Writes raw line bytes to a .bin capture and returns its path.
+    """
+    def write(data, name='capture.bin'):
+        path = tmp_path / name
+        path.write_bytes(bytes(data))
+        return str(path)
+    return write
@@ -0,0 +1,25 @@
+from collections import Counter
+
+from conftest import decode
+
+import bench
+import encoder
+from HighLevelAnalyzer import ALPHALINER, CONTROLLER
+
+
+def test_corpus_covers_bad_bcc_and_bad_etx():
+    for direction in (CONTROLLER, ALPHALINER):
+        data, telegrams = bench.generate_corpus(direction, telegrams=5000, seed=1, corrupt_rate=0.05)
+        frames = decode(data, direction, link_stats='Yes')
+        errors = Counter(frame.data['info'].split(':')[0] for frame in frames if frame.type == 'UNKNOWN')
+        assert set(errors) == {'BCC mismatch', 'Invalid ETX'}
+        naks = sum(1 for frame in frames if frame.type == 'NAK')
+        assert sum(errors.values()) == naks
+        assert sum(1 for frame in frames if frame.type == 'LINK_EVENT') == naks
+
+
+def test_damage_etx_is_reported_as_invalid_etx():
+    telegram = encoder.encode_telegram(ALPHALINER, 'STATUS_MSG', 3, encoder.status_data())
+    frames = decode(bytes(encoder.damage_etx(telegram)) + telegram)
+    assert [frame.type for frame in frames] == ['UNKNOWN', 'STATUS_MSG']
+    assert frames[0].data['info'].startswith('Invalid ETX')
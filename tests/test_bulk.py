@@ -0,0 +1,47 @@
+import pytest
+
+import bench
+import encoder
+import offline
+from HighLevelAnalyzer import ACK, ALPHALINER, CONTROLLER, NAK
+
+np = pytest.importorskip('numpy')
+
+import bulk  # noqa: E402
+
+
+def bulk_decode(path, direction, **settings):
+    analyzer = offline.create_analyzer(direction, **settings)
+    return bulk.decode_bulk(analyzer, *bulk.load_capture(path))
+
+
+def as_tuples(frames):
+    return [(frame.type, frame.start_time, frame.end_time, frame.data) for frame in frames]
+
+
+@pytest.mark.parametrize('direction', [CONTROLLER, ALPHALINER])
+def test_bulk_equals_sequential(write_capture, direction):
+    data, _ = bench.generate_corpus(direction, telegrams=3000, seed=3, corrupt_rate=0.05)
+    path = write_capture(data)
+    expected = list(offline.decode_file(path, direction=direction))
+    assert as_tuples(bulk_decode(path, direction)) == as_tuples(expected)
+
+
+def test_bulk_equals_sequential_with_settings(write_capture):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=2000, seed=5, corrupt_rate=0.05)
+    path = write_capture(data)
+    settings = {'show_ack': False, 'method_filter': 'COPY_FAILED, ERROR_MSG'}
+    expected = list(offline.decode_file(path, direction=ALPHALINER, **settings))
+    assert as_tuples(bulk_decode(path, ALPHALINER, **settings)) == as_tuples(expected)
+
+
+def test_bulk_bcc_equal_to_etx(write_capture):
+    # C1 = method ^ 0x02 with all-zero data: BCC 0x02 + 1 = ETX (see test_framer)
+    telegrams = [encoder.build_telegram(1 ^ 0x02, 1, [0, 0]), bytes((ACK,)),
+                 encoder.build_telegram(5 ^ 0x02, 5, [0] * 10), bytes((NAK,)),
+                 encoder.build_telegram(4, 4, [0x40, 1, 0, 1, 0, 0, 0, 0, 1])]
+    data = b''.join(telegrams)
+    path = write_capture(data)
+    expected = list(offline.decode_file(path, direction=ALPHALINER))
+    assert [frame.type for frame in expected] == ['STATUS_MSG', 'ACK', 'COPY_FAILED', 'NAK', 'COPY_COMPLETE']
+    assert as_tuples(bulk_decode(path, ALPHALINER)) == as_tuples(expected)
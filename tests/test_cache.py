@@ -0,0 +1,20 @@
+import os
+import shutil
+
+import pytest
+
+import cache
+import HighLevelAnalyzer
+
+
+@pytest.mark.parametrize('name', cache.DECODER_SOURCES)
+def test_decoder_version_follows_every_decoder_source(tmp_path, monkeypatch, name):
+    source_dir = os.path.dirname(os.path.abspath(HighLevelAnalyzer.__file__))
+    for source in cache.DECODER_SOURCES:
+        shutil.copy(os.path.join(source_dir, source), tmp_path / source)
+    monkeypatch.setattr(HighLevelAnalyzer, '__file__', str(tmp_path / 'HighLevelAnalyzer.py'))
+    before = cache.decoder_version()
+
+    with open(tmp_path / name, 'a') as f:
+        f.write('\n# changed\n')
+    assert cache.decoder_version() != before
@@ -0,0 +1,102 @@
+import pytest
+
+from conftest import decode
+
+import bench
+from HighLevelAnalyzer import ALPHALINER
+
+np = pytest.importorskip('numpy')
+
+import copy_index  # noqa: E402
+
+
+def indexed_frames(seed=19):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=3000, seed=seed, corrupt_rate=0.02)
+    return [frame for frame in decode(data) if frame.type in copy_index.KINDS]
+
+
+def gripper_of(frame):
+    if frame.type == 'COPY_COMPLETE':
+        return frame.data['gripper']
+    return frame.data['location'] if frame.data['location_kind'] == 'Gripper' else -1
+
+
+def scan(frames, copy_id=None, gripper=None, kind=None, start=None, end=None):
+    """
+    Returns:
+        list: row numbers of the frames matching the conditions, by a plain scan
+    """
+    return [row for row, frame in enumerate(frames)
+            if (copy_id is None or frame.data['copy_id'] == copy_id)
+            and (gripper is None or gripper_of(frame) == gripper)
+            and (kind is None or copy_index.KINDS[frame.type] == kind)
+            and (start is None or frame.start_time >= start)
+            and (end is None or frame.start_time <= end)]
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return indexed_frames()
+
+
+@pytest.fixture(scope='module')
+def index(frames):
+    return copy_index.CopyIndexBuilder().add_frames(frames).build()
+
+
+def test_index_has_a_row_per_copy_frame(frames, index):
+    assert len(index) == len(frames)
+    assert {kind: int((index['kind'] == kind).sum()) for kind in copy_index.KINDS.values()} == \
+        {kind: len(scan(frames, kind=kind)) for kind in copy_index.KINDS.values()}
+
+
+def test_copy_id_and_gripper_lookups_match_a_scan(frames, index):
+    copy_ids = sorted({frame.data['copy_id'] for frame in frames})
+    # Smallest, largest, some in between and values missing from the index (below, between, above)
+    probes = copy_ids[:3] + copy_ids[-3:] + copy_ids[::97] + [copy_ids[0] - 1, copy_ids[-1] + 1]
+    probes += [value for value in range(copy_ids[0], copy_ids[-1]) if value not in copy_ids][:3]
+    for copy_id in probes:
+        assert index.query(copy_id=copy_id).tolist() == scan(frames, copy_id=copy_id), copy_id
+
+    grippers = sorted({gripper_of(frame) for frame in frames})
+    for gripper in grippers[:3] + grippers[-3:] + [grippers[-1] + 1]:
+        assert index.query(gripper=gripper).tolist() == scan(frames, gripper=gripper), gripper
+        assert index.query(gripper=gripper, kind=copy_index.KIND_COMPLETE).tolist() == \
+            scan(frames, gripper=gripper, kind=copy_index.KIND_COMPLETE)
+
+
+def test_time_ranges_match_a_scan(frames, index):
+    times = [frame.start_time for frame in frames]
+    ranges = [
+        (times[10], times[20]),                # bounds on rows: both included
+        (times[10] + 1e-9, times[20] - 1e-9),  # bounds between rows
+        (None, times[5]), (times[-5], None), (None, None),
+        (times[-1] + 1.0, None),               # after the capture
+        (times[30] + 1e-9, times[31] - 1e-9),  # empty range between two rows
+        (times[40], times[40]),
+    ]
+    for start, end in ranges:
+        assert index.query(start=start, end=end).tolist() == scan(frames, start=start, end=end), (start, end)
+    copy_id = frames[100].data['copy_id']
+    assert index.query(copy_id=copy_id, start=times[50], end=times[-50]).tolist() == \
+        scan(frames, copy_id=copy_id, start=times[50], end=times[-50])
+
+
+def test_save_load_round_trip(tmp_path, frames):
+    origin = 1_700_000_000.0
+    index = copy_index.CopyIndexBuilder().add_frames(frames).build(origin)
+    path = tmp_path / 'copies.npz'
+    index.save(path)
+    loaded = copy_index.CopyIndex.load(path)
+
+    assert loaded.origin == origin and len(loaded) == len(index)
+    for name in copy_index.COLUMNS:
+        assert loaded[name].dtype == index[name].dtype
+        assert loaded[name].tolist() == index[name].tolist()
+    # Queries and records use the origin as the time base
+    start, end = origin + frames[10].start_time, origin + frames[60].start_time
+    assert loaded.query(start=start, end=end).tolist() == scan(frames, start=frames[10].start_time,
+                                                                end=frames[60].start_time)
+    record = next(loaded.rows([10]))
+    assert record['time'] == origin + frames[10].start_time
+    assert record['copy_id'] == frames[10].data['copy_id']
@@ -0,0 +1,49 @@
+from conftest import byte_events, graph_time_events
+
+import encoder
+import offline
+from HighLevelAnalyzer import ACK, ALPHALINER, DETECTOR_SUMMARY_PERIOD
+
+
+def detector_tests(count, rare_every):
+    out = bytearray()
+    for index in range(count):
+        feeder = 5 if index % rare_every == 0 else 1
+        data = encoder.double_detector_test_data(feeder, 800 + index % 7, 800)
+        out += encoder.encode_telegram(ALPHALINER, 'DOUBLE_DETECTOR_TEST', index & 0x7F, data)
+        out.append(ACK)
+    return bytes(out)
+
+
+def test_summary_frames_are_in_time_order_and_cover_rare_feeders():
+    data = detector_tests(3000, rare_every=50)
+    analyzer = offline.create_analyzer(ALPHALINER)
+    frames = list(offline.decode_frames(analyzer, offline.iter_input_frames(byte_events(data)), flush=False))
+
+    starts = [frame.start_time for frame in frames]
+    assert starts == sorted(starts)
+
+    stats = [frame for frame in frames if frame.type == 'DETECTOR_STATS']
+    rare = [frame for frame in stats if frame.data['feeder'] == 5]
+    # 60 tests of feeder 5, fewer than the interval: reported by time while the tests go on
+    assert rare and rare[0].data['window_s'] <= DETECTOR_SUMMARY_PERIOD
+    assert rare[0].start_time >= DETECTOR_SUMMARY_PERIOD
+    # Every frame spans the test telegram that emitted it
+    assert all(frame.end_time - frame.start_time < 0.01 for frame in stats)
+
+    # flush (offline only) reports the tests after the last frame of each feeder
+    final = {frame.data['feeder']: frame.data['tests'] for frame in stats + analyzer.flush()}
+    assert final == {1: 2940, 5: 60}
+
+
+def test_summary_with_logic2_times():
+    # Logic 2 hands GraphTime objects that only convert to seconds as differences
+    data = detector_tests(3000, rare_every=50)
+    analyzer = offline.create_analyzer(ALPHALINER)
+    frames = list(offline.decode_frames(analyzer, offline.iter_input_frames(graph_time_events(data)), flush=False))
+    reference = offline.create_analyzer(ALPHALINER)
+    expected = list(offline.decode_frames(reference, offline.iter_input_frames(byte_events(data)), flush=False))
+
+    assert [frame.type for frame in frames] == [frame.type for frame in expected]
+    assert [frame.data for frame in frames] == [frame.data for frame in expected]
+    assert any(frame.type == 'DETECTOR_STATS' for frame in frames)
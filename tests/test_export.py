@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+
+import export
+from saleae.analyzers import AnalyzerFrame
+
+
+def frames(count, fail_at=None):
+    for index in range(count):
+        if index == fail_at:
+            raise RuntimeError('capture ended unexpectedly')
+        yield AnalyzerFrame('COPY_COMPLETE', index * 0.01, index * 0.01 + 0.008, {'copy_id': index, 'seq': index & 0x7F})
+
+
+def index_names(path):
+    with sqlite3.connect(path) as connection:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_failed_load_keeps_the_indexes(tmp_path):
+    path = str(tmp_path / 'decoded.db')
+    assert export.export_sqlite(frames(100), path) == 100
+    assert index_names(path) == set(export.INDEXES)
+
+    with pytest.raises(RuntimeError):
+        export.export_sqlite(frames(5000, fail_at=2500), path, batch_size=100, transaction_rows=1000)
+    assert index_names(path) == set(export.INDEXES)
+    with sqlite3.connect(path) as connection:
+        # committed transactions stay, the rows of the failed one are rolled back
+        assert connection.execute("SELECT COUNT(*) FROM telegrams").fetchone()[0] == 100 + 2000
@@ -0,0 +1,77 @@
+import json
+import os
+
+import bench
+import cli
+import fleet
+from HighLevelAnalyzer import ALPHALINER
+
+
+def write_corpus(path, seed=1):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=500, seed=seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_broken_capture_is_reported_and_batch_continues(tmp_path):
+    captures = tmp_path / 'captures'
+    write_corpus(str(captures / 'good.bin'))
+    # Async Serial export with a truncated row
+    (captures / 'bad.csv').write_text('name,type,start_time,duration,data\nAsync Serial,data,0.1\n')
+    output = tmp_path / 'out'
+
+    report = fleet.run_fleet(fleet.find_captures([str(captures)]), str(output), defaults={'direction': ALPHALINER},
+                             workers=2)
+
+    entries = {os.path.basename(entry['file']): entry for entry in report['files']}
+    assert entries['bad.csv']['error'].startswith('IndexError')
+    assert 'error' not in entries['good.bin'] and entries['good.bin']['frames'] > 0
+    assert report['fleet']['failed_files'] == 1
+    assert not os.path.exists(entries['bad.csv']['output'])
+    with open(output / fleet.REPORT_NAME) as f:
+        assert len(json.load(f)['files']) == 2
+
+
+def test_captures_with_the_same_name_get_their_own_output(tmp_path):
+    captures = tmp_path / 'captures'
+    write_corpus(str(captures / 'a' / 'cap.bin'), seed=1)
+    write_corpus(str(captures / 'b' / 'cap.bin'), seed=2)
+    write_corpus(str(captures / 'b' / 'cap.hex'), seed=3)  # raw bytes, the format is set below
+    config = {'machines': {'AL01': {'files': '*'}}}
+    output = tmp_path / 'out'
+
+    report = fleet.run_fleet(fleet.find_captures([str(captures)]), str(output), config,
+                             defaults={'direction': ALPHALINER, 'format': 'bin'}, workers=3)
+
+    outputs = sorted(os.path.relpath(entry['output'], output) for entry in report['files'])
+    assert outputs == [os.path.join('AL01', 'a', 'cap.bin.txt'), os.path.join('AL01', 'b', 'cap.bin.txt'),
+                       os.path.join('AL01', 'b', 'cap.hex.txt')]
+    for entry in report['files']:
+        with open(entry['output']) as f:
+            assert sum(1 for _ in f) == entry['frames']
+
+
+def test_output_matches_decode_and_link_stats_follow_the_config(tmp_path):
+    captures = tmp_path / 'captures'
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=500, seed=4, corrupt_rate=0.05)
+    for name in ('AL01', 'AL02'):
+        (captures / name).mkdir(parents=True)
+        (captures / name / 'cap.bin').write_bytes(data)
+    config = {'machines': {'AL01': {'files': '*/AL01/*'}, 'AL02': {'files': '*/AL02/*', 'link_stats': True}}}
+    output = tmp_path / 'out'
+
+    report = fleet.run_fleet(fleet.find_captures([str(captures)]), str(output), config,
+                             defaults={'direction': ALPHALINER}, workers=2)
+
+    entries = {entry['machine']: entry for entry in report['files']}
+    assert 'naks' not in entries['AL01'] and 'naks' not in report['machines']['AL01']
+    assert entries['AL02']['naks'] > 0 and entries['AL02']['retransmissions'] > 0
+
+    # Link statistics add LINK_EVENT frames to the output
+    assert entries['AL02']['frames'] > entries['AL01']['frames']
+    for name, options in (('AL01', []), ('AL02', ['--link-stats'])):
+        expected = tmp_path / f'{name}.txt'
+        cli.main(['decode', str(captures / name / 'cap.bin'), '-d', ALPHALINER, '-q', '-o', str(expected)] + options)
+        with open(entries[name]['output']) as f, open(expected) as g:
+            assert f.read() == g.read(), name
@@ -0,0 +1,78 @@
+import pytest
+
+from conftest import decode
+
+import encoder
+from HighLevelAnalyzer import (
+    ALPHALINER, CONTROLLER, ETX, FRAME_BAD_BCC, FRAME_BAD_LENGTH, FRAME_OK, FRAME_PENDING, TELEGRAM_TABLES,
+    TelegramFramer,
+)
+
+
+def feed_all(framer, data):
+    return [framer.feed(byte, index) for index, byte in enumerate(data)]
+
+
+# BCC 0x02 is sent as 0x03 (reserved-value increment), the byte before the final ETX is then ETX as well
+BCC_ETX_STATUS = bytes.fromhex('02858186800303')
+
+
+@pytest.mark.parametrize('direction', [ALPHALINER, 'auto'])
+def test_bcc_equal_to_etx_decodes(direction):
+    frames = decode(BCC_ETX_STATUS, direction)
+    assert [frame.type for frame in frames] == ['STATUS_MSG']
+    assert frames[0].data['seq'] == 5
+    assert frames[0].data['mode'] == 'Automatic'
+
+
+def test_framer_takes_etx_before_expected_end_as_bcc():
+    lengths = {method: entry[0] for method, entry in TELEGRAM_TABLES[ALPHALINER].items()}
+    framer = TelegramFramer(lengths)
+    results = feed_all(framer, BCC_ETX_STATUS)
+    assert results == [FRAME_PENDING] * 6 + [FRAME_OK]
+    assert (framer.seq, framer.method, bytes(framer.data)) == (5, 1, bytes((0x86, 0x80)))
+
+
+def test_framer_bcc_etx_for_every_method():
+    # C1 = method ^ 0x02 with all-zero data makes the XOR 0x02, sent as BCC 0x03. Every character
+    # has its MSB set, so only telegrams with an even number of C1..Dn characters can have this BCC.
+    for direction in (CONTROLLER, ALPHALINER):
+        table = TELEGRAM_TABLES[direction]
+        framer = TelegramFramer({method: entry[0] for method, entry in table.items()})
+        for method, (length, _, _) in table.items():
+            if length % 2 == 0:
+                continue
+            telegram = encoder.build_telegram(method ^ 0x02, method, [0] * (length - 5))
+            assert telegram[-2:] == bytes((ETX, ETX))
+            assert feed_all(framer, telegram)[-1] == FRAME_OK, (direction, method)
+
+
+def test_framer_early_etx_is_bad_length():
+    lengths = {method: entry[0] for method, entry in TELEGRAM_TABLES[ALPHALINER].items()}
+    framer = TelegramFramer(lengths)
+    # COPY_COMPLETE (15 bytes) cut off after two data bytes
+    assert feed_all(framer, bytes.fromhex('0281848182c503'))[-1] == FRAME_BAD_LENGTH
+
+
+def test_framer_bcc_etx_mismatch_is_bad_bcc():
+    lengths = {method: entry[0] for method, entry in TELEGRAM_TABLES[ALPHALINER].items()}
+    framer = TelegramFramer(lengths)
+    # Same STATUS_MSG with other data: 0x03 in the BCC position no longer matches
+    assert feed_all(framer, bytes.fromhex('02858186810303'))[-1] == FRAME_BAD_BCC
+
+
+def test_framer_stx_abandons_unfinished_telegram():
+    lengths = {method: entry[0] for method, entry in TELEGRAM_TABLES[ALPHALINER].items()}
+    framer = TelegramFramer(lengths)
+    status = encoder.encode_telegram(ALPHALINER, 'STATUS_MSG', 7, encoder.status_data())
+    damaged = encoder.damage_bcc(status)
+
+    # Cut off telegram, then a complete one: counted as a resync, the second telegram survives
+    results = feed_all(framer, status[:4] + status)
+    assert results[-1] == FRAME_OK and FRAME_BAD_BCC not in results
+    assert framer.resyncs == 1
+
+    # A damaged telegram right before a valid one fails on its own, nothing is rescanned
+    results = feed_all(framer, damaged + status)
+    assert results.count(FRAME_BAD_BCC) == 1 and results[-1] == FRAME_OK
+    assert framer.resyncs == 1
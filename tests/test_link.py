@@ -0,0 +1,85 @@
+import pytest
+
+from conftest import byte_events, decode
+
+import encoder
+import offline
+from HighLevelAnalyzer import ACK, ALPHALINER, FRAME_ACK, FRAME_NAK, FRAME_OK, NAK, STX
+
+ACK_BYTE = bytes((ACK,))
+NAK_BYTE = bytes((NAK,))
+
+
+def status(seq):
+    return encoder.encode_telegram(ALPHALINER, 'STATUS_MSG', seq, encoder.status_data())
+
+
+def link_summary(data, framed=False):
+    analyzer = offline.create_analyzer(ALPHALINER, link_stats='Yes')
+    if framed:
+        stream = offline.frame_capture(offline.create_analyzer(ALPHALINER), byte_events(data))
+        stream = offline.FramedStream.from_bytes(stream.to_bytes())  # as stored in the cache
+        frames = list(offline.present_frames(analyzer, stream))
+    else:
+        frames = list(offline.decode_frames(analyzer, offline.iter_input_frames(byte_events(data))))
+    events = [frame.data['event'] for frame in frames if frame.type == 'LINK_EVENT']
+    return analyzer.link.summary(), events
+
+
+@pytest.mark.parametrize('framed', [False, True])
+def test_resend_after_naked_bad_bcc_is_retransmission(framed):
+    data = status(1) + ACK_BYTE + encoder.damage_bcc(status(2)) + NAK_BYTE + status(2) + ACK_BYTE + status(3) + ACK_BYTE
+    summary, events = link_summary(data, framed)
+    assert events == ['RETRANSMISSION after NAK']
+    assert summary['retransmissions'] == 1
+    assert summary['errors'] == 1 and summary['naks'] == 1
+    assert summary['unpaired_acks'] == 0
+    assert summary['seq_gaps'] == 0
+
+
+def test_resend_after_unanswered_error_is_retransmission():
+    data = status(1) + ACK_BYTE + encoder.damage_bcc(status(2)) + status(2) + ACK_BYTE
+    summary, events = link_summary(data)
+    assert events == ['RETRANSMISSION after TIMEOUT']
+    assert summary['retransmissions'] == 1 and summary['timeouts'] == 1
+
+
+@pytest.mark.parametrize('framed', [False, True])
+def test_nak_of_telegram_without_etx_is_paired(framed):
+    # ETX damaged into STX: the framer drops the telegram without an error, the NAK arrives
+    # inside the telegram the bogus STX started
+    damaged = status(2)[:-1] + bytes((STX,))
+    data = status(1) + ACK_BYTE + damaged + NAK_BYTE + status(2) + ACK_BYTE
+    summary, events = link_summary(data, framed)
+    assert [frame.type for frame in decode(data)] == ['STATUS_MSG', 'ACK', 'NAK', 'STATUS_MSG', 'ACK']
+    assert events == ['RETRANSMISSION after NAK']
+    assert summary['unpaired_acks'] == 0
+    assert summary['errors'] == 1 and summary['retransmissions'] == 1
+
+
+def test_framed_events_flag_interrupted_ack_nak():
+    damaged = status(2)[:-1] + bytes((STX,))
+    data = status(1) + ACK_BYTE + damaged + NAK_BYTE + status(2) + ACK_BYTE
+    analyzer = offline.create_analyzer(ALPHALINER)
+    events = list(analyzer.iter_framed(offline.iter_input_frames(byte_events(data))))
+    assert [(event[0], event[3], event[6]) for event in events] == [
+        (FRAME_OK, 1, False), (FRAME_ACK, 0, False), (FRAME_NAK, 0, True), (FRAME_OK, 2, False), (FRAME_ACK, 0, False),
+    ]
+    stream = offline.FramedStream.from_bytes(offline.frame_capture(analyzer, byte_events(data)).to_bytes())
+    assert list(stream) == events
+
+
+def test_repeated_seq_after_ack_loss():
+    data = status(1) + status(1) + ACK_BYTE + status(2) + ACK_BYTE
+    summary, events = link_summary(data)
+    assert events == ['RETRANSMISSION after TIMEOUT']
+    assert summary['retransmissions'] == 1 and summary['timeouts'] == 1
+
+
+def test_auto_direction_counts_resend_for_its_sender():
+    analyzer = offline.create_analyzer('auto', link_stats='Yes')
+    data = status(1) + ACK_BYTE + encoder.damage_bcc(status(2)) + NAK_BYTE + status(2) + ACK_BYTE
+    list(offline.decode_frames(analyzer, offline.iter_input_frames(byte_events(data))))
+    summary = analyzer.link.summary()
+    assert summary['alphaliner_retransmissions'] == 1
+    assert summary['error_naks'] == 1 and summary['unpaired_acks'] == 0
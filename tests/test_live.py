@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+import struct
+
+import pytest
+
+import bench
+import live
+import offline
+from HighLevelAnalyzer import ALPHALINER
+
+fcntl = pytest.importorskip('fcntl')
+termios = pytest.importorskip('termios')
+
+
+def unread_bytes(fd):
+    return struct.unpack('i', fcntl.ioctl(fd, termios.FIONREAD, b'\0\0\0\0'))[0]
+
+
+def write_in_chunks(fd, data, chunk=256):
+    for position in range(0, len(data), chunk):
+        os.write(fd, data[position:position + chunk])
+
+
+def test_tap_over_pty_matches_offline_decode(tmp_path, capsys):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=2000, seed=6, corrupt_rate=0.02)
+    path = tmp_path / 'capture.bin'
+    path.write_bytes(data)
+    expected = [json.loads(json.dumps(dict(offline.frame_json(frame), latency_us=0.0)))
+                for frame in offline.decode_file(str(path), direction=ALPHALINER)]
+
+    master, slave = os.openpty()
+    live.configure_serial(slave)
+    os.set_blocking(slave, False)
+
+    async def run():
+        stop = asyncio.Event()
+
+        async def feed():
+            await asyncio.get_running_loop().run_in_executor(None, write_in_chunks, master, data)
+            while unread_bytes(slave):
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)  # let the tap publish the last read
+            stop.set()
+
+        feeder = asyncio.ensure_future(feed())
+        summary = await live.run_tap(slave, offline.create_analyzer(ALPHALINER), stop=stop)
+        await feeder
+        return summary
+
+    try:
+        summary = asyncio.run(run())
+    finally:
+        os.close(master)
+        os.close(slave)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert summary['bytes'] == len(data)
+    assert summary['frames'] == len(records) and summary['dropped_lines'] == 0
+    # Times are rebuilt from the arrival of each read, the frames themselves are the offline ones
+    assert [(record['type'], record['data']) for record in records] == \
+        [(record['type'], record['data']) for record in expected]
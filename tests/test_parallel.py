@@ -0,0 +1,69 @@
+import pytest
+
+import bench
+import encoder
+import offline
+import parallel
+from HighLevelAnalyzer import ACK, ALPHALINER, CONTROLLER
+
+
+def as_tuples(frames):
+    return [(frame.type, frame.start_time, frame.end_time, dict(frame.data or {})) for frame in frames]
+
+
+def write_csv(path, data):
+    # Logic 2 Async Serial export, with gaps between the bursts so the times are not a plain multiple
+    lines = ['name,type,start_time,duration,data']
+    start = 0.0
+    for index, byte in enumerate(data):
+        start += offline.CHAR_TIME * (3 if index % 97 == 0 else 1)
+        lines.append(f'Async Serial,data,{start!r},{offline.CHAR_TIME!r},0x{byte:02X}')
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def detector_traffic(count):
+    out = bytearray()
+    for index in range(count):
+        data = encoder.double_detector_test_data(1 + index % 3, 800 + index % 7, 800)
+        out += encoder.encode_telegram(ALPHALINER, 'DOUBLE_DETECTOR_TEST', index & 0x7F, data)
+        out.append(ACK)
+    return bytes(out)
+
+
+@pytest.mark.parametrize('direction', [CONTROLLER, ALPHALINER])
+def test_parallel_equals_sequential(write_capture, direction):
+    data, _ = bench.generate_corpus(direction, telegrams=3000, seed=7, corrupt_rate=0.05)
+    path = write_capture(data)
+    expected = list(offline.decode_file(path, direction=direction))
+    stats = {}
+    # Small chunks: many cuts, some of them inside damaged telegrams
+    result = parallel.decode_parallel(path, 'bin', workers=2, chunk_size=4096, stats=stats, direction=direction)
+    assert as_tuples(result) == as_tuples(expected)
+    assert stats['bytes'] == len(data)
+
+
+def test_parallel_events_equal_sequential(tmp_path):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=1000, seed=9, corrupt_rate=0.05)
+    path = write_csv(tmp_path / 'capture.csv', data)
+    settings = {'show_ack': False, 'method_filter': 'COPY_FAILED, ERROR_MSG'}
+    expected = list(offline.decode_file(path, direction=ALPHALINER, **settings))
+    result = parallel.decode_parallel(path, workers=2, chunk_size=2048, direction=ALPHALINER, **settings)
+    assert as_tuples(result) == as_tuples(expected)
+
+
+@pytest.mark.parametrize('detector_frames', ['Statistics per Feeder', 'Every Test'])
+def test_parallel_detector_summary_equals_sequential(write_capture, detector_frames):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=500, seed=11, corrupt_rate=0.02)
+    path = write_capture(detector_traffic(1500) + data + detector_traffic(700))
+    settings = {'direction': ALPHALINER, 'detector_frames': detector_frames}
+    expected = list(offline.decode_file(path, **settings))
+    assert any(frame.type == 'DETECTOR_STATS' for frame in expected) == (detector_frames != 'Every Test')
+    result = parallel.decode_parallel(path, 'bin', workers=2, chunk_size=4096, **settings)
+    assert as_tuples(result) == as_tuples(expected)
+
+
+def test_parallel_refuses_auto(write_capture):
+    path = write_capture(detector_traffic(10))
+    with pytest.raises(ValueError, match='Auto direction'):
+        list(parallel.decode_parallel(path, 'bin', workers=1, direction='auto'))
@@ -0,0 +1,30 @@
+import pytest
+
+from conftest import byte_events
+
+import bench
+import offline
+from HighLevelAnalyzer import ALPHALINER
+
+
+def profiled(data, direction=ALPHALINER, **settings):
+    analyzer = offline.create_analyzer(direction, profiling='Yes', **settings)
+    frames = list(offline.decode_frames(analyzer, offline.iter_input_frames(byte_events(data))))
+    return analyzer.profile_report(), frames
+
+
+@pytest.mark.parametrize('settings', [{}, {'method_filter': 'COPY_FAILED'}, {'rollup_window': 60.0}],
+                         ids=['all', 'filter', 'rollup'])
+def test_profile_counts_every_telegram(settings):
+    data, telegrams = bench.generate_corpus(ALPHALINER, telegrams=12000, seed=4, corrupt_rate=0.0)
+    report, frames = profiled(data, **settings)
+    assert sum(report['telegrams'].values()) == telegrams
+    assert report['telegrams']['alphaliner/COPY_COMPLETE'] > 0
+    assert sum(1 for frame in frames if frame.type == 'PROFILE') == 1
+
+
+def test_profile_counts_per_sender_in_auto_mode():
+    data, telegrams = bench.generate_corpus(ALPHALINER, telegrams=500, seed=4, corrupt_rate=0.0)
+    report, _ = profiled(data, 'auto')
+    assert sum(report['telegrams'].values()) == telegrams
+    assert all(key.startswith('alphaliner/') for key in report['telegrams'])
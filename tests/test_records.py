@@ -0,0 +1,31 @@
+import pickle
+
+import bench
+import offline
+from conftest import decode
+from HighLevelAnalyzer import ALPHALINER
+from saleae.analyzers import AnalyzerFrame
+
+
+def test_compact_records_equal_frames():
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=500, seed=13, corrupt_rate=0.05)
+    frames = decode(data)
+    records = [offline.compact_frame(frame) for frame in frames]
+    assert [(r.type, r.start_time, r.end_time, r.as_dict()) for r in records] == \
+        [(f.type, f.start_time, f.end_time, dict(f.data or {})) for f in frames]
+    # One record class per field set, strings shared
+    assert records == [offline.compact_frame(record) for record in records]
+    texts = {}
+    for record in records:
+        if record.type == 'UNKNOWN':
+            assert texts.setdefault(record.info, record.info) is record.info
+    assert texts
+
+    loaded = pickle.loads(pickle.dumps(records))
+    assert [(r.type, r.as_dict()) for r in loaded] == [(r.type, r.as_dict()) for r in records]
+
+
+def test_fields_that_cannot_be_slots_keep_the_frame():
+    for data in ({'type': 1}, {'fields': 2}, {'bad key': 3}):
+        frame = AnalyzerFrame('TEST', 0.0, 1.0, data)
+        assert offline.compact_frame(frame) is frame
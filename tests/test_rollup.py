@@ -0,0 +1,60 @@
+from conftest import byte_events
+
+import encoder
+import offline
+from HighLevelAnalyzer import ALPHALINER, NAK
+
+
+def telegram(name, seq, data):
+    return encoder.encode_telegram(ALPHALINER, name, seq, data)
+
+
+# (time, line bytes) over three 1 s windows: each window starts with its first event and is
+# closed by the first event at least 1 s later
+TRAFFIC = [
+    (0.0, telegram('COPY_COMPLETE', 1, encoder.copy_complete_data(11, 101, 0b101))),
+    (0.2, telegram('COPY_COMPLETE', 2, encoder.copy_complete_data(12, 102, 0b1, good=False))),
+    (0.4, telegram('COPY_FAILED', 3, encoder.copy_failed_data(1, 3, 13, 0b11))),
+    (0.5, telegram('ERROR_MSG', 4, encoder.error_data(21, 5, 2))),
+    (0.6, telegram('ERROR_MSG', 5, encoder.error_data(22, 6, 1))),
+    (0.7, bytes((NAK,))),
+    (0.8, encoder.damage_bcc(telegram('COPY_COMPLETE', 6, encoder.copy_complete_data(14, 104, 0)))),
+    # window 2, opened at 1.5 s
+    (1.5, telegram('STATISTIC_MSG', 7, encoder.statistic_data(2, 4, 15))),
+    (1.9, telegram('ERROR_MSG', 8, encoder.error_data(21, 5, 0))),
+    (2.4, telegram('COPY_COMPLETE', 9, encoder.copy_complete_data(16, 106, 0))),
+    # window 3, opened at 2.6 s, only reported by flush()
+    (2.6, telegram('COPY_FAILED', 10, encoder.copy_failed_data(2, 3, 17, 0))),
+]
+
+
+def rollup_frames(flush):
+    events = [event for time, data in TRAFFIC for event in byte_events(data, start=time)]
+    analyzer = offline.create_analyzer(ALPHALINER, rollup_window=1.0)
+    frames = offline.decode_frames(analyzer, offline.iter_input_frames(events), flush=flush)
+    return [frame for frame in frames if frame.type == 'ROLLUP']
+
+
+def test_windows_close_with_the_first_event_after_them():
+    first, second = rollup_frames(flush=False)
+    assert first.start_time == 0.0 and 0.8 < first.end_time < 0.81
+    assert second.start_time == 1.5 and 2.4 < second.end_time < 2.41
+
+    assert first.data == {
+        'completed': 2, 'faulty': 1, 'failed': 1, 'errors': 'Missfeed: 1', 'missfeeds': '3: 1',
+        'doublefeeds': '-', 'active_errors': 2, 'naks': 1, 'bad_frames': 1,
+    }
+    # Counts restart, active error messages carry over (one of them cleared in this window)
+    assert second.data == {
+        'completed': 1, 'faulty': 0, 'failed': 0, 'errors': 'Doublefeed: 1', 'missfeeds': '-',
+        'doublefeeds': '4: 1', 'active_errors': 1, 'naks': 0, 'bad_frames': 0,
+    }
+
+
+def test_flush_emits_the_open_window():
+    frames = rollup_frames(flush=True)
+    assert len(frames) == 3
+    last = frames[-1]
+    assert last.start_time == 2.6
+    assert (last.data['failed'], last.data['errors'], last.data['doublefeeds']) == (1, 'Doublefeed: 1', '3: 1')
+    assert last.data['active_errors'] == 1
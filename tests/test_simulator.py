@@ -0,0 +1,29 @@
+import threading
+
+import encoder
+import simulator
+from HighLevelAnalyzer import ALPHALINER, BCC_RESERVED, CONTROLLER
+
+
+def test_damage_bcc_avoids_control_characters():
+    for bcc in range(256):
+        if bcc in BCC_RESERVED:
+            continue
+        damaged = encoder.damage_bcc(bytes((0x02, 0x80, 0x80, bcc, 0x03)))[-2]
+        assert damaged != bcc and damaged not in BCC_RESERVED
+
+
+def test_simulated_link_naks_only_damaged_telegrams():
+    master, slave, _ = simulator.open_pty()
+    answered = {}
+    # The controller side only answers, until shortly after the AlphaLiner side is done
+    peer = threading.Thread(target=lambda: answered.update(simulator.simulate(slave, CONTROLLER, telegrams=0, linger=1.0)))
+    peer.start()
+    sent = simulator.simulate(master, ALPHALINER, telegrams=1000, rate=0, seed=2, corrupt_rate=0.1, ack_timeout=0.5)
+    peer.join()
+
+    damaged = sent['naked']
+    assert damaged > 0
+    assert sent['acked'] == 1000 and sent['failed'] == 0 and sent['timeouts'] == 0
+    assert sent['sent'] == 1000 + damaged
+    assert answered['received'] == 1000 and answered['received_bad'] == damaged
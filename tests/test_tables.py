@@ -0,0 +1,57 @@
+import random
+
+from conftest import decode
+
+import encoder
+import offline
+from HighLevelAnalyzer import ALPHALINER, TABLE_BITS, decode_table, render_table_positions
+
+
+def legacy_positions(raw):
+    """
+    The table rendering before the chunk tables: D1..D5 without MSB concatenated, the first
+    31 bits listed highest first, bit 0 as 'J', 'CEALR' for an empty table.
+    """
+    value = 0
+    for byte in raw:
+        value = (value << 7) | (byte & 0x7F)
+    positions = ['J' if i == 0 else str(i) for i in range(31) if value & (1 << i)]
+    return ','.join(reversed(positions)) if positions else 'CEALR'
+
+
+def test_pinned_table_strings():
+    assert decode_table(bytes(5)) == (0, 'CEALR')
+    assert decode_table(bytes((0, 0, 0, 0, 1)))[1] == 'J'
+    assert decode_table(bytes((0, 0, 0, 0, 0b101)))[1] == '2,J'
+    assert decode_table(bytes((0, 0, 0, 1, 0)))[1] == '7'
+    # D1 carries table bits 28..34, only 28..30 are feeders: the other four bits are not shown
+    assert decode_table(bytes((0x7F, 0, 0, 0, 0))) == (0x7F << 28, '30,29,28')
+    assert decode_table(bytes((0x78, 0, 0, 0, 0))) == (0x78 << 28, 'CEALR')
+    everything = ','.join(str(position) for position in range(30, 0, -1)) + ',J'
+    assert decode_table(bytes((0x7F,) * 5)) == ((1 << 35) - 1, everything)
+    # MSB set on the line (as transmitted) or not gives the same table
+    assert decode_table(bytes((0xFF,) * 5)) == decode_table(bytes((0x7F,) * 5))
+    assert TABLE_BITS == 31
+
+
+def test_tables_render_like_the_legacy_code():
+    rng = random.Random(23)
+    tables = [bytes(rng.randrange(256) for _ in range(5)) for _ in range(5000)]
+    tables += [bytes(1 << bit if index == chunk else 0 for index in range(5)) for chunk in range(5) for bit in range(7)]
+    for raw in tables:
+        assert decode_table(raw)[1] == legacy_positions(raw), raw.hex()
+        value = decode_table(raw)[0]
+        assert render_table_positions(value & ((1 << TABLE_BITS) - 1)) == legacy_positions(raw)
+
+
+def test_analyzer_table_fields_unchanged():
+    analyzer = offline.create_analyzer(ALPHALINER)
+    raw = [0x83, 0x80, 0x80, 0x81, 0x85]  # feeders 29, 28, 7 and 2 plus the jacket
+    assert analyzer.format_hp_binary(raw) == legacy_positions(raw) == '29,28,7,2,J'
+    assert analyzer.get_table(raw) == (0x03 << 28 | 1 << 7 | 0b101, '29,28,7,2,J')
+    assert analyzer.get_bit_positions(0) == 'CEALR'
+    assert analyzer.format_hp_binary(raw[:4]) == 'Insufficient data'
+
+    data = encoder.copy_complete_data(42, 7, 0b1000_0000_0000_0000_0000_1000_0001)
+    frames = decode(encoder.encode_telegram(ALPHALINER, 'COPY_COMPLETE', 1, data))
+    assert (frames[0].data['insert_mask'], frames[0].data['inserts']) == (0x8000081, '27,7,J')
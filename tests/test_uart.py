@@ -0,0 +1,131 @@
+import struct
+
+import pytest
+
+from conftest import decode
+
+import bench
+import offline
+from HighLevelAnalyzer import ALPHALINER
+
+np = pytest.importorskip('numpy')
+
+import uart  # noqa: E402
+
+
+BIT_TIME = 1.0 / offline.BAUD_RATE
+
+
+def char_bits(byte, parity_error=False, framing_error=False):
+    """
+    Returns:
+        list: line levels of one 8O1 character, start bit first
+    """
+    data = [(byte >> bit) & 1 for bit in range(8)]
+    parity = 1 - sum(data) % 2  # odd parity: data + parity bits have an odd number of ones
+    return [0] + data + [parity ^ parity_error, 0 if framing_error else 1]
+
+
+def uart_edges(data, parity_errors=(), framing_errors=(), glitch_after=None, idle_bits=1, start=0.001):
+    """
+    Builds the transitions of a UART line sending data (idle high between characters).
+
+    Args:
+        parity_errors, framing_errors: indexes of characters sent with a wrong parity or stop bit
+        glitch_after: index of a character followed by a quarter bit low pulse in its idle time
+
+    Returns:
+        tuple: (transition times, levels, character start times), first entry = capture start, high
+    """
+    times = [0.0]
+    levels = [1]
+    starts = []
+    time = start
+    for index, byte in enumerate(data):
+        starts.append(time)
+        for level in char_bits(byte, index in parity_errors, index in framing_errors):
+            if level != levels[-1]:
+                times.append(time)
+                levels.append(level)
+            time += BIT_TIME
+        if levels[-1] == 0:
+            times.append(time)
+            levels.append(1)
+        if index == glitch_after:
+            times += [time + 0.25 * BIT_TIME, time + 0.5 * BIT_TIME]
+            levels += [0, 1]
+        time += idle_bits * BIT_TIME
+    return np.array(times), np.array(levels, dtype=np.uint8), np.array(starts)
+
+
+def write_csv_export(path, times, levels):
+    # Logic 2 digital CSV export: one row per change of any channel, channel 1 toggles independently
+    lines = ['Time [s],Channel 0,Channel 1']
+    rows = enumerate(zip(times.tolist(), levels.tolist()))
+    lines += [f'{time!r},{level},{index // 3 % 2}' for index, (time, level) in rows]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def write_binary_export(path, times, levels):
+    header = uart.BINARY_HEADER.pack(offline.DIGITAL_EXPORT_MAGIC, 0, uart.BINARY_TYPE_DIGITAL,
+                                     int(levels[0]), times[0], times[-1], len(times) - 1)
+    path.write_bytes(header + struct.pack(f'<{len(times) - 1}d', *times[1:]))
+    return str(path)
+
+
+def test_decode_uart_recovers_bytes_and_start_bits():
+    data = bytes(range(256))
+    times, levels, starts = uart_edges(data, idle_bits=0)
+    values, char_starts, char_ends, errors, glitches = uart.decode_uart(times, levels)
+    assert bytes(values) == data
+    assert np.allclose(char_starts, starts) and np.allclose(char_ends, starts + 11 * BIT_TIME)
+    assert not errors.any() and glitches == 0
+
+
+def test_decode_uart_reports_parity_framing_errors_and_glitches():
+    data = bytes((0x02, 0x85, 0x81, 0x00, 0xFF, 0x03, 0x06))
+    times, levels, _ = uart_edges(data, parity_errors=(1,), framing_errors=(4,), glitch_after=2, idle_bits=3)
+    values, _, _, errors, glitches = uart.decode_uart(times, levels)
+    assert bytes(values) == data
+    assert errors.tolist() == [0, uart.UART_PARITY_ERROR, 0, 0, uart.UART_FRAMING_ERROR, 0, 0]
+    assert glitches == 1
+    assert uart.error_counts(errors, glitches) == {
+        'uart_chars': 7, 'uart_parity_errors': 1, 'uart_framing_errors': 1, 'uart_glitches': 1,
+    }
+
+
+@pytest.mark.parametrize('writer', [write_csv_export, write_binary_export])
+def test_edge_exports_load_the_same_transitions(tmp_path, writer):
+    times, levels, _ = uart_edges(b'\x02\x85\x81\x86\x80\x84\x03\x06')
+    path = writer(tmp_path / 'digital', times, levels)
+    assert offline.guess_format(path) == 'edges'
+    loaded_times, loaded_levels = uart.load_edges(path)
+    assert np.allclose(loaded_times, times)
+    assert loaded_levels.tolist() == levels.tolist()
+
+
+@pytest.mark.parametrize('writer', [write_csv_export, write_binary_export])
+def test_edge_capture_decodes_like_the_bytes(tmp_path, writer):
+    data, _ = bench.generate_corpus(ALPHALINER, telegrams=200, seed=17, corrupt_rate=0.05)
+    # One telegram with a parity error and one with a framing error: delivered as NUL, the
+    # telegram is reported as damaged exactly like the byte log with a NUL in that place
+    stx = [index for index, byte in enumerate(data) if byte == 0x02]
+    damaged = {stx[20] + 3: 'parity', stx[120] + 2: 'framing'}
+    times, levels, _ = uart_edges(
+        data, parity_errors=[i for i, kind in damaged.items() if kind == 'parity'],
+        framing_errors=[i for i, kind in damaged.items() if kind == 'framing'])
+    path = writer(tmp_path / 'digital', times, levels)
+
+    stats = {}
+    frames = list(offline.decode_frames(offline.create_analyzer(ALPHALINER),
+                                        offline.iter_input_frames(offline.iter_edge_bytes(path, stats))))
+    line = bytearray(data)
+    for index in damaged:
+        line[index] = 0
+    expected = decode(line)
+    unknown = sum(frame.type == 'UNKNOWN' for frame in expected)
+    assert unknown == sum(frame.type == 'UNKNOWN' for frame in decode(data)) + 2
+    assert [(frame.type, frame.data) for frame in frames] == [(frame.type, frame.data) for frame in expected]
+    assert stats['uart_chars'] == len(data)
+    assert (stats['uart_parity_errors'], stats['uart_framing_errors'], stats['uart_glitches']) == (1, 1, 0)
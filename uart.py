@@ -0,0 +1,233 @@
+# Raw-edge UART decoder
+# Recovers the 19200 baud 8O1 characters of the AlphaLiner line directly from a Logic 2 raw
+# digital export (the timestamps of the signal transitions), so long captures do not have to go
+# through the Async Serial analyzer first. Bit sampling, parity and stop bit checks run on whole
+# arrays; only the start bit search steps from character to character.
+#
+#   Logic 2: File > Export Data > Digital, CSV or binary, only the channel of the UART line
+#   python cli.py decode digital.csv --direction alphaliner
+
+import csv
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for raw-edge decoding
+    np = None
+
+import offline
+
+
+DATA_BITS = 8
+SAMPLE_CHUNK = 1 << 18     # characters sampled per block (bounds the temporary sample arrays)
+
+# Error flags per character
+UART_PARITY_ERROR = 1
+UART_FRAMING_ERROR = 2     # stop bit not high
+
+# Logic 2 binary export of a digital channel
+BINARY_HEADER = struct.Struct('<8siiIddQ')  # magic, version, type, initial state, begin, end, transitions
+BINARY_VERSIONS = (0, 1)
+BINARY_TYPE_DIGITAL = 0
+
+# Set bits per byte value, for the parity check
+_ONES = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("raw-edge decoding requires numpy (pip install numpy)")
+
+
+def load_edges(path, channel=None):
+    """
+    Loads the transitions of one digital channel.
+
+    Args:
+        path: Logic 2 digital export, CSV (Time [s],<channel>,...) or binary (<SALEAE> header)
+        channel: CSV column name or index among the channel columns (default: the first channel)
+
+    Returns:
+        tuple: (float64 times, uint8 levels): the level from each time on, the first entry being
+               the state at the start of the capture
+    """
+    _require_numpy()
+    with open(path, 'rb') as f:
+        magic = f.read(len(offline.DIGITAL_EXPORT_MAGIC))
+    if magic == offline.DIGITAL_EXPORT_MAGIC:
+        return _load_binary_edges(path)
+
+    with open(path, newline='') as f:
+        header = [h.strip().strip('"') for h in next(csv.reader(f))]
+    channels = header[1:]
+    if channel is None:
+        column = 1
+    elif isinstance(channel, int):
+        column = 1 + channel
+    elif channel in channels:
+        column = 1 + channels.index(channel)
+    else:
+        raise ValueError(f"{path}: no channel {channel!r}, expected one of {', '.join(channels)}")
+
+    table = np.loadtxt(path, delimiter=',', skiprows=1, usecols=(0, column), ndmin=2)
+    times = table[:, 0]
+    levels = (table[:, 1] != 0).astype(np.uint8)
+    # Rows are written whenever any channel changes: keep the transitions of this one
+    keep = np.ones(len(levels), dtype=bool)
+    keep[1:] = levels[1:] != levels[:-1]
+    return times[keep], levels[keep]
+
+
+def _load_binary_edges(path):
+    with open(path, 'rb') as f:
+        header = f.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError(f"{path}: truncated binary export header")
+    _, version, kind, initial_state, begin_time, _, count = BINARY_HEADER.unpack(header)
+    if version not in BINARY_VERSIONS or kind != BINARY_TYPE_DIGITAL:
+        raise ValueError(f"{path}: unsupported binary export (version {version}, type {kind}), expected digital")
+
+    transitions = np.fromfile(path, dtype='<f8', count=count, offset=BINARY_HEADER.size)
+    times = np.empty(len(transitions) + 1, dtype=np.float64)
+    times[0] = begin_time
+    times[1:] = transitions
+    levels = np.empty(len(times), dtype=np.uint8)
+    levels[0::2] = 1 if initial_state else 0
+    levels[1::2] = 0 if initial_state else 1
+    return times, levels
+
+
+def _follow(next_edge):
+    """
+    Walks the start bit chain: from each start bit the receiver resumes at next_edge[start].
+
+    Returns:
+        list: indexes of the falling edges that start a character
+    """
+    chain = []
+    append = chain.append
+    count = len(next_edge)
+    index = 0
+    while index < count:
+        append(index)
+        index = next_edge[index]
+    return chain
+
+
+def _advance(padded_times, positions, limits):
+    """
+    Moves every position forward to the last transition at or before its limit.
+
+    A character spans only a few transitions, so stepping all positions together one
+    transition at a time is much cheaper than a binary search over the whole capture.
+
+    Args:
+        padded_times: ascending transition times followed by inf
+        positions: int64 indexes into padded_times, modified in place
+        limits: times to advance to, one per position
+
+    Returns:
+        positions
+    """
+    while True:
+        moving = padded_times[positions + 1] <= limits
+        if not moving.any():
+            return positions
+        positions += moving
+
+
+def decode_uart(times, levels, baud_rate=offline.BAUD_RATE):
+    """
+    Recovers 8O1 characters from the transitions of a UART line (idle high, LSB first).
+
+    Like a receiver, a start bit is a falling edge that is still low half a bit later (shorter
+    pulses are glitches); every bit is sampled in its middle and the next start bit is searched
+    from the middle of the stop bit on.
+
+    Args:
+        times: transition times in seconds, ascending (first entry = capture start)
+        levels: line level from each time on
+        baud_rate: bits per second
+
+    Returns:
+        tuple: (uint8 bytes, float64 start times, float64 end times, uint8 UART_* error flags, glitch count)
+    """
+    _require_numpy()
+    global _ONES
+    if _ONES is None:
+        _ONES = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+    padded_times = np.append(np.asarray(times, dtype=np.float64), np.inf)
+    levels = np.asarray(levels, dtype=np.uint8)
+    bit_time = 1.0 / baud_rate
+
+    falling = np.flatnonzero((levels[1:] == 0) & (levels[:-1] != 0)) + 1
+    edge_times = padded_times[falling]
+    # The transition after a falling edge is a rising one: a start bit lasts at least half a bit
+    valid = padded_times[falling + 1] > edge_times + 0.5 * bit_time
+    # Next start bit candidate: the first falling edge from the middle of the stop bit on
+    resume = np.searchsorted(edge_times, edge_times + (offline.BITS_PER_CHAR - 0.5) * bit_time, 'left')
+    next_edge = np.where(valid, resume, np.arange(1, len(edge_times) + 1))
+
+    chain = np.array(_follow(next_edge.tolist()), dtype=np.int64)
+    glitches = int(np.count_nonzero(~valid[chain]))
+    chain = chain[valid[chain]]
+    starts = edge_times[chain]
+    start_positions = falling[chain]
+
+    count = len(starts)
+    data = np.empty(count, dtype=np.uint8)
+    errors = np.empty(count, dtype=np.uint8)
+    # Data bits 1..8, parity bit 9, stop bit 10, sampled in the middle
+    offsets = (np.arange(1, offline.BITS_PER_CHAR, dtype=np.float64) + 0.5) * bit_time
+    weights = 1 << np.arange(DATA_BITS, dtype=np.uint16)
+    for first in range(0, count, SAMPLE_CHUNK):
+        block = starts[first:first + SAMPLE_CHUNK]
+        positions = start_positions[first:first + SAMPLE_CHUNK].copy()
+        bits = np.empty((len(block), len(offsets)), dtype=np.uint8)
+        for index, offset in enumerate(offsets):
+            bits[:, index] = levels[_advance(padded_times, positions, block + offset)]
+        values = (bits[:, :DATA_BITS] @ weights).astype(np.uint8)
+        parity_ok = (_ONES[values] + bits[:, DATA_BITS]) & 1 == 1
+        data[first:first + len(block)] = values
+        errors[first:first + len(block)] = (np.where(parity_ok, 0, UART_PARITY_ERROR)
+                                            | np.where(bits[:, DATA_BITS + 1] != 0, 0, UART_FRAMING_ERROR))
+
+    return data, starts, starts + offline.BITS_PER_CHAR * bit_time, errors, glitches
+
+
+def error_counts(errors, glitches=0):
+    """
+    Returns:
+        dict: characters, parity errors, framing errors and glitches of a decode_uart result
+    """
+    return {
+        'uart_chars': int(len(errors)),
+        'uart_parity_errors': int(np.count_nonzero(errors & UART_PARITY_ERROR)),
+        'uart_framing_errors': int(np.count_nonzero(errors & UART_FRAMING_ERROR)),
+        'uart_glitches': glitches,
+    }
+
+
+def load_capture(path, channel=None, stats=None):
+    """
+    Decodes a raw digital export into the arrays of bulk.load_capture.
+
+    Characters with a parity or framing error are delivered as NUL, like a tty with INPCK
+    (see live.configure_serial): NUL never appears inside a valid telegram, so the framer
+    reports the damaged telegram instead of decoding it.
+
+    Args:
+        path: Logic 2 digital export
+        channel: channel of the UART line (see load_edges)
+        stats: optional dict, updated with the error_counts of the capture
+
+    Returns:
+        tuple: (uint8 bytes, float64 start times, float64 end times)
+    """
+    data, starts, ends, errors, glitches = decode_uart(*load_edges(path, channel))
+    data[errors != 0] = 0
+    if stats is not None:
+        stats.update(error_counts(errors, glitches))
+    return data, starts, ends
+